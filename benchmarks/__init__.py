@@ -0,0 +1,60 @@
+"""
+Benchmarks of hot paths of the site.
+
+Every module is runnable as ``python -m benchmarks.<name>`` with
+``DJANGO_SETTINGS_MODULE`` pointing to settings with reachable database.
+Benchmark creates test database, fills it, prints timings and amount of
+queries of measured cases, and destroys database. ``pages`` benchmark
+stores results as JSON, to compare runs of different commits.
+"""
+import contextlib
+import os
+import statistics
+import time
+
+import django
+
+
+def setup() -> None:
+    """Configure django for standalone run."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'switchdeck.settings.dev')
+    django.setup()
+
+
+@contextlib.contextmanager
+def test_database():
+    """Create test database for the time of benchmark."""
+    from django.db import connection
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment)
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(name: str, func, repeat: int = 5) -> dict:
+    """Run ``func`` ``repeat`` times, print and return its timings."""
+    from django.db import connection, reset_queries
+    from django.test.utils import CaptureQueriesContext
+    timings = []
+    for _ in range(repeat):
+        # log of queries is limited, keep it from overflow by long runs
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    # nearest rank
+    p95 = sorted(timings)[min(repeat - 1, int(0.95 * repeat))]
+    result = {'name': name, 'queries': len(queries),
+              'median_ms': statistics.median(timings) * 1000,
+              'p95_ms': p95 * 1000,
+              'min_ms': min(timings) * 1000}
+    print(f'{name:<40} {result["median_ms"]:>10.2f} ms p50 '
+          f'{result["p95_ms"]:>10.2f} ms p95 {result["queries"]:>6} queries')
+    return result
@@ -0,0 +1,72 @@
+"""
+Serialization of api lists of lots: model serializer vs ``.values()`` rows.
+
+Old path built model instances, reversed hyperlinks of every object and
+rendered JSON by standard encoder. New one formats hyperlinks from
+templates over ``.values()`` rows and renders by ``orjson``.
+"""
+from . import measure, setup, test_database
+
+LOTS = 1000
+
+
+def run() -> list:
+    from django.db.models import Prefetch
+    from django.test import RequestFactory
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+
+    from switchdeck.apps.core.api.renderers import ORJSONRenderer
+    from switchdeck.apps.core.api.serializers import ValuesSerializer
+    from switchdeck.apps.game.models import Game
+    from switchdeck.apps.lot.api.serializers import LotSerializer
+    from switchdeck.apps.lot.models import Comment, Lot
+    from switchdeck.apps.place.models import Place
+    from switchdeck.apps.users.models import Profile
+
+    place = Place.objects.create(name='bench', slug='bench')
+    game = Game.objects.create(name='bench', slug='bench')
+    owner = Profile.create_profile('owner', 'owner@a.by', 'password',
+                                   place=place)
+    wish = Lot.objects.create(profile=owner, game=game, place=place,
+                              prop='w')
+    lots = Lot.objects.bulk_create(
+        Lot(profile=owner, game=game, place=place, price=i)
+        for i in range(LOTS))
+    Lot.change_to.through.objects.bulk_create(
+        Lot.change_to.through(from_lot_id=lot.pk, to_lot_id=wish.pk)
+        for lot in lots)
+    Comment.objects.bulk_create(Comment(author=owner, lot=lot, text='hi')
+                                for lot in lots)
+
+    request = Request(RequestFactory().get('/api/lots/'))
+    serializer = LotSerializer(context={'request': request})
+    queryset = Lot.objects.order_by('pk')
+
+    def model_serializer():
+        rows = queryset.prefetch_related(
+            Prefetch('change_to', Lot.objects.only('id')),
+            Prefetch('comments', Comment.objects.only('id', 'lot_id')))
+        data = LotSerializer(rows, many=True,
+                             context={'request': request}).data
+        JSONRenderer().render(data)
+
+    def values_serializer():
+        values = ValuesSerializer(serializer, request)
+        ORJSONRenderer().render(
+            values.to_representation(values.values(queryset)))
+
+    results = [
+        measure('model serializer, json', model_serializer),
+        measure('values serializer, orjson', values_serializer),
+    ]
+    for result in results:
+        per_second = LOTS / result['median_ms'] * 1000
+        print(f'{result["name"]:<40} {per_second:>10.0f} lots/s')
+    return results
+
+
+if __name__ == '__main__':
+    setup()
+    with test_database():
+        run()
@@ -0,0 +1,83 @@
+"""
+Load test of pages of running site: sync (WSGI) vs async (ASGI) worker.
+
+Unlike other benchmarks it does not create database, it requests pages of
+server started separately over filled database. Compare servers with the
+same amount of worker processes, e.g.::
+
+    gunicorn -w 1 -b :8000 switchdeck.wsgi
+    daphne -p 8000 switchdeck.asgi:application
+
+and run ``python -m benchmarks.load --base http://localhost:8000`` against
+each of them. Paths of game and place pages are passed as arguments, like
+``/games/<slug>/``. Pages cached by ``cache_view`` for anonymous clients
+are not measured by default.
+"""
+import argparse
+import concurrent.futures
+import statistics
+import time
+import urllib.error
+import urllib.request
+
+PATHS = [
+    '/',
+    '/lots/search/?query=True&game=&place=&proposition=a',
+]
+
+
+def request(url: str) -> tuple:
+    """Return status and time of request in seconds."""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as error:
+        status = error.code
+    except OSError:
+        status = None
+    return status, time.perf_counter() - start
+
+
+def load(url: str, concurrency: int, duration: float) -> dict:
+    """Request url by ``concurrency`` clients for ``duration`` seconds."""
+    deadline = time.monotonic() + duration
+
+    def client():
+        results = []
+        while time.monotonic() < deadline:
+            results.append(request(url))
+        return results
+
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+        futures = [executor.submit(client) for _ in range(concurrency)]
+        results = [result for future in futures
+                   for result in future.result()]
+    timings = sorted(timing for _, timing in results)
+    quantiles = statistics.quantiles(timings, n=20) \
+        if len(timings) > 1 else timings * 19
+    result = {'url': url, 'requests': len(results),
+              'errors': sum(status != 200 for status, _ in results),
+              'per_second': len(results) / duration,
+              'p50_ms': quantiles[9] * 1000,
+              'p95_ms': quantiles[18] * 1000}
+    print(f'{url:<60} {result["per_second"]:>8.1f} req/s '
+          f'{result["p50_ms"]:>8.1f} ms p50 {result["p95_ms"]:>8.1f} ms p95 '
+          f'{result["errors"]:>5} errors')
+    return result
+
+
+def run(base: str, concurrency: int, duration: float, paths=PATHS) -> list:
+    return [load(base.rstrip('/') + path, concurrency, duration)
+            for path in paths]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--base', default='http://localhost:8000')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('paths', nargs='*', default=PATHS)
+    args = parser.parse_args()
+    run(args.base, args.concurrency, args.duration, args.paths)
@@ -0,0 +1,70 @@
+"""
+Ownership checks of lots: loading of profiles vs comparing of ids.
+
+Old checks compared ``obj.profile == request.user.profile``, loading both
+profiles for every object. New ones compare ``profile_id`` with profile id
+of request, resolved once per request.
+"""
+from . import measure, setup, test_database
+
+LOTS = 500
+
+
+def run() -> list:
+    from django.test import RequestFactory
+    from rest_framework.request import Request
+
+    from switchdeck.apps.core.api.permissions import IsOwnerOrReadOnly
+    from switchdeck.apps.game.models import Game
+    from switchdeck.apps.lot.models import Lot
+    from switchdeck.apps.place.models import Place
+    from switchdeck.apps.users.models import Profile
+
+    place = Place.objects.create(name='bench', slug='bench')
+    game = Game.objects.create(name='bench', slug='bench')
+    owner = Profile.create_profile('owner', 'owner@a.by', 'password',
+                                   place=place)
+    Lot.objects.bulk_create(Lot(profile=owner, game=game, place=place)
+                            for _ in range(LOTS))
+
+    def request():
+        drf_request = Request(RequestFactory().patch('/api/lots/'))
+        drf_request.user = type(owner.user).objects.get(pk=owner.user_id)
+        return drf_request
+
+    def check_by_objects():
+        drf_request = request()
+        for lot in Lot.objects.all():
+            assert lot.profile == drf_request.user.profile
+
+    permission = IsOwnerOrReadOnly()
+
+    def check_by_ids():
+        drf_request = request()
+        for lot in Lot.objects.all():
+            assert permission.has_object_permission(drf_request, None, lot)
+
+    def update_by_objects():
+        drf_request = request()
+        for lot in Lot.objects.all():
+            if lot.profile == drf_request.user.profile:
+                lot.desc = 'updated'
+                lot.save(update_fields=['desc'])
+
+    def update_by_ids():
+        from switchdeck.apps.users.identity import request_profile_id
+        Lot.objects.filter(profile_id=request_profile_id(request()))\
+            .update(desc='updated')
+
+    return [
+        measure('list check, related objects', check_by_objects),
+        measure('list check, foreign key ids', check_by_ids),
+        measure('bulk update, related objects', update_by_objects, repeat=3),
+        measure('bulk update, foreign key ids', update_by_ids),
+    ]
+
+
+if __name__ == '__main__':
+    setup()
+    with test_database():
+        run()
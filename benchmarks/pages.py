@@ -0,0 +1,130 @@
+"""
+Latency and queries of main pages and api over synthetic dataset.
+
+Test database is filled by ``generate_dataset``, pages are requested by
+test client, anonymous or logged in. Results are stored as JSON with
+commit and scale of run, ``--compare`` prints changes against results of
+another run::
+
+    python -m benchmarks.pages --output before.json
+    git checkout feature
+    python -m benchmarks.pages --compare before.json
+
+Pages cached for anonymous users are measured warm, after first request.
+"""
+import argparse
+import datetime
+import json
+import pathlib
+import subprocess
+
+from . import measure, setup, test_database
+
+RESULTS_DIR = pathlib.Path(__file__).resolve().parent / 'results'
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+            text=True, check=True, cwd=RESULTS_DIR.parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def cases() -> list:
+    """Return (name, path, logged in) of measured requests."""
+    from django.urls import reverse
+
+    from switchdeck.apps.game.models import Game
+    from switchdeck.apps.place.models import Place
+    from switchdeck.apps.users.models import Profile
+
+    game = Game.objects_ordered_by_sell().first()
+    place = Place.objects.first()
+    profile = Profile.objects.select_related('user').first()
+    return [
+        ('index', reverse('index'), False),
+        ('game list', reverse('game:game_list'), False),
+        ('game detail', game.get_absolute_url(), False),
+        ('place list', reverse('place:place_list'), False),
+        ('place detail', place.get_absolute_url(), False),
+        ('place sell list',
+         reverse('place:place_sell_list', args=[place.slug]), False),
+        ('search', reverse('lot:search') + f'?query=True&game={game.name}'
+                   f'&place={place.name}&proposition=a', False),
+        ('profile list', reverse('users:list'), True),
+        ('profile detail', profile.get_absolute_url(), True),
+        ('api lots', '/api/lots/', False),
+        ('api lots expanded', '/api/lots/?expand=game,profile', False),
+        ('api games', '/api/games/', False),
+        ('api places', '/api/places/', False),
+        ('api profiles', '/api/profiles/', False),
+        ('api comments', '/api/comments/', False),
+        ('api dialogs', '/api/dialogs/', True),
+    ]
+
+
+def run(scale: float = 1, repeat: int = 20) -> list:
+    from django.test import Client
+
+    from switchdeck.apps.chat.models import Dialog
+    from switchdeck.apps.core.dataset import generate_dataset
+
+    generate_dataset(scale)
+    anonymous = Client()
+    logged_in = Client()
+    # participant of dialogs, with inbox
+    logged_in.force_login(Dialog.objects.first().participant1)
+    results = []
+    for name, path, login in cases():
+        client = logged_in if login else anonymous
+
+        def request():
+            response = client.get(path)
+            assert response.status_code == 200, \
+                f'{path}: status {response.status_code}'
+
+        results.append({**measure(name, request, repeat), 'path': path})
+    return results
+
+
+def compare(results: list, path: str) -> None:
+    """Print changes of results against results stored in file."""
+    with open(path) as file:
+        stored = json.load(file)
+    before = {result['name']: result for result in stored['results']}
+    print(f'\nCompared with {stored["commit"]} (scale {stored["scale"]}):')
+    for result in results:
+        old = before.get(result['name'])
+        if old is None:
+            continue
+        change = (result['median_ms'] / old['median_ms'] - 1) * 100
+        print(f'{result["name"]:<40} {old["median_ms"]:>10.2f} ms -> '
+              f'{result["median_ms"]:>10.2f} ms {change:>+7.1f}% '
+              f'{old["queries"]:>4} -> {result["queries"]:>4} queries')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output',
+                        help='JSON file of results, results/<commit>.json '
+                             'by default.')
+    parser.add_argument('--compare', help='JSON file of previous results.')
+    args = parser.parse_args()
+    setup()
+    commit = current_commit()
+    with test_database():
+        results = run(args.scale, args.repeat)
+    output = pathlib.Path(args.output or RESULTS_DIR / f'{commit}.json')
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump({'commit': commit, 'scale': args.scale,
+                   'repeat': args.repeat,
+                   'date': datetime.datetime.now().isoformat(),
+                   'results': results}, file, indent=2)
+    print(f'Results are stored in {output}')
+    if args.compare:
+        compare(results, args.compare)
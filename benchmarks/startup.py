@@ -0,0 +1,169 @@
+"""
+Import time of processes starting the site and memory of forked workers.
+
+Every import case runs in a new interpreter with ``-X importtime``:
+``web`` imports WSGI application and URLconf, as gunicorn worker does
+before its first response, ``celery`` imports Celery application with
+tasks. Prints total time and packages with the most import time.
+
+Memory is compared for ``--workers`` processes forked from a master, as
+gunicorn does: with ``preload_app`` the master loads the site and calls
+``prepare_fork``, otherwise every worker loads the site itself. Workers
+load the site as before their first responses and run garbage collector,
+then unique (USS) and proportional (PSS) memory of every process is read
+from ``/proc/<pid>/smaps_rollup`` (Linux only). Pages shared with the
+master are counted by PSS, not by USS. Database is not needed::
+
+    python -m benchmarks.startup --top 15 --workers 4
+"""
+import argparse
+import collections
+import gc
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+
+CASES = {
+    'web': 'import switchdeck.wsgi\n'
+           'from django.urls import get_resolver\n'
+           'get_resolver().url_patterns\n',
+    'celery': 'from switchdeck.celery import app\n'
+              'app.loader.import_default_modules()\n',
+}
+REPORT = '''
+import json, time
+start = time.perf_counter()
+{code}
+print(json.dumps({{'seconds': time.perf_counter() - start}}))
+'''
+
+
+def parse_importtime(output: str) -> dict:
+    """Return self import time in seconds by top level packages."""
+    packages = collections.Counter()
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(self_us) / 1e6
+    return packages
+
+
+def _env() -> dict:
+    env = {**os.environ}
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'switchdeck.settings.dev')
+    return env
+
+
+def run_case(name: str) -> dict:
+    env = _env()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         REPORT.format(code=CASES[name])],
+        capture_output=True, text=True, env=env, check=True)
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result['packages'] = parse_importtime(process.stderr)
+    return result
+
+
+def memory(pid: int) -> dict:
+    """Return unique and proportional memory of process in MB."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            if name in ('Pss', 'Private_Clean', 'Private_Dirty'):
+                values[name] = int(value.split()[0]) / 1024
+    return {'uss_mb': values['Private_Clean'] + values['Private_Dirty'],
+            'pss_mb': values['Pss']}
+
+
+def load_worker() -> None:
+    """Load the site as worker does before its first responses."""
+    import switchdeck.wsgi  # noqa: F401
+    from switchdeck.apps.core.startup import warm_up
+    warm_up()
+    gc.collect()
+
+
+def measure_workers(workers: int, preload: bool) -> dict:
+    """Fork workers, return memory of master and of every worker."""
+    if preload:
+        import switchdeck.wsgi  # noqa: F401
+        from switchdeck.apps.core.startup import prepare_fork
+        prepare_fork()
+    ready, notify = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready)
+            load_worker()
+            os.write(notify, b'.')
+            signal.pause()
+            os._exit(0)
+        pids.append(pid)
+    os.close(notify)
+    loaded = 0
+    while loaded < workers:
+        loaded += len(os.read(ready, workers))
+    try:
+        return {'master': memory(os.getpid()),
+                'workers': [memory(pid) for pid in pids]}
+    finally:
+        for pid in pids:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+
+
+def run_workers(workers: int, preload: bool) -> dict:
+    command = [sys.executable, '-m', 'benchmarks.startup',
+               '--measure-workers', str(workers)]
+    if preload:
+        command.append('--preload')
+    process = subprocess.run(command, capture_output=True, text=True,
+                             env=_env(), check=True)
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def run(top: int = 15, workers: int = 4) -> dict:
+    results = {}
+    for name in CASES:
+        result = results[name] = run_case(name)
+        print(f'{name}: {result["seconds"]:.2f} s')
+        for package, seconds in result['packages'].most_common(top):
+            print(f'  {package:<30} {seconds * 1000:>8.1f} ms')
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print('memory of workers: /proc/<pid>/smaps_rollup is not available')
+        return results
+    print(f'memory of {workers} workers, MB:')
+    for preload in (False, True):
+        result = run_workers(workers, preload)
+        uss = statistics.mean(x['uss_mb'] for x in result['workers'])
+        pss = statistics.mean(x['pss_mb'] for x in result['workers'])
+        total = result['master']['pss_mb'] + sum(
+            x['pss_mb'] for x in result['workers'])
+        name = 'preload' if preload else 'no preload'
+        print(f'  {name:<12} worker USS {uss:>7.1f}  worker PSS {pss:>7.1f}'
+              f'  total PSS {total:>7.1f}')
+        results[name] = result
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--workers', type=int, default=4)
+    # internal: measure forked workers in this process
+    parser.add_argument('--measure-workers', type=int,
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--preload', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure_workers:
+        print(json.dumps(measure_workers(args.measure_workers, args.preload)))
+    else:
+        run(args.top, args.workers)
@@ -1,6 +1,20 @@
 import multiprocessing
+import os
 
 wsgi_app = 'switchdeck.wsgi'
 bind = '0.0.0.0:8000'
-workers = multiprocessing.cpu_count() * 2 + 1
-forwarded_allow_ips = 'nginx'
\ No newline at end of file
+# every worker holds a persistent connection to database, connections of
+# all instances are pooled by PgBouncer (see PGBOUNCER_HOST)
+workers = int(os.environ.get('GUNICORN_WORKERS',
+                             multiprocessing.cpu_count() * 2 + 1))
+forwarded_allow_ips = 'nginx'
+# site is imported once by master and its memory is shared by workers,
+# see switchdeck.apps.core.startup. Code is reloaded by restart then,
+# HUP signal forks workers with the same code.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        from switchdeck.apps.core.startup import prepare_fork
+        prepare_fork()
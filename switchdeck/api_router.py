@@ -7,6 +7,7 @@ from switchdeck.apps.place.api.views import PlaceViewSet
 from switchdeck.apps.users.api.views import ProfileViewSet, UserViewSet
 from switchdeck.apps.game.api.views import GameViewSet
 from switchdeck.apps.chat.api.views import DialogViewSet
+from switchdeck.apps.notifications.api.views import NotificationViewSet
 
 router = routers.DefaultRouter()
 router.register('places', PlaceViewSet)
@@ -16,4 +17,16 @@ router.register('lots', LotViewSet)
 router.register('users', UserViewSet)
 router.register('comments', CommentViewSet)
 router.register('dialogs', DialogViewSet)
+router.register('notifications', NotificationViewSet)
+
+# Most queries of requests by url names, checked by tests
+query_budgets = {
+    'place-list': 4,
+    'profile-list': 5,
+    'game-list': 4,
+    'lot-list': 6,
+    'user-list': 4,
+    'comment-list': 3,
+    'dialog-list': 7,
+}
 
@@ -1,5 +1,3 @@
-from bs4 import BeautifulSoup
-import requests
 from decimal import Decimal
 from tempfile import NamedTemporaryFile
 
@@ -84,6 +82,10 @@ class Link(models.Model):
         return gettext(f'{self.game.name} in {self.catalog.name}')
 
     def parse(self):
+        # parser and http client are heavy, only celery tasks need them
+        import requests
+        from bs4 import BeautifulSoup
+
         page = None
         try:
             resp = requests.get(self.url)
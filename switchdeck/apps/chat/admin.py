@@ -1,10 +1,10 @@
 from django.contrib import admin
 
-from .models import Dialog, Message
+from .models import Dialog, Message, ArchivedMessage
 
 @admin.register(Dialog)
 class DialogAdmin(admin.ModelAdmin):
-    list_display = ('uuid', 'participant1', 'participant2')
+    list_display = ('uuid', 'participant1', 'participant2', 'last_message_at')
     # readonly_fields = ('participant1', 'participant2')
 
 @admin.register(Message)
@@ -13,3 +13,15 @@ class MessageAdmin(admin.ModelAdmin):
     # readonly_fields = ('dialog', 'sender')
     list_filter=('sender', )
     date_hierarchy = 'datetime'
+
+
+@admin.register(ArchivedMessage)
+class ArchivedMessageAdmin(admin.ModelAdmin):
+    list_display = ('text', 'sender', 'datetime')
+    date_hierarchy = 'datetime'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,120 @@
+"""Keyset pagination of dialog history."""
+import base64
+import binascii
+import uuid
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+def encode_cursor(message) -> str:
+    """Return opaque cursor of message position."""
+    position = f'{message.datetime.isoformat()}|{message.uuid}'
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor: str, param: str = 'cursor'):
+    """Return ``(datetime, uuid)`` position of cursor from query ``param``."""
+    try:
+        position = base64.urlsafe_b64decode(cursor.encode()).decode()
+        datetime, message_uuid = position.split('|')
+        datetime = parse_datetime(datetime)
+        message_uuid = uuid.UUID(message_uuid)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        datetime = None
+    if datetime is None:
+        raise ValidationError({param: ['Invalid cursor.']})
+    return datetime, message_uuid
+
+
+class MessageHistoryPagination:
+    """
+    Keyset pagination of messages by ``(datetime, uuid)``.
+
+    ``?cursor=`` returns page of older messages, newest first, with link
+    to the next (older) page. ``?since=`` returns messages newer than
+    cursor, oldest first, to sync client incrementally.
+    """
+
+    page_size = 50
+    max_page_size = 200
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params['page_size'])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def filter_queryset(self, queryset):
+        """Return queryset ordered and filtered by cursor of request."""
+        if self.since:
+            datetime, message_uuid = decode_cursor(
+                self.request.query_params['since'], 'since')
+            # range bound limits scan of index of (dialog, datetime, uuid)
+            return queryset\
+                .filter(Q(datetime__gt=datetime)
+                        | Q(datetime=datetime, uuid__gt=message_uuid),
+                        datetime__gte=datetime)\
+                .order_by('datetime', 'uuid')
+        queryset = queryset.order_by('-datetime', '-uuid')
+        if 'cursor' in self.request.query_params:
+            datetime, message_uuid = decode_cursor(
+                self.request.query_params['cursor'])
+            queryset = queryset.filter(
+                Q(datetime__lt=datetime)
+                | Q(datetime=datetime, uuid__lt=message_uuid),
+                datetime__lte=datetime)
+        return queryset
+
+    def paginate_queryset(self, queryset, request, view=None, archive=None):
+        """
+        Return page of messages.
+
+        ``archive`` is queryset of older messages, read only when
+        ``queryset`` has not enough of them to fill the page.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.since = 'since' in request.query_params
+        querysets = [queryset]
+        if archive is not None:
+            # archived messages are older than any message of queryset
+            querysets = [archive, queryset] if self.since \
+                else [queryset, archive]
+        page = []
+        for source in querysets:
+            limit = self.page_size + 1 - len(page)
+            page += list(self.filter_queryset(source)[:limit])
+            if len(page) > self.page_size:
+                break
+        self.has_more = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if self.since or not self.has_more:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, 'cursor',
+                                   encode_cursor(self.page[-1]))
+
+    def get_since_link(self):
+        """Return link to fetch messages newer than fetched ones."""
+        url = remove_query_param(self.request.build_absolute_uri(), 'cursor')
+        if not self.page:
+            # nothing new yet, poll with same cursor
+            return url if self.since else None
+        newest = self.page[-1] if self.since else self.page[0]
+        return replace_query_param(url, 'since', encode_cursor(newest))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'since': self.get_since_link(),
+            'has_more': self.has_more,
+            'results': data,
+        })
@@ -1,13 +1,42 @@
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
 from ..models import Dialog, Message
 
 class DialogSerializer(serializers.ModelSerializer):
+    unread = serializers.SerializerMethodField()
+
     class Meta:
         model = Dialog
-        fields = ['uuid', 'participant1', 'participant2']
+        fields = ['uuid', 'participant1', 'participant2', 'last_message_at',
+                  'last_message_text', 'last_message_sender', 'unread']
+
+    def get_unread(self, obj) -> int:
+        """Return amount of messages unread by requesting user."""
+        return obj.unread_for(self.context['request'].user)
+
+
+class DialogCreateSerializer(serializers.Serializer):
+    participant = serializers.PrimaryKeyRelatedField(
+        queryset=get_user_model().objects.filter(is_active=True))
+
+    def validate_participant(self, value):
+        if value == self.context['request'].user:
+            raise serializers.ValidationError(
+                'Dialog with yourself is not allowed.')
+        return value
+
+
+class ReadMarkerSerializer(serializers.Serializer):
+    message = serializers.UUIDField(required=False)
 
 class MessageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Message
-        fields = ('uuid', 'dialog', 'sender', 'text', 'datetime')
\ No newline at end of file
+        fields = ('uuid', 'dialog', 'sender', 'text', 'datetime')
+
+
+class BulkMessagesSerializer(serializers.Serializer):
+    messages = serializers.ListField(
+        child=serializers.DictField(), max_length=5000)
+    unread = serializers.BooleanField(default=True)
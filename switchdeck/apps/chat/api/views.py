@@ -1,19 +1,101 @@
-from rest_framework import viewsets, permissions, mixins
+from rest_framework import viewsets, permissions, mixins, status
+from django.core.exceptions import ValidationError
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError as APIValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
 
-from .serializers import Dialog, DialogSerializer
+from ..ingest import ingest_messages
+from .pagination import MessageHistoryPagination
+from .serializers import (Dialog, DialogSerializer, DialogCreateSerializer,
+                          MessageSerializer, ReadMarkerSerializer,
+                          BulkMessagesSerializer)
 
 class DialogViewSet(
     mixins.ListModelMixin,
+    mixins.CreateModelMixin,
     viewsets.GenericViewSet
     ):
 
     serializer_class = DialogSerializer
     queryset = Dialog.objects.all()
+    permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Dialog.objects\
-            .filter_by_user(self.request.user)\
-            .select_related('participant1', 'participant2')
+        """Inbox of user, recently active dialogs first."""
+        if self.action == 'list':
+            return Dialog.objects.inbox(self.request.user)
+        # single dialog is looked up by primary key
+        return Dialog.objects.filter_by_user(self.request.user)
 
-            
+    def create(self, request, *args, **kwargs):
+        """
+        Return dialog with ``participant``, create it if needed.
 
+        Response status is 201 for new dialog and 200 for existing one.
+        """
+        serializer = DialogCreateSerializer(data=request.data,
+                                            context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        dialog, created = Dialog.objects.get_or_create_room(
+            request.user, serializer.validated_data['participant'])
+        return Response(
+            self.get_serializer(dialog).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    @action(detail=True, serializer_class=MessageSerializer,
+            pagination_class=MessageHistoryPagination)
+    def messages(self, request, pk=None):
+        """
+        History of dialog messages, newest first.
+
+        Paginated by ``(datetime, uuid)`` cursors, ``?since=`` returns
+        messages newer than cursor. Archived messages are read through
+        when user scrolls back.
+        """
+        dialog = self.get_object()
+        page = self.paginator.paginate_queryset(
+            dialog.messages.all(), request, view=self,
+            archive=dialog.archived_messages.all())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['post'],
+            serializer_class=ReadMarkerSerializer)
+    def read(self, request, pk=None):
+        """
+        Mark dialog as read by user.
+
+        Optional ``message`` marks messages only up to given one.
+        """
+        dialog = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        message = None
+        if 'message' in serializer.validated_data:
+            message = get_object_or_404(
+                dialog.messages, pk=serializer.validated_data['message'])
+        unread = dialog.mark_read(request.user, message)
+        return Response({'unread': unread})
+
+    @action(detail=False, methods=['post'], url_path='messages/bulk',
+            serializer_class=BulkMessagesSerializer,
+            permission_classes=[permissions.IsAdminUser])
+    def bulk_messages(self, request):
+        """
+        Insert batch of messages, for imports and system bots.
+
+        Messages are validated all together, nothing is stored if any of
+        them is invalid.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        messages = serializer.validated_data['messages']
+        try:
+            inserted = ingest_messages(
+                messages, batch_size=len(messages) or 1,
+                unread=serializer.validated_data['unread'])
+        except ValidationError as e:
+            raise APIValidationError({'messages': e.message_dict})
+        return Response({'inserted': inserted},
+                        status=status.HTTP_201_CREATED)
@@ -1,2 +1,4 @@
 DIALOG_DB_TABLE_NAME = 'chat_dialogs'
-MESSAGE_DB_TABLE_NAME = 'chat_messages'
\ No newline at end of file
+MESSAGE_DB_TABLE_NAME = 'chat_messages'
+ARCHIVED_MESSAGE_DB_TABLE_NAME = 'chat_messages_archive'
+SNIPPET_LENGTH = 100
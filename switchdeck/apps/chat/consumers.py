@@ -0,0 +1,95 @@
+"""Websocket consumers of chat."""
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.core.exceptions import ValidationError
+
+from .models import Dialog, Message
+from .realtime import dialog_group_name, message_event
+
+
+class DialogConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Real-time events of one dialog.
+
+    Accepts only participants of dialog. Client sends JSON events:
+
+    ``{"type": "message", "text": "..."}``
+        New message. Saved and pushed to all participants.
+    ``{"type": "typing"}``
+        Sender is typing. Pushed to all participants.
+    ``{"type": "read", "message": "<uuid>"}``
+        Sender has read messages up to given one.
+    """
+
+    async def connect(self):
+        self.user = self.scope['user']
+        self.dialog_uuid = self.scope['url_route']['kwargs']['dialog']
+        if not self.user.is_authenticated \
+                or not await self.is_participant():
+            await self.close()
+            return
+        self.group_name = dialog_group_name(self.dialog_uuid)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name,
+                                                   self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        event_type = content.get('type')
+        if event_type == 'message':
+            try:
+                message = await self.save_message(content.get('text', ''))
+            except ValidationError as e:
+                await self.send_json({'type': 'error',
+                                      'errors': e.messages})
+                return
+            await self.channel_layer.group_send(self.group_name,
+                                                message_event(message))
+        elif event_type == 'typing':
+            await self.channel_layer.group_send(self.group_name, {
+                'type': 'chat.typing', 'sender': self.user.pk})
+        elif event_type == 'read':
+            if not await self.mark_read(content.get('message')):
+                return
+            await self.channel_layer.group_send(self.group_name, {
+                'type': 'chat.read', 'sender': self.user.pk,
+                'message': content.get('message')})
+
+    async def chat_message(self, event):
+        await self.send_json({**event, 'type': 'message'})
+
+    async def chat_typing(self, event):
+        if event['sender'] != self.user.pk:
+            await self.send_json({**event, 'type': 'typing'})
+
+    async def chat_read(self, event):
+        await self.send_json({**event, 'type': 'read'})
+
+    @database_sync_to_async
+    def is_participant(self) -> bool:
+        return Dialog.objects.filter_by_user(self.user)\
+            .filter(pk=self.dialog_uuid).exists()
+
+    @database_sync_to_async
+    def save_message(self, text: str) -> Message:
+        message = Message(dialog_id=self.dialog_uuid, sender=self.user,
+                          text=text)
+        message.full_clean(exclude=['dialog', 'sender'])
+        message.save()
+        return message
+
+    @database_sync_to_async
+    def mark_read(self, message_uuid) -> bool:
+        """Move read marker of user, return False for unknown message."""
+        dialog = Dialog.objects.get(pk=self.dialog_uuid)
+        message = None
+        if message_uuid:
+            try:
+                message = dialog.messages.get(pk=message_uuid)
+            except (Message.DoesNotExist, ValidationError):
+                return False
+        dialog.mark_read(self.user, message)
+        return True
@@ -0,0 +1,162 @@
+"""
+Bulk ingestion of chat messages.
+
+Used to import history of trade negotiations and by system bots posting
+lot updates into dialogs. Messages are validated and inserted by batches
+with ``bulk_create``, inbox state of every dialog is updated once per
+batch. New unread messages are pushed to connected participants after
+commit.
+"""
+import datetime
+import uuid
+from collections import defaultdict
+from functools import partial
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Dialog, Message, ArchivedMessage
+from .partitions import archived_months, month_start
+from .realtime import broadcast_message
+
+MAX_TEXT_LENGTH = Message._meta.get_field('text').max_length
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _parse_uuid(value, field: str, errors: list):
+    try:
+        return value if isinstance(value, uuid.UUID) else uuid.UUID(value)
+    except (AttributeError, TypeError, ValueError):
+        errors.append(f'{field}: invalid uuid.')
+
+
+def build_messages(rows, start: int = 0) -> list:
+    """
+    Return unsaved messages of ``rows``.
+
+    Row is dict with ``dialog`` uuid, ``text``, optional ``sender`` user id
+    (``None`` for system message), ``datetime`` and ``uuid``. Sender must be
+    participant of dialog. Raise ``ValidationError`` with errors of every
+    invalid row, keyed by row number counted from ``start``.
+    """
+    errors = {}
+    parsed = []
+    for number, row in enumerate(rows, start):
+        row_errors = []
+        if not isinstance(row, dict):
+            errors[number] = ['Row must be an object.']
+            continue
+        dialog_id = _parse_uuid(row.get('dialog'), 'dialog', row_errors)
+        message_uuid = uuid.uuid4()
+        if row.get('uuid') is not None:
+            message_uuid = _parse_uuid(row['uuid'], 'uuid', row_errors)
+        text = row.get('text')
+        if not isinstance(text, str) or not text.strip():
+            row_errors.append('text: this field is required.')
+        elif len(text) > MAX_TEXT_LENGTH:
+            row_errors.append(f'text: more than {MAX_TEXT_LENGTH} '
+                              'characters.')
+        moment = row.get('datetime') or timezone.now()
+        if isinstance(moment, str):
+            try:
+                moment = parse_datetime(moment)
+            except ValueError:
+                moment = None
+        if not isinstance(moment, datetime.datetime) \
+                or timezone.is_naive(moment):
+            row_errors.append('datetime: invalid, time zone required.')
+        sender = row.get('sender')
+        if sender is not None and (isinstance(sender, bool)
+                                   or not isinstance(sender, int)):
+            row_errors.append('sender: invalid user id.')
+        if row_errors:
+            errors[number] = row_errors
+            continue
+        parsed.append((number, Message(
+            uuid=message_uuid, dialog_id=dialog_id, sender_id=sender,
+            text=text, datetime=moment)))
+
+    dialogs = Dialog.objects.in_bulk(
+        {message.dialog_id for _, message in parsed})
+    messages = []
+    for number, message in parsed:
+        dialog = dialogs.get(message.dialog_id)
+        if dialog is None:
+            errors[number] = ['dialog: does not exist.']
+        elif message.sender_id is not None \
+                and not dialog.participant_number(message.sender_id):
+            errors[number] = ['sender: not participant of dialog.']
+        else:
+            message.dialog = dialog
+            messages.append(message)
+    if errors:
+        raise ValidationError({str(number): messages
+                               for number, messages in errors.items()})
+    return messages
+
+
+def insert_messages(messages, unread: bool = True) -> int:
+    """
+    Insert batch of built messages, return amount of inserted ones.
+
+    Messages already stored, by uuid, are skipped, so import can be
+    repeated. Old messages go directly to archive. Inbox state of dialogs
+    is updated once per batch. Hot messages are broadcast to websocket
+    clients after commit, unless they are imported as read history.
+    """
+    with transaction.atomic():
+        uuids = [message.uuid for message in messages]
+        existing = set(Message.objects.filter(pk__in=uuids).order_by()
+                       .values_list('pk', flat=True))
+        existing.update(ArchivedMessage.objects.filter(pk__in=uuids)
+                        .order_by().values_list('pk', flat=True))
+        messages = [message for message in messages
+                    if message.uuid not in existing]
+        archived = archived_months(
+            {month_start(message.datetime.date()) for message in messages})
+        hot, old = [], []
+        for message in messages:
+            if month_start(message.datetime.date()) in archived:
+                old.append(ArchivedMessage(
+                    uuid=message.uuid, dialog_id=message.dialog_id,
+                    sender_id=message.sender_id, text=message.text,
+                    datetime=message.datetime))
+            else:
+                hot.append(message)
+        Message.objects.bulk_create(hot)
+        ArchivedMessage.objects.bulk_create(old)
+        by_dialog = defaultdict(list)
+        for message in messages:
+            by_dialog[message.dialog].append(message)
+        for dialog, dialog_messages in by_dialog.items():
+            dialog.register_messages(dialog_messages, unread=unread)
+        if unread:
+            for message in hot:
+                transaction.on_commit(partial(broadcast_message, message))
+    return len(messages)
+
+
+def ingest_messages(rows, batch_size: int = DEFAULT_BATCH_SIZE,
+                    unread: bool = True) -> int:
+    """
+    Validate and insert messages of ``rows`` by batches.
+
+    Every batch is validated and stored atomically, stored batches are
+    kept if later one is invalid. Return amount of inserted messages.
+    """
+    inserted = 0
+    batch = []
+    start = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            inserted += insert_messages(build_messages(batch, start),
+                                        unread=unread)
+            start += len(batch)
+            batch = []
+    if batch:
+        inserted += insert_messages(build_messages(batch, start),
+                                    unread=unread)
+    return inserted
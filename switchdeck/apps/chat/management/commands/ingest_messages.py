@@ -0,0 +1,42 @@
+import json
+import sys
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from switchdeck.apps.chat.ingest import DEFAULT_BATCH_SIZE, ingest_messages
+
+
+class Command(BaseCommand):
+    help = ('Import chat messages from JSON lines file, one message object '
+            'per line with "dialog", "text" and optional "sender", '
+            '"datetime" and "uuid".')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, "-" for stdin.')
+        parser.add_argument('--batch-size', type=int,
+                            default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--read', action='store_true',
+                            help='Do not count messages as unread.')
+
+    def rows(self, file):
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise CommandError(f'Line {number}: {e}')
+
+    def handle(self, *args, path, batch_size, read, **options):
+        file = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        try:
+            inserted = ingest_messages(self.rows(file), batch_size=batch_size,
+                                       unread=not read)
+        except ValidationError as e:
+            raise CommandError(f'Invalid messages: {e.message_dict}')
+        finally:
+            if file is not sys.stdin:
+                file.close()
+        self.stdout.write(self.style.SUCCESS(
+            f'Inserted {inserted} messages.'))
@@ -1,16 +1,48 @@
 from django.db import models
 from django.db.models import Q
 
+
+def canonical_pair(user1, user2) -> tuple:
+    """Return ids of participants in canonical order, lower id first."""
+    ids = sorted((getattr(user1, 'pk', user1), getattr(user2, 'pk', user2)))
+    return tuple(ids)
+
+
 class DialogManager(models.Manager):
 
     def filter_by_user(self, user):
         return self.filter(Q(participant1=user) | Q(participant2=user))
 
+    def inbox(self, user):
+        """
+        Return dialogs of user, recently active first.
+
+        Union of dialogs by each participant column, every part is read
+        by its own inbox index, which OR over both columns can not use.
+        Result of union can be counted and sliced only, not filtered.
+        """
+        first = self.filter(participant1=user)
+        # dialog with oneself is not created, but is not listed twice
+        second = self.filter(participant2=user).exclude(participant1=user)
+        return first.union(second, all=True)\
+            .order_by('-last_message_at', '-uuid')
+
     def filter_users_room(self, user1, user2):
-        return self.filter(
-            Q(participant1=user1, participant2=user2) 
-            | Q(participant1=user2, participant2=user1)
-        )
+        """Return dialog of two users, single hit of unique index."""
+        participant1, participant2 = canonical_pair(user1, user2)
+        return self.filter(participant1=participant1,
+                           participant2=participant2)
 
     def get_user_room(self, user1, user2):
-        return self.filter_users_room(user1, user2).get()
\ No newline at end of file
+        return self.filter_users_room(user1, user2).get()
+
+    def get_or_create_room(self, user1, user2):
+        """
+        Return ``(dialog, created)`` of two users.
+
+        Race-free: concurrent creation is resolved by unique constraint,
+        loser of race gets dialog created by winner.
+        """
+        participant1, participant2 = canonical_pair(user1, user2)
+        return self.get_or_create(participant1_id=participant1,
+                                  participant2_id=participant2)
@@ -0,0 +1,27 @@
+# Generated by Django 4.0 on 2026-10-19 18:18
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0001_squashed_0004_auto_20210509_1929'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='message',
+            options={'get_latest_by': 'datetime', 'ordering': ('-datetime', '-uuid'), 'verbose_name': 'Message', 'verbose_name_plural': 'Messages'},
+        ),
+        migrations.AlterField(
+            model_name='message',
+            name='datetime',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Date and time'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['dialog', '-datetime', '-uuid'], name='message_dialog_history_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.0 on 2026-10-19 18:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def fill_last_messages(apps, schema_editor):
+    """Fill last message of dialogs, old messages are counted as read."""
+    Dialog = apps.get_model('chat', 'Dialog')
+    Message = apps.get_model('chat', 'Message')
+    for dialog in Dialog.objects.iterator():
+        message = Message.objects.filter(dialog=dialog)\
+            .order_by('-datetime', '-uuid').first()
+        if message is None:
+            continue
+        Dialog.objects.filter(pk=dialog.pk).update(
+            last_message_at=message.datetime,
+            last_message_text=message.text[:100],
+            last_message_sender=message.sender_id,
+            read_at1=message.datetime,
+            read_at2=message.datetime)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_auto_20210509_1914'),
+        ('chat', '0002_message_history_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dialog',
+            name='last_message_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Last activity time'),
+        ),
+        migrations.AddField(
+            model_name='dialog',
+            name='last_message_sender',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='users.user', verbose_name='Last message sender'),
+        ),
+        migrations.AddField(
+            model_name='dialog',
+            name='last_message_text',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Last message'),
+        ),
+        migrations.AddField(
+            model_name='dialog',
+            name='read_at1',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Read by first participant until'),
+        ),
+        migrations.AddField(
+            model_name='dialog',
+            name='read_at2',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Read by second participant until'),
+        ),
+        migrations.AddField(
+            model_name='dialog',
+            name='unread1',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Unread by first participant'),
+        ),
+        migrations.AddField(
+            model_name='dialog',
+            name='unread2',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Unread by second participant'),
+        ),
+        migrations.AddIndex(
+            model_name='dialog',
+            index=models.Index(fields=['participant1', '-last_message_at'], name='dialog_inbox1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dialog',
+            index=models.Index(fields=['participant2', '-last_message_at'], name='dialog_inbox2_idx'),
+        ),
+        migrations.RunPython(fill_last_messages, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+from django.db.models import F
+
+
+def merge_reversed_dialogs(apps, schema_editor):
+    """
+    Store participants of dialogs lower id first.
+
+    Dialog stored in reversed order is swapped, or merged into dialog of
+    the same pair, if it exists: messages are moved, inbox state combined.
+    """
+    Dialog = apps.get_model('chat', 'Dialog')
+    Message = apps.get_model('chat', 'Message')
+    reversed_dialogs = Dialog.objects.filter(
+        participant1__gt=F('participant2'))
+    for dialog in reversed_dialogs.iterator():
+        twin = Dialog.objects.filter(
+            participant1=dialog.participant2_id,
+            participant2=dialog.participant1_id).first()
+        if twin is None:
+            Dialog.objects.filter(pk=dialog.pk).update(
+                participant1=dialog.participant2_id,
+                participant2=dialog.participant1_id,
+                unread1=dialog.unread2, unread2=dialog.unread1,
+                read_at1=dialog.read_at2, read_at2=dialog.read_at1)
+            continue
+        Message.objects.filter(dialog=dialog).update(dialog=twin)
+        twin.unread1 += dialog.unread2
+        twin.unread2 += dialog.unread1
+        twin.read_at1 = max(filter(None, [twin.read_at1, dialog.read_at2]),
+                            default=None)
+        twin.read_at2 = max(filter(None, [twin.read_at2, dialog.read_at1]),
+                            default=None)
+        if dialog.last_message_at > twin.last_message_at:
+            twin.last_message_at = dialog.last_message_at
+            twin.last_message_text = dialog.last_message_text
+            twin.last_message_sender_id = dialog.last_message_sender_id
+        twin.save()
+        dialog.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_dialog_inbox'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_reversed_dialogs,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.0 on 2026-10-19 18:22
+
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_merge_reversed_dialogs'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='dialog',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='dialog',
+            constraint=models.UniqueConstraint(fields=('participant1', 'participant2'), name='dialog_participants_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='dialog',
+            constraint=models.CheckConstraint(check=models.Q(('participant1__lte', django.db.models.expressions.F('participant2'))), name='dialog_participants_ordered'),
+        ),
+    ]
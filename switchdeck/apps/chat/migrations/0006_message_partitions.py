@@ -0,0 +1,131 @@
+# Generated by Django 4.0 on 2026-10-19 18:24
+
+import datetime
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+def _month_start(value, shift=0):
+    months = value.year * 12 + value.month - 1 + shift
+    return datetime.date(months // 12, months % 12 + 1, 1)
+
+
+def _restore_constraints(schema_editor, table, constraints):
+    """Recreate constraints and indexes under names given them by Django."""
+    qn = schema_editor.quote_name
+    for name, constraint in constraints.items():
+        columns = constraint['columns']
+        if constraint['primary_key']:
+            # key of partitioned table must include partitioning column
+            schema_editor.execute(
+                f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} '
+                f'PRIMARY KEY ({", ".join(map(qn, columns))}, datetime)')
+        elif constraint['foreign_key']:
+            to_table, to_column = constraint['foreign_key']
+            schema_editor.execute(
+                f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} '
+                f'FOREIGN KEY ({", ".join(map(qn, columns))}) '
+                f'REFERENCES {qn(to_table)} ({qn(to_column)}) '
+                'DEFERRABLE INITIALLY DEFERRED')
+        elif constraint['index']:
+            orders = constraint.get('orders') or ['ASC'] * len(columns)
+            expressions = ', '.join(f'{qn(column)} {order}' for column, order
+                                    in zip(columns, orders))
+            schema_editor.execute(
+                f'CREATE INDEX {qn(name)} ON {qn(table)} ({expressions})')
+
+
+def _partition_table(schema_editor, model, first_month=None, last_month=None):
+    """Recreate table of model as partitioned by month, keep its rows."""
+    qn = schema_editor.quote_name
+    table = model._meta.db_table
+    old_table = f'{table}_unpartitioned'
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    schema_editor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(old_table)}')
+    schema_editor.execute(
+        f'CREATE TABLE {qn(table)} ('
+        'uuid uuid NOT NULL, '
+        'dialog_id uuid NOT NULL, '
+        'sender_id integer NULL, '
+        'text varchar(200) NOT NULL, '
+        'datetime timestamp with time zone NOT NULL'
+        ') PARTITION BY RANGE (datetime)')
+    month = first_month
+    while month is not None and month <= last_month:
+        next_month = _month_start(month, 1)
+        schema_editor.execute(
+            f'CREATE TABLE {qn(f"{table}_p{month:%Y%m}")} PARTITION OF '
+            f'{qn(table)} FOR VALUES FROM (%s) TO (%s)',
+            [month.isoformat(), next_month.isoformat()])
+        month = next_month
+    schema_editor.execute(
+        f'INSERT INTO {qn(table)} (uuid, dialog_id, sender_id, text, datetime) '
+        f'SELECT uuid, dialog_id, sender_id, text, datetime '
+        f'FROM {qn(old_table)}')
+    # names are free once old table is dropped
+    schema_editor.execute(f'DROP TABLE {qn(old_table)}')
+    _restore_constraints(schema_editor, table, constraints)
+
+
+def partition_message_tables(apps, schema_editor):
+    """
+    Partition hot and archive message tables by month on PostgreSQL.
+
+    Hot table gets partitions for all months with messages, two months
+    ahead and default one as safety net. Old months are moved to archive
+    by ``maintain_message_partitions`` task.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Message = apps.get_model('chat', 'Message')
+    ArchivedMessage = apps.get_model('chat', 'ArchivedMessage')
+    first = Message.objects.aggregate(first=models.Min('datetime'))['first']
+    today = django.utils.timezone.now().date()
+    first_month = _month_start(first.date() if first else today)
+    _partition_table(schema_editor, Message, first_month,
+                     _month_start(today, 2))
+    qn = schema_editor.quote_name
+    table = Message._meta.db_table
+    schema_editor.execute(f'CREATE TABLE {qn(f"{table}_default")} '
+                          f'PARTITION OF {qn(table)} DEFAULT')
+    _partition_table(schema_editor, ArchivedMessage)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_auto_20210509_1914'),
+        ('chat', '0005_dialog_participants_constraint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMessage',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Unique identifier', primary_key=True, serialize=False)),
+                ('text', models.CharField(max_length=200, verbose_name='Text')),
+                ('datetime', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Date and time')),
+                ('dialog', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_messages', related_query_name='archived_message', to='chat.dialog', verbose_name='Dialog')),
+                ('sender', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='users.user', verbose_name='Sender')),
+            ],
+            options={
+                'verbose_name': 'Archived message',
+                'verbose_name_plural': 'Archived messages',
+                'db_table': 'chat_messages_archive',
+                'ordering': ('-datetime', '-uuid'),
+                'get_latest_by': 'datetime',
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedmessage',
+            index=models.Index(fields=['dialog', '-datetime', '-uuid'], name='archived_message_history_idx'),
+        ),
+        migrations.RunPython(partition_message_tables,
+                             migrations.RunPython.noop),
+    ]
@@ -1,11 +1,14 @@
 import uuid
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
 
 from .managers import DialogManager
-from .constants import DIALOG_DB_TABLE_NAME, MESSAGE_DB_TABLE_NAME
+from .constants import (DIALOG_DB_TABLE_NAME, MESSAGE_DB_TABLE_NAME,
+                        ARCHIVED_MESSAGE_DB_TABLE_NAME, SNIPPET_LENGTH)
 
 class Dialog(models.Model):
     uuid = models.UUIDField(
@@ -28,6 +31,39 @@ class Dialog(models.Model):
         null=False, blank=False,
         verbose_name=_('Second participant')
     )
+    # Denormalized state of inbox, updated with every new message.
+    last_message_at = models.DateTimeField(
+        default=timezone.now, editable=False,
+        verbose_name=_('Last activity time')
+    )
+    last_message_text = models.CharField(
+        max_length=SNIPPET_LENGTH,
+        blank=True, editable=False,
+        verbose_name=_('Last message')
+    )
+    last_message_sender = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.SET_NULL,
+        related_name='+',
+        null=True, blank=True, editable=False,
+        verbose_name=_('Last message sender')
+    )
+    unread1 = models.PositiveIntegerField(
+        default=0, editable=False,
+        verbose_name=_('Unread by first participant')
+    )
+    unread2 = models.PositiveIntegerField(
+        default=0, editable=False,
+        verbose_name=_('Unread by second participant')
+    )
+    read_at1 = models.DateTimeField(
+        null=True, blank=True, editable=False,
+        verbose_name=_('Read by first participant until')
+    )
+    read_at2 = models.DateTimeField(
+        null=True, blank=True, editable=False,
+        verbose_name=_('Read by second participant until')
+    )
 
     objects = DialogManager()
 
@@ -35,25 +71,138 @@ class Dialog(models.Model):
         verbose_name = _('Dialog')
         verbose_name_plural = _('Dialogs')
         db_table=DIALOG_DB_TABLE_NAME
-        unique_together=('participant1', 'participant2')
+        constraints = [
+            models.UniqueConstraint(fields=['participant1', 'participant2'],
+                                    name='dialog_participants_uniq'),
+            # one row per pair of users: participants stored lower id first
+            models.CheckConstraint(
+                check=Q(participant1__lte=F('participant2')),
+                name='dialog_participants_ordered'),
+        ]
+        indexes = [
+            # inbox of participant, ordered by recent activity
+            models.Index(fields=['participant1', '-last_message_at'],
+                         name='dialog_inbox1_idx'),
+            models.Index(fields=['participant2', '-last_message_at'],
+                         name='dialog_inbox2_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # keep canonical order of participants, with their inbox state
+        if self.participant1_id > self.participant2_id:
+            self.participant1_id, self.participant2_id = \
+                self.participant2_id, self.participant1_id
+            self.unread1, self.unread2 = self.unread2, self.unread1
+            self.read_at1, self.read_at2 = self.read_at2, self.read_at1
+        super().save(*args, **kwargs)
+
+    def participant_number(self, user) -> int:
+        """Return 1 or 2 for participant ``user`` of dialog, else 0."""
+        user_id = getattr(user, 'pk', user)
+        if user_id == self.participant1_id:
+            return 1
+        if user_id == self.participant2_id:
+            return 2
+        return 0
 
-    
+    def unread_for(self, user) -> int:
+        """Return amount of messages unread by participant ``user``."""
+        number = self.participant_number(user)
+        return getattr(self, f'unread{number}') if number else 0
 
+    @staticmethod
+    def _last_message_update(message) -> dict:
+        """Return update of last message, applied only if it is newer."""
+        newer = Q(last_message_at__lte=message.datetime)
+        return {
+            'last_message_at': Case(
+                When(newer, then=Value(message.datetime)),
+                default=F('last_message_at')),
+            'last_message_text': Case(
+                When(newer, then=Value(message.text[:SNIPPET_LENGTH])),
+                default=F('last_message_text')),
+            'last_message_sender': Case(
+                When(newer, then=Value(message.sender_id)),
+                default=F('last_message_sender'),
+                output_field=models.IntegerField()),
+        }
 
-class Message(models.Model):
+    @staticmethod
+    def register_message(message) -> int:
+        """
+        Update inbox state of dialog of new ``message`` in one query.
+
+        Unread counter of every participant, except sender, is incremented.
+        Last message is replaced only with newer one, so concurrent writers
+        can not move it back.
+        """
+        return Dialog.objects.filter(pk=message.dialog_id).update(
+            unread1=Case(When(participant1=message.sender_id,
+                              then=F('unread1')),
+                         default=F('unread1') + 1),
+            unread2=Case(When(participant2=message.sender_id,
+                              then=F('unread2')),
+                         default=F('unread2') + 1),
+            **Dialog._last_message_update(message),
+        )
+
+    def register_messages(self, messages, unread: bool = True) -> int:
+        """
+        Update inbox state of dialog with batch of new ``messages``.
+
+        One query for the whole batch, as ``register_message`` does for
+        one message. Unread counters are left as is if not ``unread``.
+        """
+        if not messages:
+            return 0
+        last = max(messages, key=lambda message: (message.datetime,
+                                                  str(message.uuid)))
+        update = self._last_message_update(last)
+        if unread:
+            update['unread1'] = F('unread1') + sum(
+                message.sender_id != self.participant1_id
+                for message in messages)
+            update['unread2'] = F('unread2') + sum(
+                message.sender_id != self.participant2_id
+                for message in messages)
+        return Dialog.objects.filter(pk=self.pk).update(**update)
+
+    def mark_read(self, user, message=None) -> int:
+        """
+        Move read marker of participant ``user`` forward.
+
+        Without ``message`` all dialog is read, else only messages up to
+        given one. Return remaining amount of unread messages.
+        """
+        number = self.participant_number(user)
+        if not number:
+            raise ValueError('User is not participant of dialog.')
+        read_at_field, unread_field = f'read_at{number}', f'unread{number}'
+        with transaction.atomic():
+            dialog = Dialog.objects.select_for_update().get(pk=self.pk)
+            read_at = getattr(dialog, read_at_field)
+            until = timezone.now() if message is None else message.datetime
+            if read_at is not None and read_at >= until:
+                return getattr(dialog, unread_field)
+            unread = 0
+            if message is not None:
+                unread = self.messages.filter(datetime__gt=until)\
+                    .exclude(sender=user).count()
+            Dialog.objects.filter(pk=self.pk).update(
+                **{read_at_field: until, unread_field: unread})
+        setattr(self, read_at_field, until)
+        setattr(self, unread_field, unread)
+        return unread
+
+
+
+class BaseMessage(models.Model):
     uuid = models.UUIDField(
         primary_key=True,
         default=uuid.uuid4,
         editable=False,
         help_text=_('Unique identifier')
     )
-    dialog = models.ForeignKey(
-        Dialog,
-        on_delete=models.CASCADE,
-        related_name='messages',
-        related_query_name='message',
-        verbose_name=_('Dialog')
-    )
     sender = models.ForeignKey(
         get_user_model(),
         on_delete=models.SET_NULL,
@@ -66,14 +215,64 @@ class Message(models.Model):
         max_length=200,
     )
     datetime = models.DateTimeField(
-        auto_now=True,
+        default=timezone.now,
         verbose_name=_('Date and time')
     )
 
     class Meta:
+        abstract = True
+        ordering = ('-datetime', '-uuid')
+        get_latest_by = ('datetime')
+
+
+class Message(BaseMessage):
+    """
+    Message of dialog.
+
+    On PostgreSQL table is partitioned by month of ``datetime``, old
+    partitions are moved to ``ArchivedMessage`` by ``partitions`` module.
+    """
+    dialog = models.ForeignKey(
+        Dialog,
+        on_delete=models.CASCADE,
+        related_name='messages',
+        related_query_name='message',
+        verbose_name=_('Dialog')
+    )
+
+    class Meta(BaseMessage.Meta):
         verbose_name = _('Message')
         verbose_name_plural = _('Messages')
         db_table = MESSAGE_DB_TABLE_NAME
-        ordering = ('-datetime', )
-        get_latest_by = ('datetime')
+        indexes = [
+            # history of dialog, paginated by (datetime, uuid) cursor
+            models.Index(fields=['dialog', '-datetime', '-uuid'],
+                         name='message_dialog_history_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            Dialog.register_message(self)
+
+
+class ArchivedMessage(BaseMessage):
+    """Message of cold archive, read only when user scrolls back."""
+    dialog = models.ForeignKey(
+        Dialog,
+        on_delete=models.CASCADE,
+        related_name='archived_messages',
+        related_query_name='archived_message',
+        verbose_name=_('Dialog')
+    )
 
+    class Meta(BaseMessage.Meta):
+        verbose_name = _('Archived message')
+        verbose_name_plural = _('Archived messages')
+        db_table = ARCHIVED_MESSAGE_DB_TABLE_NAME
+        indexes = [
+            models.Index(fields=['dialog', '-datetime', '-uuid'],
+                         name='archived_message_history_idx'),
+        ]
@@ -0,0 +1,242 @@
+"""
+Monthly partitions of chat messages.
+
+On PostgreSQL tables of ``Message`` and ``ArchivedMessage`` are partitioned
+by range of ``datetime``, one partition per month, named
+``<table>_pYYYYMM``. Partitions for coming months are created in advance.
+Partitions older than ``CHAT_HOT_MONTHS`` are detached from hot table and
+attached to archive one, optionally moved to cold tablespace, so indexes
+and vacuum of hot table stay of the same size as chat grows. Messages
+out of range of monthly partitions go to default partition of hot table,
+they are moved to partition of their month when it is created and to
+archive when their month gets old.
+
+On other databases tables are not partitioned and old messages are moved
+to archive table row by row.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .constants import MESSAGE_DB_TABLE_NAME, ARCHIVED_MESSAGE_DB_TABLE_NAME
+from .models import Message, ArchivedMessage
+
+
+def month_start(value: datetime.date, shift: int = 0) -> datetime.date:
+    """Return first day of month of ``value``, shifted by months."""
+    months = value.year * 12 + value.month - 1 + shift
+    return datetime.date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime.date) -> str:
+    """Return name of partition of table for month."""
+    return f'{table}_p{month:%Y%m}'
+
+
+def archive_cutoff(now=None) -> datetime.date:
+    """Return first month kept in hot table."""
+    now = now or timezone.now()
+    return month_start(now.date(), -(settings.CHAT_HOT_MONTHS - 1))
+
+
+def is_partitioned() -> bool:
+    """Return True if database supports declarative partitioning."""
+    return connection.vendor == 'postgresql'
+
+
+def list_partitions(table: str) -> dict:
+    """Return ``{month: partition name}`` of attached monthly partitions."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class parent ON parent.oid = pg_inherits.inhparent '
+            'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+            'WHERE parent.relname = %s', [table])
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = {}
+    for name in names:
+        suffix = name[len(table) + 2:]
+        if name.startswith(f'{table}_p') and suffix.isdigit():
+            month = datetime.date(int(suffix[:4]), int(suffix[4:]), 1)
+            partitions[month] = name
+    return partitions
+
+
+def _bounds(month: datetime.date) -> tuple:
+    return month.isoformat(), month_start(month, 1).isoformat()
+
+
+def default_partition_name(table: str) -> str:
+    """Return name of default partition of table."""
+    return f'{table}_default'
+
+
+def _default_partition(cursor, table: str):
+    """Return name of default partition of table if it exists."""
+    name = default_partition_name(table)
+    cursor.execute('SELECT to_regclass(%s)',
+                   [connection.ops.quote_name(name)])
+    return name if cursor.fetchone()[0] else None
+
+
+def _columns(model) -> str:
+    qn = connection.ops.quote_name
+    return ', '.join(qn(field.column)
+                     for field in model._meta.concrete_fields)
+
+
+def _create_partition(table: str, month: datetime.date) -> str:
+    """
+    Create partition of table for month.
+
+    Rows of the month are moved from default partition into new one,
+    otherwise it could not be attached.
+    """
+    qn = connection.ops.quote_name
+    name = partition_name(table, month)
+    bounds = _bounds(month)
+    with transaction.atomic(), connection.cursor() as cursor:
+        default = _default_partition(cursor, table)
+        if default is None:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {qn(name)} PARTITION OF '
+                f'{qn(table)} FOR VALUES FROM (%s) TO (%s)', bounds)
+            return name
+        # attaching takes the lock anyway, new rows of the month must not
+        # get into default partition until then
+        cursor.execute(f'LOCK TABLE {qn(default)} IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(f'CREATE TABLE {qn(name)} '
+                       f'(LIKE {qn(table)} INCLUDING DEFAULTS)')
+        columns = _columns(Message)
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {qn(default)} '
+            'WHERE datetime >= %s AND datetime < %s '
+            f'RETURNING {columns}) '
+            f'INSERT INTO {qn(name)} ({columns}) '
+            f'SELECT {columns} FROM moved', bounds)
+        cursor.execute(f'ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} '
+                       'FOR VALUES FROM (%s) TO (%s)', bounds)
+    return name
+
+
+def ensure_partitions(months_ahead: int = None) -> list:
+    """Create partitions of hot table up to ``months_ahead`` months."""
+    if not is_partitioned():
+        return []
+    if months_ahead is None:
+        months_ahead = settings.CHAT_PARTITIONS_AHEAD
+    existing = list_partitions(MESSAGE_DB_TABLE_NAME)
+    created = []
+    month = archive_cutoff()
+    last = month_start(timezone.now().date(), months_ahead)
+    while month <= last:
+        if month not in existing:
+            created.append(_create_partition(MESSAGE_DB_TABLE_NAME, month))
+        month = month_start(month, 1)
+    return created
+
+
+def archived_months(months) -> set:
+    """
+    Return months from given, which messages belong to archive.
+
+    Months older than hot ones and not in hot table anymore are archived,
+    missing partitions of archive are created for them.
+    """
+    cutoff = archive_cutoff()
+    archived = {month for month in months if month < cutoff}
+    if not is_partitioned() or not archived:
+        return archived
+    archived -= set(list_partitions(MESSAGE_DB_TABLE_NAME))
+    existing = list_partitions(ARCHIVED_MESSAGE_DB_TABLE_NAME)
+    for month in archived - set(existing):
+        _create_partition(ARCHIVED_MESSAGE_DB_TABLE_NAME, month)
+    return archived
+
+
+def archive_partitions(now=None) -> list:
+    """
+    Move messages older than ``CHAT_HOT_MONTHS`` to archive.
+
+    Return list of archived partitions, or months for unpartitioned
+    database.
+    """
+    cutoff = archive_cutoff(now)
+    if not is_partitioned():
+        return _archive_rows(cutoff)
+    qn = connection.ops.quote_name
+    tablespace = settings.CHAT_ARCHIVE_TABLESPACE
+    archived = []
+    for month, name in sorted(list_partitions(MESSAGE_DB_TABLE_NAME).items()):
+        if month >= cutoff:
+            break
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {qn(MESSAGE_DB_TABLE_NAME)} '
+                           f'DETACH PARTITION {qn(name)}')
+            archive_name = partition_name(ARCHIVED_MESSAGE_DB_TABLE_NAME,
+                                          month)
+            cursor.execute(f'ALTER TABLE {qn(name)} '
+                           f'RENAME TO {qn(archive_name)}')
+            if tablespace:
+                cursor.execute(f'ALTER TABLE {qn(archive_name)} '
+                               f'SET TABLESPACE {qn(tablespace)}')
+            cursor.execute(
+                f'ALTER TABLE {qn(ARCHIVED_MESSAGE_DB_TABLE_NAME)} '
+                f'ATTACH PARTITION {qn(archive_name)} '
+                'FOR VALUES FROM (%s) TO (%s)', _bounds(month))
+        archived.append(archive_name)
+    for name in _archive_default_rows(cutoff):
+        if name not in archived:
+            archived.append(name)
+    return archived
+
+
+def _archive_default_rows(cutoff: datetime.date) -> list:
+    """
+    Move old messages from default partition of hot table to archive.
+
+    Return list of archive partitions, which got the messages.
+    """
+    qn = connection.ops.quote_name
+    with transaction.atomic(), connection.cursor() as cursor:
+        default = _default_partition(cursor, MESSAGE_DB_TABLE_NAME)
+        if default is None:
+            return []
+        cursor.execute(
+            "SELECT DISTINCT date_trunc('month', datetime)::date "
+            f'FROM {qn(default)} WHERE datetime < %s', [cutoff.isoformat()])
+        months = sorted(row[0] for row in cursor.fetchall())
+        existing = list_partitions(ARCHIVED_MESSAGE_DB_TABLE_NAME)
+        for month in months:
+            if month not in existing:
+                _create_partition(ARCHIVED_MESSAGE_DB_TABLE_NAME, month)
+        columns = _columns(Message)
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {qn(default)} WHERE datetime < %s '
+            f'RETURNING {columns}) '
+            f'INSERT INTO {qn(ARCHIVED_MESSAGE_DB_TABLE_NAME)} ({columns}) '
+            f'SELECT {columns} FROM moved', [cutoff.isoformat()])
+    return [partition_name(ARCHIVED_MESSAGE_DB_TABLE_NAME, month)
+            for month in months]
+
+
+def _archive_rows(cutoff: datetime.date, batch_size: int = 1000) -> list:
+    """Move old messages to archive table by batches."""
+    cutoff = timezone.make_aware(
+        datetime.datetime.combine(cutoff, datetime.time()))
+    fields = [field.attname for field in ArchivedMessage._meta.concrete_fields]
+    months = set()
+    while True:
+        with transaction.atomic():
+            batch = list(Message.objects.filter(datetime__lt=cutoff)
+                         .order_by('datetime', 'uuid')
+                         .values(*fields)[:batch_size])
+            if not batch:
+                return sorted(months)
+            ArchivedMessage.objects.bulk_create(
+                ArchivedMessage(**row) for row in batch)
+            Message.objects.filter(
+                pk__in=[row['uuid'] for row in batch]).delete()
+        months.update(month_start(row['datetime'].date()) for row in batch)
@@ -0,0 +1,48 @@
+"""
+Delivery of chat events to websocket consumers through channel layer.
+
+Consumers send events of messages they save themselves. Messages saved
+by synchronous code, such as bulk ingestion, are pushed by
+``broadcast_message`` after commit.
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+logger = logging.getLogger(__name__)
+
+
+def dialog_group_name(dialog_uuid) -> str:
+    """Return name of channel layer group of dialog."""
+    return f'chat.dialog.{dialog_uuid}'
+
+
+def message_event(message) -> dict:
+    """Return channel layer event of new message."""
+    return {
+        'type': 'chat.message',
+        'uuid': str(message.uuid),
+        'dialog': str(message.dialog_id),
+        'sender': message.sender_id,
+        'text': message.text,
+        'datetime': message.datetime.isoformat(),
+    }
+
+
+def broadcast_message(message) -> None:
+    """
+    Push message to all connected participants of its dialog.
+
+    Called from synchronous code only, out of transaction. Message is
+    stored already, so failure of channel layer is only logged, clients
+    get message with history.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(
+            dialog_group_name(message.dialog_id), message_event(message))
+    except Exception as e:
+        logger.warning('Cannot broadcast message %s: %r', message.pk, e)
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .consumers import DialogConsumer
+
+websocket_urlpatterns = [
+    path('ws/chat/<uuid:dialog>/', DialogConsumer.as_asgi()),
+]
@@ -0,0 +1,10 @@
+from switchdeck.celery import app
+from . import partitions
+
+
+@app.task
+def maintain_message_partitions():
+    """Create next monthly partitions of messages, archive old ones."""
+    created = partitions.ensure_partitions()
+    archived = partitions.archive_partitions()
+    return {'created': created, 'archived': [str(x) for x in archived]}
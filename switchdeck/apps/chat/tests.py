@@ -1,3 +1,415 @@
-from django.test import TestCase
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+import io
+import json
+import tempfile
+import uuid
+from datetime import date, timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Dialog, Message, ArchivedMessage
+from .ingest import ingest_messages
+from .constants import MESSAGE_DB_TABLE_NAME
+from .partitions import (archive_partitions, default_partition_name,
+                         ensure_partitions, list_partitions, month_start)
+from .routing import websocket_urlpatterns
+
+
+class DialogConsumerTest(TransactionTestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.john = User.objects.create_user('john', password='john')
+        self.mary = User.objects.create_user('mary', password='mary')
+        self.ann = User.objects.create_user('ann', password='ann')
+        self.dialog = Dialog.objects.create(participant1=self.john,
+                                            participant2=self.mary)
+        self.application = URLRouter(websocket_urlpatterns)
+
+    def communicator(self, user):
+        communicator = WebsocketCommunicator(
+            self.application, f'/ws/chat/{self.dialog.uuid}/')
+        communicator.scope['user'] = user
+        return communicator
+
+    async def test_message_pushed_to_participants(self):
+        john = self.communicator(self.john)
+        mary = self.communicator(self.mary)
+        self.assertTrue((await john.connect())[0])
+        self.assertTrue((await mary.connect())[0])
+        await john.send_json_to({'type': 'message', 'text': 'hello'})
+        event = await mary.receive_json_from()
+        self.assertEqual('message', event['type'])
+        self.assertEqual('hello', event['text'])
+        self.assertEqual('hello', (await john.receive_json_from())['text'])
+        self.assertTrue(await database_sync_to_async(
+            Message.objects.filter(dialog=self.dialog, text='hello').exists)())
+        await john.send_json_to({'type': 'typing'})
+        self.assertEqual('typing', (await mary.receive_json_from())['type'])
+        self.assertTrue(await john.receive_nothing())
+        await john.disconnect()
+        await mary.disconnect()
+
+    async def test_ingested_message_pushed(self):
+        mary = self.communicator(self.mary)
+        self.assertTrue((await mary.connect())[0])
+        await database_sync_to_async(ingest_messages)([
+            {'dialog': str(self.dialog.uuid), 'sender': self.john.pk,
+             'text': 'lot is sold'}])
+        event = await mary.receive_json_from()
+        self.assertEqual('message', event['type'])
+        self.assertEqual('lot is sold', event['text'])
+        self.assertEqual(self.john.pk, event['sender'])
+        await mary.disconnect()
+
+    async def test_not_participant_rejected(self):
+        connected, _ = await self.communicator(self.ann).connect()
+        self.assertFalse(connected)
+
+
+class MessageHistoryTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.john = User.objects.create_user('john', password='john')
+        self.mary = User.objects.create_user('mary', password='mary')
+        self.dialog = Dialog.objects.create(participant1=self.john,
+                                            participant2=self.mary)
+        now = timezone.now() - timedelta(minutes=1)
+        # pairs of messages with same datetime check uuid tie breaking
+        Message.objects.bulk_create([
+            Message(dialog=self.dialog, sender=self.john, text=str(i),
+                    datetime=now + timedelta(seconds=i // 2))
+            for i in range(7)])
+        self.client = APIClient()
+        self.client.force_authenticate(self.john)
+        self.url = f'/api/dialogs/{self.dialog.uuid}/messages/'
+
+    def test_pages_by_cursor(self):
+        seen = []
+        url = self.url + '?page_size=3'
+        while url:
+            data = self.client.get(url).json()
+            seen += [message['uuid'] for message in data['results']]
+            url = data['next']
+        expected = [str(uuid) for uuid in Message.objects
+                    .order_by('-datetime', '-uuid')
+                    .values_list('uuid', flat=True)]
+        self.assertEqual(expected, seen)
+
+    def test_since_returns_new_messages(self):
+        since = self.client.get(self.url).json()['since']
+        self.assertEqual([], self.client.get(since).json()['results'])
+        message = Message.objects.create(dialog=self.dialog,
+                                         sender=self.mary, text='new')
+        data = self.client.get(since).json()
+        self.assertEqual([str(message.uuid)],
+                         [message['uuid'] for message in data['results']])
+
+    def test_invalid_cursor(self):
+        for param in ('cursor', 'since'):
+            response = self.client.get(f'{self.url}?{param}=broken')
+            self.assertEqual(400, response.status_code)
+            self.assertIn(param, response.json())
+
+    def test_cursor_bounds_range_of_index(self):
+        url = self.client.get(self.url + '?page_size=3').json()['next']
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        # sargable bound next to the OR of keyset
+        self.assertTrue(any('"datetime" <=' in query['sql']
+                            for query in queries.captured_queries))
+
+    def test_reads_through_archive(self):
+        old = timezone.now() - timedelta(days=400)
+        archived = ArchivedMessage.objects.bulk_create([
+            ArchivedMessage(dialog=self.dialog, sender=self.mary,
+                            text=str(i), datetime=old + timedelta(seconds=i))
+            for i in range(3)])
+        seen = []
+        url = self.url + '?page_size=4'
+        while url:
+            data = self.client.get(url).json()
+            seen += [message['uuid'] for message in data['results']]
+            url = data['next']
+        self.assertEqual(10, len(seen))
+        self.assertEqual([str(message.uuid) for message in archived[::-1]],
+                         seen[-3:])
+
+    def test_not_participant_forbidden(self):
+        ann = get_user_model().objects.create_user('ann', password='ann')
+        self.client.force_authenticate(ann)
+        self.assertEqual(404, self.client.get(self.url).status_code)
+
+
+class DialogInboxTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.john = User.objects.create_user('john', password='john')
+        self.mary = User.objects.create_user('mary', password='mary')
+        self.ann = User.objects.create_user('ann', password='ann')
+        self.old = Dialog.objects.create(participant1=self.john,
+                                         participant2=self.mary)
+        self.new = Dialog.objects.create(participant1=self.ann,
+                                         participant2=self.john)
+        self.client = APIClient()
+        self.client.force_login(self.john)
+
+    def test_message_updates_last_message_and_unread(self):
+        Message.objects.create(dialog=self.old, sender=self.mary, text='hi')
+        Message.objects.create(dialog=self.old, sender=self.mary, text='yo')
+        self.old.refresh_from_db()
+        self.assertEqual('yo', self.old.last_message_text)
+        self.assertEqual(self.mary.pk, self.old.last_message_sender_id)
+        self.assertEqual(2, self.old.unread_for(self.john))
+        self.assertEqual(0, self.old.unread_for(self.mary))
+
+    def test_older_message_does_not_replace_last(self):
+        Message.objects.create(dialog=self.old, sender=self.mary, text='new')
+        Message.objects.create(dialog=self.old, sender=self.mary, text='old',
+                               datetime=timezone.now() - timedelta(hours=1))
+        self.old.refresh_from_db()
+        self.assertEqual('new', self.old.last_message_text)
+        self.assertEqual(2, self.old.unread1)
+
+    def test_mark_read(self):
+        first = Message.objects.create(dialog=self.old, sender=self.mary,
+                                       text='1')
+        Message.objects.create(dialog=self.old, sender=self.mary, text='2',
+                               datetime=first.datetime + timedelta(seconds=1))
+        self.assertEqual(1, self.old.mark_read(self.john, first))
+        self.assertEqual(0, self.old.mark_read(self.john))
+        self.old.refresh_from_db()
+        self.assertEqual(0, self.old.unread1)
+        with self.assertRaises(ValueError):
+            self.old.mark_read(self.ann)
+
+    def test_inbox_ordered_by_activity(self):
+        Message.objects.create(dialog=self.old, sender=self.mary, text='a')
+        Message.objects.create(dialog=self.new, sender=self.ann, text='b')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/dialogs/')
+        # count of paginator and page itself, without per dialog queries
+        dialog_queries = [query['sql'] for query in queries
+                          if 'chat_dialogs' in query['sql']]
+        self.assertEqual(2, len(dialog_queries))
+        # indexed query per participant column instead of OR over both
+        for sql in dialog_queries:
+            self.assertIn('UNION ALL', sql)
+            self.assertNotIn(' OR ', sql)
+        results = response.json()
+        results = results.get('results', results)
+        self.assertEqual([str(self.new.uuid), str(self.old.uuid)],
+                         [dialog['uuid'] for dialog in results])
+        self.assertEqual(1, results[0]['unread'])
+        response = self.client.post(f'/api/dialogs/{self.new.uuid}/read/')
+        self.assertEqual({'unread': 0}, response.json())
+
+
+class DialogParticipantsTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.john = User.objects.create_user('john', password='john')
+        self.mary = User.objects.create_user('mary', password='mary')
+
+    def test_participants_stored_in_canonical_order(self):
+        dialog = Dialog.objects.create(participant1=self.mary,
+                                       participant2=self.john, unread1=3)
+        dialog.refresh_from_db()
+        self.assertEqual(self.john.pk, dialog.participant1_id)
+        self.assertEqual(3, dialog.unread_for(self.mary))
+        self.assertEqual(dialog,
+                         Dialog.objects.get_user_room(self.mary, self.john))
+
+    def test_get_or_create_room(self):
+        dialog, created = Dialog.objects.get_or_create_room(self.mary,
+                                                            self.john)
+        self.assertTrue(created)
+        self.assertEqual((dialog, False), Dialog.objects.get_or_create_room(
+            self.john, self.mary))
+
+    def test_create_api(self):
+        client = APIClient()
+        client.force_login(self.mary)
+        response = client.post('/api/dialogs/', {'participant': self.john.pk})
+        self.assertEqual(201, response.status_code)
+        response = client.post('/api/dialogs/', {'participant': self.john.pk})
+        self.assertEqual(200, response.status_code)
+        response = client.post('/api/dialogs/', {'participant': self.mary.pk})
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(1, Dialog.objects.count())
+
+
+class MessagePartitionsTest(TestCase):
+    def test_month_start(self):
+        self.assertEqual(date(2020, 11, 1), month_start(date(2021, 1, 31), -2))
+        self.assertEqual(date(2022, 1, 1), month_start(date(2021, 12, 5), 1))
+
+    @override_settings(CHAT_HOT_MONTHS=2)
+    def test_archive_old_messages(self):
+        User = get_user_model()
+        john = User.objects.create_user('john', password='john')
+        mary = User.objects.create_user('mary', password='mary')
+        dialog = Dialog.objects.create(participant1=john, participant2=mary)
+        now = timezone.now()
+        old = Message.objects.create(dialog=dialog, sender=john, text='old',
+                                     datetime=now - timedelta(days=100))
+        new = Message.objects.create(dialog=dialog, sender=john, text='new')
+        archive_partitions()
+        self.assertEqual([new], list(dialog.messages.all()))
+        self.assertEqual([old.pk], [message.pk for message
+                                    in dialog.archived_messages.all()])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'partitioning of postgresql')
+class PostgresMessagePartitionsTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.john = User.objects.create_user('john', password='john')
+        mary = User.objects.create_user('mary', password='mary')
+        self.dialog = Dialog.objects.create(participant1=self.john,
+                                            participant2=mary)
+
+    def count_rows(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM '
+                           f'{connection.ops.quote_name(table)}')
+            return cursor.fetchone()[0]
+
+    def test_constraint_names_kept(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, MESSAGE_DB_TABLE_NAME)
+        self.assertIn('message_dialog_history_idx', constraints)
+        foreign_keys = {constraint['columns'][0]: name for name, constraint
+                        in constraints.items() if constraint['foreign_key']}
+        self.assertEqual({'dialog_id', 'sender_id'}, set(foreign_keys))
+        for column, name in foreign_keys.items():
+            self.assertTrue(name.startswith(
+                f'{MESSAGE_DB_TABLE_NAME}_{column}_'), name)
+
+    def test_default_rows_moved_to_new_partition(self):
+        far = timezone.now() + timedelta(days=200)
+        message = Message.objects.create(dialog=self.dialog, sender=self.john,
+                                         text='far', datetime=far)
+        default = default_partition_name(MESSAGE_DB_TABLE_NAME)
+        self.assertEqual(1, self.count_rows(default))
+        ensure_partitions(months_ahead=8)
+        month = month_start(far.date())
+        self.assertIn(month, list_partitions(MESSAGE_DB_TABLE_NAME))
+        self.assertEqual(0, self.count_rows(default))
+        self.assertEqual([message], list(self.dialog.messages.all()))
+
+    @override_settings(CHAT_HOT_MONTHS=1)
+    def test_archive_default_rows(self):
+        old = Message.objects.create(
+            dialog=self.dialog, sender=self.john, text='old',
+            datetime=timezone.now() - timedelta(days=400))
+        default = default_partition_name(MESSAGE_DB_TABLE_NAME)
+        self.assertEqual(1, self.count_rows(default))
+        archive_partitions()
+        self.assertEqual(0, self.count_rows(default))
+        self.assertFalse(self.dialog.messages.exists())
+        self.assertEqual([old.pk], [message.pk for message
+                                    in self.dialog.archived_messages.all()])
+
+
+class BulkIngestTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.john = User.objects.create_user('john', password='john')
+        self.mary = User.objects.create_user('mary', password='mary')
+        self.ann = User.objects.create_user('ann', password='ann')
+        start = timezone.now() - timedelta(hours=1)
+        self.dialog = Dialog.objects.create(
+            participant1=self.john, participant2=self.mary,
+            last_message_at=start - timedelta(days=1))
+        self.rows = [
+            {'dialog': str(self.dialog.uuid), 'sender': self.mary.pk,
+             'text': f'offer {i}',
+             'datetime': (start + timedelta(minutes=i)).isoformat()}
+            for i in range(10)]
+
+    def test_batch_updates_inbox_once(self):
+        with self.assertNumQueries(7):
+            # dialogs, savepoint, existing uuids in hot and archive tables,
+            # insert, inbox update, savepoint release
+            self.assertEqual(10, ingest_messages(self.rows))
+        self.dialog.refresh_from_db()
+        self.assertEqual(10, self.dialog.unread_for(self.john))
+        self.assertEqual(0, self.dialog.unread_for(self.mary))
+        self.assertEqual('offer 9', self.dialog.last_message_text)
+
+    def test_unread_messages_broadcast_after_commit(self):
+        with mock.patch('switchdeck.apps.chat.ingest.broadcast_message') \
+                as broadcast:
+            with self.captureOnCommitCallbacks(execute=True):
+                ingest_messages(self.rows[:2])
+                broadcast.assert_not_called()
+            self.assertEqual(['offer 0', 'offer 1'],
+                             [call.args[0].text
+                              for call in broadcast.call_args_list])
+            with self.captureOnCommitCallbacks(execute=True):
+                ingest_messages(self.rows[2:], unread=False)
+            self.assertEqual(2, broadcast.call_count)
+
+    def test_repeated_import_skipped(self):
+        rows = [dict(row, uuid=str(uuid.uuid4())) for row in self.rows]
+        ingest_messages(rows, batch_size=3)
+        self.assertEqual(0, ingest_messages(rows, batch_size=3))
+        self.assertEqual(10, self.dialog.messages.count())
+
+    def test_invalid_rows_reported(self):
+        rows = self.rows + [
+            {'dialog': str(self.dialog.uuid), 'sender': self.ann.pk,
+             'text': 'spam'},
+            {'dialog': str(self.dialog.uuid), 'text': ''},
+            {'dialog': str(self.dialog.uuid), 'text': 'late',
+             'datetime': 1700000000},
+            {'dialog': str(self.dialog.uuid), 'text': 'late',
+             'datetime': '2020-13-01T00:00:00+00:00'}]
+        with self.assertRaises(ValidationError) as context:
+            ingest_messages(rows)
+        self.assertEqual({'10', '11', '12', '13'},
+                         set(context.exception.message_dict))
+        self.assertFalse(self.dialog.messages.exists())
+
+    def test_api_for_staff_only(self):
+        client = APIClient()
+        client.force_authenticate(self.john)
+        url = '/api/dialogs/messages/bulk/'
+        data = {'messages': self.rows, 'unread': False}
+        self.assertEqual(403, client.post(url, data, format='json')
+                         .status_code)
+        self.john.is_staff = True
+        self.john.save()
+        response = client.post(url, data, format='json')
+        self.assertEqual({'inserted': 10}, response.json())
+        self.dialog.refresh_from_db()
+        self.assertEqual(0, self.dialog.unread1)
+
+    def test_api_errors_keyed_by_index(self):
+        client = APIClient()
+        self.john.is_staff = True
+        self.john.save()
+        client.force_authenticate(self.john)
+        response = client.post('/api/dialogs/messages/bulk/',
+                               {'messages': [{}, 1]}, format='json')
+        self.assertEqual(400, response.status_code)
+        self.assertEqual({'1'}, set(response.json()['messages']))
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl') as file:
+            file.write('\n'.join(json.dumps(row) for row in self.rows))
+            file.flush()
+            call_command('ingest_messages', file.name, '--batch-size=4',
+                         stdout=io.StringIO())
+        self.assertEqual(10, self.dialog.messages.count())
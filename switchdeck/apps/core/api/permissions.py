@@ -0,0 +1,22 @@
+"""Permissions shared by REST api of all apps."""
+from rest_framework import permissions
+
+from switchdeck.apps.users.identity import request_profile_id
+
+
+class IsOwnerOrReadOnly(permissions.BasePermission):
+    """
+    Readonly for anonymous, processing for owner of object.
+
+    Owner is the profile referenced by ``owner_field`` of object. Foreign
+    key ids are compared, so neither object's nor user's profile is loaded.
+    """
+
+    owner_field = 'profile'
+
+    def has_object_permission(self, request, view, obj):
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        profile_id = request_profile_id(request)
+        return profile_id is not None \
+            and getattr(obj, f'{self.owner_field}_id') == profile_id
@@ -0,0 +1,27 @@
+"""Renderers shared by REST api of all apps."""
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    JSON renderer using ``orjson``.
+
+    Renders the same JSON as default renderer, several times faster.
+    Types unknown to ``orjson`` (decimals, lazy strings, querysets) are
+    converted by encoder of REST framework. Keys of dicts need not be
+    strings: errors of list fields are keyed by index of item.
+    """
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=self.encoder.default,
+                            option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,201 @@
+"""Serializer tools shared by REST api of all apps."""
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+
+def _query_list(request, param: str):
+    """Return set of comma separated values of query parameter, or None."""
+    if request is None or param not in request.query_params:
+        return None
+    return {value.strip() for value in request.query_params[param].split(',')
+            if value.strip()}
+
+
+def requested_fields(request):
+    """Return fields listed in ``?fields=``, None if all are requested."""
+    return _query_list(request, 'fields')
+
+
+def requested_expansions(request) -> set:
+    """Return fields listed in ``?expand=``."""
+    return _query_list(request, 'expand') or set()
+
+
+class SparseFieldsMixin:
+    """
+    Serializer with fields chosen by client.
+
+    ``?fields=id,name`` keeps only listed fields. ``?expand=game`` renders
+    fields listed in ``Meta.expandable_fields`` as nested objects instead
+    of hyperlinks. ``expandable_fields`` maps field name to dotted path of
+    serializer or to tuple of path and its keyword arguments.
+
+    Query parameters are applied only to top level objects, nested
+    serializers get fields with ``fields`` keyword argument.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        self._only_fields = set(fields) if fields is not None else None
+        super().__init__(*args, **kwargs)
+
+    def _is_top_level(self) -> bool:
+        return self.root is self or (
+            self.parent is self.root
+            and isinstance(self.root, serializers.ListSerializer))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        only_fields, expand = self._only_fields, set()
+        if self._is_top_level():
+            request = self.context.get('request')
+            only_fields = requested_fields(request) or only_fields
+            expand = requested_expansions(request)
+        if only_fields is not None:
+            fields = {name: field for name, field in fields.items()
+                      if name in only_fields}
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        for name in expand & set(expandable) & set(fields):
+            serializer, kwargs = expandable[name], {}
+            if isinstance(serializer, tuple):
+                serializer, kwargs = serializer
+            fields[name] = import_string(serializer)(read_only=True,
+                                                     **kwargs)
+        return fields
+
+
+URL_PLACEHOLDER = '__pk__'
+# fields which representation of database value is the value itself
+PLAIN_FIELDS = (serializers.CharField, serializers.IntegerField,
+                serializers.BooleanField, serializers.ChoiceField,
+                serializers.PrimaryKeyRelatedField)
+
+
+class UnsupportedField(Exception):
+    """Field can not be rendered from ``.values()`` row."""
+
+
+def _query_name(model, accessor: str) -> str:
+    """Return name of relation in queries by its attribute name."""
+    for relation in model._meta.related_objects:
+        if relation.get_accessor_name() == accessor:
+            return relation.name
+    return model._meta.get_field(accessor).name
+
+
+def _related_ordering(related_model, query_name: str) -> list:
+    ordering = []
+    for field in related_model._meta.ordering:
+        descending = field.startswith('-')
+        field = field.lstrip('-')
+        ordering.append(f'{"-" if descending else ""}{query_name}__{field}')
+    return ordering
+
+
+class ValuesSerializer:
+    """
+    Fast read only serializer of ``.values()`` rows for list endpoints.
+
+    Built from regular model serializer and renders the same data.
+    Hyperlinks are formatted from URL templates reversed once, many
+    related hyperlinks are loaded by one query per field, and only values
+    of not plain JSON types go through ``to_representation`` of fields.
+    ``UnsupportedField`` is raised for serializers with nested objects,
+    computed fields or sources not being model fields, regular serializer
+    is used for them.
+    """
+
+    def __init__(self, serializer, request):
+        self.model = serializer.Meta.model
+        self.request = request
+        self.columns = {'pk'}
+        self.plan = []
+        self.many = []
+        for name, field in serializer.fields.items():
+            self.plan.append(self._plan_field(name, field))
+
+    def _template(self, field) -> str:
+        if getattr(field, 'lookup_field', 'pk') not in ('pk', 'id'):
+            raise UnsupportedField(field.field_name)
+        return reverse(field.view_name, kwargs={'pk': URL_PLACEHOLDER},
+                       request=self.request,
+                       format=None).replace(URL_PLACEHOLDER, '{}')
+
+    def _plan_field(self, name: str, field) -> tuple:
+        source = field.source
+        if isinstance(field, serializers.HyperlinkedIdentityField):
+            return 'link', name, 'pk', self._template(field)
+        if isinstance(field, serializers.ManyRelatedField):
+            child = field.child_relation
+            if not isinstance(child, serializers.HyperlinkedRelatedField):
+                raise UnsupportedField(name)
+            try:
+                query_name = _query_name(self.model, source)
+            except FieldDoesNotExist:
+                raise UnsupportedField(name)
+            self.many.append((name, query_name, self._template(child)))
+            return 'many', name, name, None
+        if source == '*' or '.' in source \
+                or isinstance(field, (serializers.BaseSerializer,
+                                      serializers.SerializerMethodField)):
+            raise UnsupportedField(name)
+        try:
+            model_field = self.model._meta.get_field(source)
+        except FieldDoesNotExist:
+            # property or method of model
+            raise UnsupportedField(name)
+        column = model_field.attname
+        self.columns.add(column)
+        if isinstance(field, serializers.HyperlinkedRelatedField):
+            return 'link', name, column, self._template(field)
+        if isinstance(field, serializers.FileField):
+            return 'file', name, column, model_field.storage
+        if isinstance(field, PLAIN_FIELDS):
+            return 'plain', name, column, None
+        return 'convert', name, column, field.to_representation
+
+    def _load_many(self, pks: list) -> dict:
+        """Return ``{field name: {pk: [related urls]}}``."""
+        loaded = {}
+        for name, query_name, template in self.many:
+            related_model = self.model._meta.get_field(query_name)\
+                .related_model
+            rows = self.model._default_manager\
+                .filter(pk__in=pks, **{f'{query_name}__isnull': False})\
+                .order_by(*_related_ordering(related_model, query_name))\
+                .values_list('pk', f'{query_name}__pk')
+            urls = {pk: [] for pk in pks}
+            for pk, related_pk in rows:
+                urls[pk].append(template.format(related_pk))
+            loaded[name] = urls
+        return loaded
+
+    def values(self, queryset):
+        """Return queryset of rows needed for the serializer."""
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def to_representation(self, rows) -> list:
+        rows = list(rows)
+        many = self._load_many([row['pk'] for row in rows]) \
+            if self.many else {}
+        build_absolute_uri = self.request.build_absolute_uri
+        data = []
+        for row in rows:
+            item = {}
+            for kind, name, column, extra in self.plan:
+                value = row.get(column)
+                if kind == 'plain':
+                    item[name] = value
+                elif kind == 'link':
+                    item[name] = None if value is None \
+                        else extra.format(value)
+                elif kind == 'many':
+                    item[name] = many[name][row['pk']]
+                elif kind == 'file':
+                    item[name] = build_absolute_uri(extra.url(value)) \
+                        if value else None
+                else:
+                    item[name] = None if value is None else extra(value)
+            data.append(item)
+        return data
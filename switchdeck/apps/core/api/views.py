@@ -0,0 +1,180 @@
+"""Viewset tools shared by REST api of all apps."""
+import hashlib
+import math
+
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from switchdeck.apps.core.models import CollectionVersion
+from switchdeck.apps.users.identity import request_profile_id
+from .serializers import (requested_fields, requested_expansions,
+                          UnsupportedField, ValuesSerializer)
+
+
+class EagerLoadingMixin:
+    """
+    Viewset loading related objects of serialized fields at once.
+
+    Attributes map serializer field names to lookups, lookups are applied
+    only if the field is in response, so sparse responses stay cheap.
+
+    ``select_related_fields``, ``prefetch_related_fields``
+        Lookups needed to render field as hyperlink.
+    ``select_related_expand``, ``prefetch_related_expand``
+        Lookups needed to render field expanded by ``?expand=``, used
+        instead of hyperlink lookups of the same field.
+    """
+
+    select_related_fields = {}
+    prefetch_related_fields = {}
+    select_related_expand = {}
+    prefetch_related_expand = {}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = requested_fields(self.request)
+        expand = requested_expansions(self.request)
+        select, prefetch = [], []
+        for lookups, related, expanded in (
+                (select, self.select_related_fields,
+                 self.select_related_expand),
+                (prefetch, self.prefetch_related_fields,
+                 self.prefetch_related_expand)):
+            for name in set(related) | set(expanded):
+                if fields is not None and name not in fields:
+                    continue
+                if name in expand and name in expanded:
+                    lookups.extend(expanded[name])
+                elif name in related:
+                    lookups.extend(related[name])
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+
+class OwnerFilterMixin:
+    """
+    Viewset with list filtering by owner profile.
+
+    ``?owner=me`` keeps objects of requesting user, ``?owner=<id>`` of
+    profile with given id. Filtered by foreign key ``owner_field``.
+    """
+
+    owner_field = 'profile'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        owner = self.request.query_params.get('owner')
+        if owner is None:
+            return queryset
+        if owner == 'me':
+            owner = request_profile_id(self.request)
+        elif not owner.isdigit():
+            owner = None
+        if owner is None:
+            return queryset.none()
+        return queryset.filter(**{f'{self.owner_field}_id': owner})
+
+
+class ConditionalMixin:
+    """
+    Viewset answering conditional GET requests without serialization.
+
+    ETag and Last-Modified of list and detail responses are derived from
+    versions of collections of ``conditional_models``, which are bumped on
+    every change of their objects (see ``API_VERSIONED_MODELS``). Matching
+    ``If-None-Match`` or ``If-Modified-Since`` gets 304 response before
+    objects are queried.
+
+    ``cache_max_age`` is sent in ``Cache-Control``, public for anonymous
+    requests and private for authenticated ones.
+    """
+
+    conditional_models = []
+    cache_max_age = 0
+
+    def get_validators(self, request) -> tuple:
+        """Return ``(etag, last_modified)`` of response to request."""
+        labels = sorted(model._meta.label_lower
+                        for model in self.conditional_models)
+        versions = CollectionVersion.get_many(labels)
+        parts = [f'{label}:{versions.get(label, (0, None))[0]}'
+                 for label in labels]
+        # representation depends on url, negotiated format and user
+        parts += [request.get_full_path(),
+                  request.META.get('HTTP_ACCEPT', ''),
+                  str(request.user.pk or '')]
+        etag = '"%s"' % hashlib.md5('|'.join(parts).encode()).hexdigest()
+        modified = [modified for _, modified in versions.values()]
+        last_modified = None
+        if modified:
+            # http dates have seconds precision, round up to not miss changes
+            last_modified = math.ceil(max(modified).timestamp())
+        return etag, last_modified
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            self.patch_cache_headers(request, response)
+        return response
+
+    def patch_cache_headers(self, request, response) -> None:
+        """Set ``Cache-Control`` and ``Vary`` of response."""
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True,
+                                max_age=self.cache_max_age)
+        else:
+            patch_cache_control(response, public=True,
+                                max_age=self.cache_max_age)
+        patch_vary_headers(response, ['Accept', 'Cookie', 'Authorization'])
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request,
+                                         *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request,
+                                         *args, **kwargs)
+
+
+class ValuesListMixin:
+    """
+    Viewset rendering lists from ``.values()`` rows.
+
+    Lists are rendered by ``ValuesSerializer`` built from regular
+    serializer, skipping model instances and per object ``reverse()``.
+    Expanded lists and serializers not supported by ``ValuesSerializer``
+    are rendered as usual.
+    """
+
+    def get_values_serializer(self):
+        """Return values serializer of request or None if not supported."""
+        if requested_expansions(self.request):
+            return None
+        try:
+            return ValuesSerializer(self.get_serializer(), self.request)
+        except UnsupportedField:
+            return None
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_values_serializer()
+        if serializer is None:
+            return super().list(request, *args, **kwargs)
+        queryset = serializer.values(
+            self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                serializer.to_representation(page))
+        return Response(serializer.to_representation(queryset))
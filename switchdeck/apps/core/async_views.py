@@ -0,0 +1,74 @@
+"""
+Tools of async views.
+
+Django 4.0 has no async ORM, so queries of async views run in threads.
+Code of request, like rendering of templates, runs with ``sync_to_async``
+in thread of request. Independent queries run at once with
+``gather_queries`` in thread pool, every thread keeps its connection by
+``CONN_MAX_AGE`` as sync workers do.
+"""
+import asyncio
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils.decorators import classonlymethod
+from django.views import View
+
+
+def _in_pool_thread(func):
+    def wrapper():
+        # connections of pool threads are not closed by request signals
+        close_old_connections()
+        try:
+            return func()
+        finally:
+            close_old_connections()
+    return wrapper
+
+
+def _in_transaction() -> bool:
+    return connection.in_atomic_block
+
+
+async def gather_queries(*funcs) -> list:
+    """
+    Run functions without arguments at once, return their results.
+
+    Functions run in thread pool if ``ASYNC_CONCURRENT_QUERIES`` is
+    enabled, else one by one in thread of request. Inside transaction they
+    run in thread of request too, other connections would not see its
+    changes. Querysets must be evaluated by functions, like
+    ``lambda: list(queryset)``.
+    """
+    if not settings.ASYNC_CONCURRENT_QUERIES \
+            or await sync_to_async(_in_transaction)():
+        return [await sync_to_async(func)() for func in funcs]
+    return await asyncio.gather(*(
+        sync_to_async(_in_pool_thread(func), thread_sensitive=False)()
+        for func in funcs))
+
+
+class AsyncView(View):
+    """
+    Class based view with async handlers.
+
+    Backport of async class based views of Django 4.1, all handlers of
+    subclasses must be coroutines.
+    """
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        # coroutine function, so request handler awaits view
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+        return functools.update_wrapper(async_view, view)
+
+    async def options(self, request, *args, **kwargs):
+        return super().options(request, *args, **kwargs)
+
+    async def http_method_not_allowed(self, request, *args, **kwargs):
+        return super().http_method_not_allowed(request, *args, **kwargs)
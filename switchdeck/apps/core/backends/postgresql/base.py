@@ -0,0 +1,76 @@
+"""
+PostgreSQL backend with health checks of persistent connections.
+
+Persistent connection is checked once per request or task before its
+first use, if ``CONN_HEALTH_CHECKS`` of database settings is enabled (as
+in Django 4.1). Broken connection, like after restart of database or
+PgBouncer, is replaced by new one instead of failing the request.
+
+Connections of process are counted in ``connection_stats``.
+"""
+import collections
+import threading
+
+from django.db.backends.postgresql import base
+
+_stats = collections.Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(event: str) -> None:
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def connection_stats() -> dict:
+    """
+    Return counters of connections of this process.
+
+    ``opened`` and ``closed`` connections, ``health_checks`` of persistent
+    ones before reuse, of them ``reused`` and ``health_check_failures``.
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_enabled = self.settings_dict.get(
+            'CONN_HEALTH_CHECKS', False)
+        self.health_check_done = False
+
+    def connect(self):
+        super().connect()
+        # new connection does not need a check
+        self.health_check_done = True
+        _count('opened')
+
+    def _close(self):
+        try:
+            super()._close()
+        finally:
+            _count('closed')
+
+    def close_if_health_check_failed(self) -> None:
+        """Close connection if it is broken, before its first use."""
+        if self.connection is None or not self.health_check_enabled \
+                or self.health_check_done:
+            return
+        self.health_check_done = True
+        _count('health_checks')
+        if not self.is_usable():
+            _count('health_check_failures')
+            self.close()
+        else:
+            _count('reused')
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
+
+    def close_if_unusable_or_obsolete(self):
+        # called on start and end of requests and tasks
+        if self.connection is not None:
+            self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
@@ -0,0 +1,51 @@
+"""
+Sessions kept in cache and written to database behind requests.
+
+Sessions are read from cache and from database on cache misses only, as
+by ``cached_db`` engine. Changes of existing sessions are written to
+cache at once and to database by celery task
+``SESSION_WRITE_BEHIND_DELAY`` seconds later, one task writes all changes
+made until it runs. Changes not written yet are lost with cache. New
+sessions and deletions reach database at once: database keeps keys of
+sessions unique, and deleted sessions must not be loaded from it again.
+"""
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.backends.base import UpdateError
+
+# pending write keeps its task from being scheduled again, until the task
+# is surely lost
+PENDING_TIMEOUT_FACTOR = 10
+
+
+class SessionStore(cached_db.SessionStore):
+    @property
+    def pending_key(self) -> str:
+        return self.cache_key + ':pending'
+
+    def save(self, must_create=False):
+        delay = settings.SESSION_WRITE_BEHIND_DELAY
+        if must_create or self.session_key is None or not delay:
+            return super().save(must_create)
+        self._cache.set(self.cache_key, self._get_session(),
+                        self.get_expiry_age())
+        if self._cache.add(self.pending_key, True,
+                           delay * PENDING_TIMEOUT_FACTOR):
+            from ..tasks import write_session
+            write_session.apply_async((self.session_key,), countdown=delay)
+
+    def write_behind(self) -> bool:
+        """Write session from cache to database, return if written."""
+        # later changes schedule the next write
+        self._cache.delete(self.pending_key)
+        data = self._cache.get(self.cache_key)
+        if data is None:
+            # expired or deleted
+            return False
+        self._session_cache = data
+        try:
+            cached_db.DBStore.save(self)
+        except UpdateError:
+            # deleted from database meanwhile
+            return False
+        return True
@@ -0,0 +1,24 @@
+"""Django templates timed by profiling of views."""
+from django.template.backends import django
+
+from ..profiling import template_timer
+
+
+class Template(django.Template):
+    def render(self, context=None, request=None):
+        with template_timer():
+            return super().render(context, request)
+
+
+class DjangoTemplates(django.DjangoTemplates):
+    """
+    Django templates backend counting rendering of top level templates.
+
+    Included templates are rendered as part of their parents.
+    """
+
+    def get_template(self, template_name):
+        return Template(super().get_template(template_name).template, self)
+
+    def from_string(self, template_code):
+        return Template(super().from_string(template_code).template, self)
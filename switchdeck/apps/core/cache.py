@@ -0,0 +1,214 @@
+"""
+Project wide cache with tag based invalidation.
+
+Entries are stored under namespaced keys together with versions of their
+tags. Invalidated tag loses its version, so entries stored with the old
+one are missed on next read, without knowing their keys.
+
+Tags of models listed in ``CACHE_INVALIDATED_MODELS`` are invalidated
+after commit of save and delete of their objects: ``<app>.<model>`` on
+change of any object and ``<app>.<model>:<pk>`` on change of the one.
+Views, functions and querysets opt in with ``cache_view``, ``cached`` and
+``cached_queryset``.
+"""
+import functools
+import hashlib
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.exceptions import EmptyResultSet
+from django.db import transaction
+
+from .profiling import record_cache
+
+TAG_NAMESPACE = 'tag'
+# longer keys are hashed, keys of some backends are limited
+MAX_KEY_LENGTH = 200
+_MISSING = object()
+
+
+def make_key(namespace: str, *parts) -> str:
+    """Return key of cache entry in namespace."""
+    key = ':'.join(str(part) for part in parts)
+    if len(key) > MAX_KEY_LENGTH:
+        key = hashlib.md5(key.encode()).hexdigest()
+    return f'{namespace}:{key}'
+
+
+def model_tag(model, pk=None) -> str:
+    """Return tag of all objects of model or of one object."""
+    label = model._meta.label_lower
+    return label if pk is None else f'{label}:{pk}'
+
+
+def is_invalidated_model(model) -> bool:
+    """Return True if tags of model are invalidated by signals."""
+    return model._meta.label_lower in settings.CACHE_INVALIDATED_MODELS
+
+
+def _tag_keys(tags) -> list:
+    return [make_key(TAG_NAMESPACE, tag) for tag in tags]
+
+
+def invalidate(*tags) -> None:
+    """Invalidate entries stored with any of tags."""
+    if tags:
+        cache.delete_many(_tag_keys(tags))
+
+
+def invalidate_on_commit(*tags) -> None:
+    """
+    Invalidate entries after commit of current transaction.
+
+    Reader between invalidation in transaction and commit would store
+    value of old rows with new versions of tags.
+    """
+    if tags:
+        transaction.on_commit(lambda: invalidate(*tags))
+
+
+def _lookup(key: str, tags) -> tuple:
+    """
+    Return value of valid entry or ``_MISSING``, and versions of tags.
+
+    Missing tags get new versions, value computed after the lookup is
+    stored with returned versions, so value computed concurrently with
+    invalidation is not stored as valid one.
+    """
+    tag_keys = _tag_keys(tags)
+    stored = cache.get_many([key, *tag_keys])
+    versions = [stored.get(tag_key) for tag_key in tag_keys]
+    entry = stored.get(key)
+    if entry is not None and None not in versions and entry[0] == versions:
+        record_cache(hit=True)
+        return entry[1], versions
+    record_cache(hit=False)
+    missing = {tag_key: uuid.uuid4().hex
+               for tag_key, version in zip(tag_keys, versions)
+               if version is None}
+    if missing:
+        cache.set_many(missing, None)
+        versions = [version or missing[tag_key]
+                    for tag_key, version in zip(tag_keys, versions)]
+    return _MISSING, versions
+
+
+def get_or_set(key: str, default, tags=(), timeout=DEFAULT_TIMEOUT):
+    """Return value of entry, computed by callable ``default`` if missed."""
+    value, versions = _lookup(key, tags)
+    if value is _MISSING:
+        value = default()
+        cache.set(key, (versions, value), timeout)
+    return value
+
+
+def cached(namespace: str, tags=(), timeout=DEFAULT_TIMEOUT):
+    """
+    Decorate function to cache its results by arguments.
+
+    ``tags`` is list of tags or callable returning it by arguments of
+    function, arguments are part of key by their ``str()``.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(namespace, func.__qualname__, *args,
+                           *sorted(kwargs.items()))
+            entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+            return get_or_set(key, lambda: func(*args, **kwargs),
+                              entry_tags, timeout)
+        return wrapper
+    return decorator
+
+
+@functools.lru_cache(maxsize=None)
+def _models_by_table() -> dict:
+    return {model._meta.db_table: model
+            for model in apps.get_models(include_auto_created=True)}
+
+
+def queryset_tags(queryset) -> list:
+    """Return tags of invalidated models of tables joined by queryset."""
+    # compiling the query registers its joins
+    str(queryset.query)
+    models_by_table = _models_by_table()
+    tags = set()
+    for alias in queryset.query.alias_map.values():
+        model = models_by_table.get(alias.table_name)
+        if model is not None and is_invalidated_model(model):
+            tags.add(model_tag(model))
+    if is_invalidated_model(queryset.model):
+        tags.add(model_tag(queryset.model))
+    return sorted(tags)
+
+
+def cached_queryset(queryset, namespace: str = 'queryset', tags=None,
+                    timeout=DEFAULT_TIMEOUT) -> list:
+    """
+    Return cached list of objects of queryset.
+
+    Entry is tagged by invalidated models of joined tables if ``tags`` are
+    not given. Changes of other models and of prefetched objects are seen
+    after timeout only, pass their tags explicitly.
+    """
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return []
+    key = make_key(namespace, hashlib.md5(
+        f'{queryset.db}:{sql}:{params!r}'.encode()).hexdigest())
+    if tags is None:
+        tags = queryset_tags(queryset)
+    return get_or_set(key, lambda: list(queryset.all()), tags, timeout)
+
+
+def _is_cacheable_request(request) -> bool:
+    return request.method in ('GET', 'HEAD') \
+        and not request.user.is_authenticated
+
+
+def _is_cacheable_response(request, response) -> bool:
+    # pages with csrf token, messages or cookies are personal
+    return response.status_code == 200 and not response.cookies \
+        and not request.META.get('CSRF_COOKIE_USED') \
+        and not getattr(get_messages(request), 'used', False)
+
+
+def cache_view(namespace: str, tags=(), timeout=DEFAULT_TIMEOUT):
+    """
+    Decorate view to cache its pages for anonymous users.
+
+    Pages are keyed by absolute url and ``Accept`` header. ``tags`` is list
+    of tags or callable returning it by arguments of view. Pages with
+    personal content, like csrf token or messages, are not cached. Use
+    ``method_decorator`` to decorate class based views.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _is_cacheable_request(request):
+                return view(request, *args, **kwargs)
+            key = make_key(namespace, request.build_absolute_uri(),
+                           request.META.get('HTTP_ACCEPT', ''))
+            entry_tags = tags(request, *args, **kwargs) \
+                if callable(tags) else tags
+            response, versions = _lookup(key, entry_tags)
+            if response is not _MISSING:
+                return response
+            response = view(request, *args, **kwargs)
+
+            def store(response):
+                if _is_cacheable_response(request, response):
+                    cache.set(key, (versions, response), timeout)
+
+            if getattr(response, 'is_rendered', True):
+                store(response)
+            else:
+                response.add_post_render_callback(store)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,244 @@
+"""
+Synthetic marketplace dataset for benchmarks and load tests.
+
+Amounts of objects are proportional to ``scale``, scale 1 is about 1000
+profiles with 10000 lots. Data is random, but the same for the same
+``seed``. Popularity of games and places follows Zipf's law, props and
+prices of lots are distributed as on live site. Objects are inserted by
+``bulk_create``, so signals are not sent: counters of places, versions of
+api collections and cache tags are updated once after inserts. Names of
+objects start with ``prefix``, to keep several datasets in one database.
+"""
+import datetime
+import decimal
+import random
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from switchdeck.apps.catalog_service.models import Catalog, Link, ParseResult
+from switchdeck.apps.chat.ingest import ingest_messages
+from switchdeck.apps.chat.models import Dialog
+from switchdeck.apps.chat.partitions import ensure_partitions
+from switchdeck.apps.game.models import Game
+from switchdeck.apps.lot.models import Comment, Lot
+from switchdeck.apps.place.models import Place
+from switchdeck.apps.users.models import Profile
+
+from .cache import invalidate
+from .models import CollectionVersion
+
+BATCH_SIZE = 1000
+# amounts of objects of scale 1
+PLACES = 20
+GAMES = 300
+PROFILES = 1000
+LOTS_PER_PROFILE = 10
+COMMENTS_PER_OFFER = 0.5
+DIALOGS = 300
+MESSAGES_PER_DIALOG = 20
+CATALOGS = 3
+PARSE_RESULTS_PER_LINK = 5
+# shares of props of lots
+PROP_WEIGHTS = {'k': 40, 'w': 25, 's': 20, 'b': 15}
+# password of every generated user
+PASSWORD = 'password'
+ACTIVITY_DAYS = 90
+WORDS = ('great', 'condition', 'cartridge', 'box', 'manual', 'trade',
+         'swap', 'mint', 'sealed', 'cheap', 'fast', 'meet', 'center',
+         'deal', 'price', 'collector', 'edition', 'used', 'new', 'mail')
+
+
+def _zipf_weights(amount: int) -> list:
+    return [1 / rank for rank in range(1, amount + 1)]
+
+
+def _text(rng, words: int) -> str:
+    return ' '.join(rng.choices(WORDS, k=words)).capitalize()
+
+
+def _price(rng) -> decimal.Decimal:
+    # most games are sold for 20-60, few rare ones are expensive
+    value = min(rng.lognormvariate(3.5, 0.5), 9999)
+    return decimal.Decimal(f'{value:.2f}')
+
+
+def _recent(rng, now, days: int = ACTIVITY_DAYS) -> datetime.datetime:
+    return now - datetime.timedelta(seconds=rng.uniform(0, days * 86400))
+
+
+def _bulk_create(model, objects) -> list:
+    return model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+
+
+class DatasetGenerator:
+    """Generator of dataset, objects are kept for relations."""
+
+    def __init__(self, scale: float = 1, seed: int = 0,
+                 prefix: str = 'synth'):
+        self.scale = scale
+        self.rng = random.Random(seed)
+        # uuids are unique in datasets with the same seed
+        self.uuid_rng = random.Random(f'{prefix}:{seed}')
+        self.prefix = prefix
+        self.now = timezone.now()
+        self.counts = {}
+
+    def uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.uuid_rng.getrandbits(128), version=4)
+
+    def amount(self, base: float) -> int:
+        return max(1, round(base * self.scale))
+
+    def create(self, name: str, model, objects) -> list:
+        objects = _bulk_create(model, objects)
+        self.counts[name] = self.counts.get(name, 0) + len(objects)
+        return objects
+
+    def places(self) -> None:
+        self.place_list = self.create('places', Place, [
+            Place(name=f'{self.prefix} {number}',
+                  slug=f'{self.prefix}-{number}')
+            for number in range(self.amount(PLACES))])
+
+    def games(self) -> None:
+        self.game_list = self.create('games', Game, [
+            Game(name=f'{self.prefix} game {number}',
+                 slug=f'{self.prefix}-game-{number}',
+                 description=_text(self.rng, 30))
+            for number in range(self.amount(GAMES))])
+
+    def profiles(self) -> None:
+        # hashing is slow, users share one hash
+        password = make_password(PASSWORD)
+        users = self.create('users', get_user_model(), [
+            get_user_model()(username=f'{self.prefix}{number}',
+                             email=f'{self.prefix}{number}@example.com',
+                             password=password, date_joined=self.now)
+            for number in range(self.amount(PROFILES))])
+        places = self.rng.choices(self.place_list,
+                                  _zipf_weights(len(self.place_list)),
+                                  k=len(users))
+        self.profile_list = self.create('profiles', Profile, [
+            Profile(user=user, place=place)
+            for user, place in zip(users, places)])
+
+    def lots(self) -> None:
+        weights = _zipf_weights(len(self.game_list))
+        props, prop_weights = zip(*PROP_WEIGHTS.items())
+        lots = []
+        for profile in self.profile_list:
+            amount = self.rng.randint(0, 2 * LOTS_PER_PROFILE)
+            # profile has a game once
+            games = {game.pk: game for game in self.rng.choices(
+                self.game_list, weights, k=amount)}
+            for game in games.values():
+                prop = self.rng.choices(props, prop_weights)[0]
+                up_time = _recent(self.rng, self.now)
+                lots.append(Lot(
+                    profile=profile, place_id=profile.place_id, game=game,
+                    prop=prop, active=self.rng.random() < 0.9,
+                    price=_price(self.rng) if prop in 'sb'
+                    else decimal.Decimal(),
+                    desc=_text(self.rng, self.rng.randint(0, 20)),
+                    up_time=up_time,
+                    public_date=up_time - datetime.timedelta(
+                        days=self.rng.randint(0, 30))))
+        self.lot_list = self.create('lots', Lot, lots)
+
+    def comments(self) -> None:
+        offers = [lot for lot in self.lot_list if lot.prop in 'sb']
+        self.create('comments', Comment, [
+            Comment(lot=lot, author=self.rng.choice(self.profile_list),
+                    text=_text(self.rng, self.rng.randint(3, 15)))
+            for lot in offers
+            for _ in range(self.rng.randint(0, int(2 * COMMENTS_PER_OFFER)))])
+
+    def change_to(self) -> None:
+        wanted = {}
+        for lot in self.lot_list:
+            if lot.prop in 'bw':
+                wanted.setdefault(lot.profile_id, []).append(lot)
+        links = []
+        for lot in self.lot_list:
+            if lot.prop == 's' and wanted.get(lot.profile_id) \
+                    and self.rng.random() < 0.5:
+                candidates = wanted[lot.profile_id]
+                for target in self.rng.sample(
+                        candidates, min(len(candidates), 2)):
+                    links.append(Lot.change_to.through(
+                        from_lot=lot, to_lot=target))
+        self.create('change_to', Lot.change_to.through, links)
+
+    def messages(self) -> None:
+        users = [profile.user_id for profile in self.profile_list]
+        if len(users) < 2:
+            return
+        pairs = {tuple(sorted(self.rng.sample(users, 2)))
+                 for _ in range(self.amount(DIALOGS))}
+        dialogs = self.create('dialogs', Dialog, [
+            Dialog(uuid=self.uuid(), participant1_id=first,
+                   participant2_id=second)
+            for first, second in sorted(pairs)])
+        ensure_partitions()
+        rows = (
+            {'dialog': str(dialog.uuid), 'text': _text(self.rng, 8),
+             'sender': self.rng.choice(
+                 (dialog.participant1_id, dialog.participant2_id)),
+             'datetime': _recent(self.rng, self.now, 60),
+             'uuid': str(self.uuid())}
+            for dialog in dialogs
+            for _ in range(self.rng.randint(1, 2 * MESSAGES_PER_DIALOG)))
+        self.counts['messages'] = ingest_messages(rows,
+                                                  batch_size=BATCH_SIZE)
+
+    def parse_results(self) -> None:
+        catalogs = self.create('catalogs', Catalog, [
+            Catalog(name=f'{self.prefix} catalog {number}',
+                    slug=f'{self.prefix}-catalog-{number}',
+                    url=f'https://catalog{number}.example.com/',
+                    price_selector='.price')
+            for number in range(CATALOGS)])
+        links = self.create('links', Link, [
+            Link(game=game, catalog=catalog,
+                 url=f'{catalog.url}{game.slug}/')
+            for game in self.game_list for catalog in catalogs
+            if self.rng.random() < 0.5])
+        results = []
+        for link in links:
+            price = _price(self.rng)
+            for _ in range(PARSE_RESULTS_PER_LINK):
+                successful = self.rng.random() < 0.9
+                results.append(ParseResult(
+                    link=link, page_file='', successful=successful,
+                    price=price if successful else None,
+                    exception=None if successful else 'Price not found.'))
+        self.create('parse_results', ParseResult, results)
+
+    def generate(self) -> dict:
+        """Insert dataset, return amounts of inserted objects by kinds."""
+        with transaction.atomic():
+            self.places()
+            self.games()
+            self.profiles()
+            self.lots()
+            self.comments()
+            self.change_to()
+            self.messages()
+            self.parse_results()
+            for place in self.place_list:
+                place.update_counters()
+            for label in settings.API_VERSIONED_MODELS:
+                CollectionVersion.bump(label)
+        invalidate(*settings.CACHE_INVALIDATED_MODELS)
+        return self.counts
+
+
+def generate_dataset(scale: float = 1, seed: int = 0,
+                     prefix: str = 'synth') -> dict:
+    """Insert synthetic dataset, see module documentation."""
+    return DatasetGenerator(scale, seed, prefix).generate()
@@ -0,0 +1,56 @@
+import psycopg2
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = ('Show usage of PostgreSQL connections by applications and '
+            'states, and pools of PgBouncer if its admin user is set.')
+
+    def write_table(self, header, rows):
+        rows = [header] + [[str(value) for value in row] for row in rows]
+        widths = [max(len(row[i]) for row in rows)
+                  for i in range(len(header))]
+        for row in rows:
+            self.stdout.write('  '.join(value.ljust(width) for value, width
+                                        in zip(row, widths)).rstrip())
+
+    def database_stats(self, alias):
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SHOW max_connections')
+            max_connections = cursor.fetchone()[0]
+            cursor.execute(
+                'SELECT application_name, state, count(*) '
+                'FROM pg_stat_activity WHERE datname = current_database() '
+                'GROUP BY 1, 2 ORDER BY 1, 2')
+            rows = cursor.fetchall()
+        used = sum(row[2] for row in rows)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{alias}: {used} of {max_connections} connections'))
+        self.write_table(['application', 'state', 'connections'], rows)
+
+    def pgbouncer_stats(self):
+        connection = psycopg2.connect(
+            host=settings.PGBOUNCER_HOST,
+            port=settings.DATABASES['default']['PORT'],
+            dbname='pgbouncer', user=settings.PGBOUNCER_ADMIN_USER,
+            password=settings.PGBOUNCER_ADMIN_PASSWORD)
+        # admin console does not support transactions
+        connection.autocommit = True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SHOW POOLS')
+                header = [column.name for column in cursor.description]
+                rows = cursor.fetchall()
+        finally:
+            connection.close()
+        self.stdout.write(self.style.MIGRATE_HEADING('pgbouncer pools'))
+        self.write_table(header, rows)
+
+    def handle(self, *args, **options):
+        for alias in connections:
+            if connections[alias].vendor == 'postgresql':
+                self.database_stats(alias)
+        if settings.PGBOUNCER_HOST and settings.PGBOUNCER_ADMIN_USER:
+            self.pgbouncer_stats()
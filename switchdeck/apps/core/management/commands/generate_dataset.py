@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from switchdeck.apps.core.dataset import PASSWORD, generate_dataset
+
+
+class Command(BaseCommand):
+    help = ('Fill database with synthetic places, profiles, games, lots, '
+            'comments, chat messages and parse results for benchmarks. '
+            'Scale 1 is about 1000 profiles with 10000 lots.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1)
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed of random generator, the same seed '
+                                 'gives the same data.')
+        parser.add_argument('--prefix', default='synth',
+                            help='Prefix of names of objects, should be '
+                                 'unique for every dataset in database.')
+
+    def handle(self, *args, scale, seed, prefix, **options):
+        if scale <= 0:
+            raise CommandError('Scale must be positive.')
+        counts = generate_dataset(scale, seed, prefix)
+        for name, amount in counts.items():
+            self.stdout.write(f'{name:<15} {amount:>10}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Dataset generated, password of users is "{PASSWORD}".'))
@@ -0,0 +1,75 @@
+"""Middlewares shared by all apps."""
+import random
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .profiling import profiled
+from .routers import use_replicas
+
+PRIMARY_COOKIE_NAME = 'read_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Read from replicas in safe requests, keep writers on primary.
+
+    Unsafe requests read from primary, as do requests after writes.
+    Writer gets cookie pinning their reads to primary for
+    ``REPLICA_PIN_SECONDS``, so their next pages show their changes
+    despite of replication lag.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def is_pinned(self, request) -> bool:
+        try:
+            pinned_until = float(request.COOKIES[PRIMARY_COOKIE_NAME])
+        except (KeyError, ValueError):
+            return False
+        return pinned_until > time.time()
+
+    def __call__(self, request):
+        unsafe = request.method not in SAFE_METHODS
+        with use_replicas(primary=unsafe or self.is_pinned(request)) \
+                as state:
+            response = self.get_response(request)
+        if unsafe or state.wrote:
+            seconds = settings.REPLICA_PIN_SECONDS
+            response.set_cookie(PRIMARY_COOKIE_NAME,
+                                str(int(time.time()) + seconds),
+                                max_age=seconds, httponly=True,
+                                samesite='Lax')
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile part of requests set by ``PROFILING_SAMPLE_RATE`` by views.
+
+    Not used if rate is 0. It is the first middleware, so others are
+    measured too. See ``switchdeck.apps.core.profiling``.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def view_name(self, request) -> str:
+        match = request.resolver_match
+        return match.view_name if match else UNRESOLVED_VIEW
+
+    def __call__(self, request):
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+        with profiled(lambda: self.view_name(request)):
+            response = self.get_response(request)
+            # template responses are rendered after middlewares
+            if not getattr(response, 'is_rendered', True):
+                response.render()
+        return response
@@ -0,0 +1,27 @@
+# Generated by Django 4.0 on 2026-10-19 18:34
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CollectionVersion',
+            fields=[
+                ('label', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Model label')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Version')),
+                ('modified', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Modified')),
+            ],
+            options={
+                'verbose_name': 'Collection version',
+                'verbose_name_plural': 'Collection versions',
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class CollectionVersion(models.Model):
+    """
+    Version of collection of objects of one model.
+
+    Bumped after commit of every change of objects. Used by api to answer
+    conditional requests without querying and serializing objects.
+    """
+
+    label = models.CharField(
+        primary_key=True,
+        max_length=100,
+        verbose_name=_('Model label'))
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name=_('Version'))
+    modified = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('Modified'))
+
+    class Meta:
+        verbose_name = _('Collection version')
+        verbose_name_plural = _('Collection versions')
+
+    def __str__(self) -> str:
+        return f'{self.label}:{self.version}'
+
+    @classmethod
+    def bump(cls, label: str) -> None:
+        """Increment version of collection of model with ``label``."""
+        now = timezone.now()
+        updated = cls.objects.filter(label=label).update(
+            version=F('version') + 1, modified=now)
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(label=label, version=1, modified=now)
+        except IntegrityError:
+            # created concurrently
+            cls.objects.filter(label=label).update(
+                version=F('version') + 1, modified=now)
+
+    @classmethod
+    def bump_on_commit(cls, label: str) -> None:
+        """
+        Increment version after commit of current transaction.
+
+        Bump locks row of collection until commit, in transaction of change
+        it would serialize all writers of model.
+        """
+        transaction.on_commit(lambda: cls.bump(label))
+
+    @classmethod
+    def get_many(cls, labels) -> dict:
+        """Return ``{label: (version, modified)}``, missing labels omitted."""
+        return {label: (version, modified) for label, version, modified
+                in cls.objects.filter(label__in=labels)
+                .values_list('label', 'version', 'modified')}
@@ -0,0 +1,223 @@
+"""
+Sampled profiling of views.
+
+``ProfilingMiddleware`` records wall time, amount and time of database
+queries, time of rendering of templates and hits and misses of project
+cache (see ``switchdeck.apps.core.cache``) of sampled requests, part of
+requests is set by ``PROFILING_SAMPLE_RATE``. Records are aggregated by
+views in memory of process, percentiles are computed over last
+``PROFILING_WINDOW`` requests of view. Every worker process has its own
+statistics, Prometheus series are labeled by ``worker`` (host and pid of
+process), so counters of workers are not mixed and can be summed up by
+queries.
+
+Queries are timed by execute wrappers of connections, rendering by
+``DjangoTemplates`` backend of ``switchdeck.apps.core.backends``.
+"""
+import collections
+import contextlib
+import contextvars
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# metrics of samples: name, description
+METRICS = [
+    ('duration_seconds', 'Wall time of request'),
+    ('queries', 'Amount of database queries'),
+    ('query_seconds', 'Time of database queries'),
+    ('template_seconds', 'Time of rendering of templates'),
+]
+QUANTILES = (0.5, 0.95, 0.99)
+
+_profile = contextvars.ContextVar('profile', default=None)
+
+
+class Profile:
+    """Measurements of one request, shared by threads of its queries."""
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._lock = threading.Lock()
+
+    def add(self, **values) -> None:
+        with self._lock:
+            for name, value in values.items():
+                setattr(self, name, getattr(self, name) + value)
+
+
+class ViewStats:
+    """Statistics of view: totals and window of last samples."""
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.totals = {name: 0 for name, _ in METRICS}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.samples = collections.deque(maxlen=window)
+
+    def add(self, sample: dict, profile: Profile) -> None:
+        self.count += 1
+        for name, value in sample.items():
+            self.totals[name] += value
+        self.cache_hits += profile.cache_hits
+        self.cache_misses += profile.cache_misses
+        self.samples.append(sample)
+
+    def summary(self) -> dict:
+        """Return count, cache lookups, sums and quantiles of metrics."""
+        metrics = {}
+        for name, _ in METRICS:
+            values = sorted(sample[name] for sample in self.samples)
+            # nearest rank
+            quantiles = [(quantile, values[min(len(values) - 1,
+                                               int(quantile * len(values)))])
+                         for quantile in QUANTILES] if values else []
+            metrics[name] = {'sum': self.totals[name],
+                             'mean': self.totals[name] / self.count,
+                             'quantiles': quantiles}
+        return {'count': self.count, 'cache_hits': self.cache_hits,
+                'cache_misses': self.cache_misses, 'metrics': metrics}
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def record(view: str, sample: dict, profile: Profile) -> None:
+    with _stats_lock:
+        if view not in _stats:
+            _stats[view] = ViewStats(settings.PROFILING_WINDOW)
+        _stats[view].add(sample, profile)
+
+
+def summaries() -> list:
+    """Return summaries of views of this process, ordered by view names."""
+    with _stats_lock:
+        return [{'view': view, **stats.summary()}
+                for view, stats in sorted(_stats.items())]
+
+
+def reset() -> None:
+    """Forget statistics of this process."""
+    with _stats_lock:
+        _stats.clear()
+
+
+def record_cache(hit: bool) -> None:
+    """Count lookup of project cache by profiled request."""
+    profile = _profile.get()
+    if profile is not None:
+        profile.add(**{'cache_hits' if hit else 'cache_misses': 1})
+
+
+@contextlib.contextmanager
+def template_timer():
+    """Count time of block as rendering of template by profiled request."""
+    profile = _profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(template_seconds=time.perf_counter() - start)
+
+
+def _time_query(execute, sql, params, many, context):
+    profile = _profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.add(queries=1,
+                    query_seconds=time.perf_counter() - start)
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    # wrappers outlive reconnections of the same connection object, the
+    # first one is not popped by ``execute_wrapper`` blocks
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _time_query)
+
+
+@contextlib.contextmanager
+def profiled(view_name):
+    """
+    Profile block as request, yield its ``Profile``.
+
+    ``view_name`` is called after the block to name the view of request.
+    """
+    profile = Profile()
+    token = _profile.set(profile)
+    start = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        duration = time.perf_counter() - start
+        _profile.reset(token)
+    record(view_name(), {'duration_seconds': duration,
+                         'queries': profile.queries,
+                         'query_seconds': profile.query_seconds,
+                         'template_seconds': profile.template_seconds},
+           profile)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"') \
+        .replace('\n', '\\n')
+
+
+def worker_name() -> str:
+    """Return name of worker process, host and pid."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def prometheus_metrics() -> str:
+    """
+    Return statistics of views and connections of this process in
+    Prometheus format.
+    """
+    from .backends.postgresql.base import connection_stats
+    views = summaries()
+    worker = f'worker="{_escape(worker_name())}"'
+    lines = []
+    for name, description in METRICS:
+        metric = f'switchdeck_view_{name}'
+        lines += [f'# HELP {metric} {description}.',
+                  f'# TYPE {metric} summary']
+        for view in views:
+            label = f'{worker},view="{_escape(view["view"])}"'
+            values = view['metrics'][name]
+            for quantile, value in values['quantiles']:
+                lines.append(
+                    f'{metric}{{{label},quantile="{quantile}"}} {value}')
+            lines += [f'{metric}_sum{{{label}}} {values["sum"]}',
+                      f'{metric}_count{{{label}}} {view["count"]}']
+    for result in ('hits', 'misses'):
+        metric = f'switchdeck_view_cache_{result}_total'
+        lines += [f'# HELP {metric} Lookups of project cache.',
+                  f'# TYPE {metric} counter']
+        for view in views:
+            lines.append(f'{metric}{{{worker},'
+                         f'view="{_escape(view["view"])}"}} '
+                         f'{view["cache_" + result]}')
+    metric = 'switchdeck_db_connection_events_total'
+    lines += [f'# HELP {metric} Events of database connections.',
+              f'# TYPE {metric} counter']
+    for event, value in sorted(connection_stats().items()):
+        lines.append(f'{metric}{{{worker},event="{event}"}} {value}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,202 @@
+"""
+Audit of queries of requests made by tests.
+
+``QueryAuditRunner`` runs tests with ``QueryAuditMiddleware``, which
+records queries of every request and:
+
+* fails request exceeding query budget of its url, test gets
+  ``QueryBudgetExceeded``. Budgets are declared by url names in
+  ``query_budgets`` dicts of url modules, next to their urlpatterns;
+* reports queries repeated ``QUERY_AUDIT_REPEATS`` or more times by
+  request, which are usually N+1 queries of related objects in loops;
+* reports sequential scans of tables in plans of selects, planned with
+  disabled sequential scans on PostgreSQL, so only scans without usable
+  index are left.
+
+Report is printed after tests, selects are explained before test
+databases are destroyed. Queries are recorded in thread of
+request, queries of ``gather_queries`` run in thread pool outside of
+test transactions are not seen.
+"""
+import collections
+import contextlib
+import functools
+import re
+import sys
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+from django.urls import URLResolver, get_resolver
+
+SKIPPED_QUERY = re.compile(r'^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO)',
+                           re.IGNORECASE)
+IN_PARAMS = re.compile(r'IN \((%s(, )?)+\)')
+SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?!.* USING )',
+                         re.MULTILINE)
+POSTGRESQL_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _collect_budgets(resolver, namespace: str, budgets: dict) -> None:
+    module_budgets = getattr(resolver.urlconf_module, 'query_budgets', {})
+    for name, budget in module_budgets.items():
+        budgets[namespace + name] = budget
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            child_namespace = namespace
+            if pattern.namespace:
+                child_namespace += pattern.namespace + ':'
+            _collect_budgets(pattern, child_namespace, budgets)
+
+
+@functools.lru_cache(maxsize=None)
+def query_budgets() -> dict:
+    """Return query budgets of url names of ``ROOT_URLCONF``."""
+    budgets = {}
+    _collect_budgets(get_resolver(), '', budgets)
+    return budgets
+
+
+def query_shape(sql: str) -> str:
+    """Return sql with lists of parameters collapsed."""
+    return IN_PARAMS.sub('IN (...)', sql)
+
+
+def _plan(connection, sql: str, params) -> str:
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql, params)
+            return '\n'.join(row[0] for row in cursor.fetchall())
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return '\n'.join(row[-1] for row in cursor.fetchall())
+    return ''
+
+
+def sequential_scans(alias: str, sql: str, params) -> list:
+    """Return tables scanned sequentially by plan of select."""
+    connection = connections[alias]
+    try:
+        # failed explain must not break transaction of test, settings of
+        # planner are rolled back
+        with transaction.atomic(using=alias):
+            plan = _plan(connection, sql, params)
+            transaction.set_rollback(True, using=alias)
+    except DatabaseError:
+        return []
+    if connection.vendor == 'postgresql':
+        return POSTGRESQL_SCAN.findall(plan)
+    return SQLITE_SCAN.findall(plan)
+
+
+class Report:
+    """Findings of audit: repeated queries and sequential scans by views."""
+
+    def __init__(self):
+        # {(view, shape): most repeats by one request}
+        self.repeats = {}
+        # {(alias, shape): (sql, params, views)} of selects to explain
+        self.selects = {}
+        # {(view, table): shape}
+        self.scans = {}
+
+    def add(self, view: str, queries: list) -> None:
+        """Audit queries of request, list of (alias, sql, params)."""
+        counts = collections.Counter(
+            query_shape(sql) for _, sql, _ in queries)
+        for shape, count in counts.items():
+            if count >= settings.QUERY_AUDIT_REPEATS:
+                key = (view, shape)
+                self.repeats[key] = max(count, self.repeats.get(key, 0))
+        for alias, sql, params in queries:
+            if sql.lstrip().upper().startswith('SELECT'):
+                select = self.selects.setdefault(
+                    (alias, query_shape(sql)), (sql, params, set()))
+                select[2].add(view)
+
+    def explain(self) -> None:
+        """
+        Find sequential scans in plans of selects.
+
+        Selects are explained once after tests, explains made by requests
+        would be counted by tests of queries.
+        """
+        for (alias, shape), (sql, params, views) in self.selects.items():
+            for table in sequential_scans(alias, sql, params):
+                for view in views:
+                    self.scans.setdefault((view, table), shape)
+        self.selects.clear()
+
+    def write(self, stream) -> None:
+        if self.repeats:
+            stream.write('\nRepeated queries, possible N+1:\n')
+            for (view, shape), count in sorted(self.repeats.items()):
+                stream.write(f'  {view}: {count} times {shape}\n')
+        if self.scans:
+            stream.write('\nSequential scans:\n')
+            for (view, table), shape in sorted(self.scans.items()):
+                stream.write(f'  {view}: {table} by {shape}\n')
+
+
+report = Report()
+
+
+class QueryAuditMiddleware:
+    """Audit queries of requests, see module documentation."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            if not SKIPPED_QUERY.match(sql):
+                queries.append((context['connection'].alias, sql, params))
+            return execute(sql, params, many, context)
+
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(record))
+            response = self.get_response(request)
+            # template responses are rendered after middlewares
+            if not getattr(response, 'is_rendered', True):
+                response.render()
+        match = request.resolver_match
+        if match is None:
+            return response
+        report.add(match.view_name, queries)
+        budget = query_budgets().get(match.view_name)
+        if budget is not None and len(queries) > budget:
+            raise QueryBudgetExceeded(
+                f'{request.method} {request.get_full_path()} '
+                f'({match.view_name}) made {len(queries)} queries, '
+                f'budget is {budget}:\n' + '\n'.join(
+                    sql for _, sql, _ in queries))
+        return response
+
+
+class QueryAuditRunner(DiscoverRunner):
+    """Test runner auditing queries of requests of tests."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._audit_settings = override_settings(MIDDLEWARE=[
+            'switchdeck.apps.core.query_audit.QueryAuditMiddleware',
+            *settings.MIDDLEWARE])
+        self._audit_settings.enable()
+
+    def teardown_databases(self, old_config, **kwargs):
+        report.explain()
+        super().teardown_databases(old_config, **kwargs)
+
+    def teardown_test_environment(self, **kwargs):
+        self._audit_settings.disable()
+        super().teardown_test_environment(**kwargs)
+        report.write(sys.stderr)
@@ -0,0 +1,125 @@
+"""
+Routing of reads to replicas of default database.
+
+Reads go to replicas listed in ``DATABASE_REPLICAS`` only inside safe
+requests (see ``ReplicaRoutingMiddleware``) and ``use_replicas`` blocks,
+everything else, like tasks and commands, works with primary. Reads go to
+primary after any write of request or block, inside transactions and
+``use_primary`` blocks. Replicas lagging more than ``REPLICA_MAX_LAG``
+seconds or unavailable are skipped.
+"""
+import contextlib
+import contextvars
+import random
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+_routing = contextvars.ContextVar('replica_routing', default=None)
+_forced_primary = contextvars.ContextVar('forced_primary', default=False)
+# {alias: (time of check, lag in seconds)}
+_lags = {}
+
+
+class RoutingState:
+    """Routing of reads of request or ``use_replicas`` block."""
+
+    def __init__(self, primary: bool = False):
+        self.primary = primary
+        self.wrote = False
+
+    @property
+    def reads_primary(self) -> bool:
+        return self.primary or self.wrote
+
+
+@contextlib.contextmanager
+def use_replicas(primary: bool = False):
+    """Allow reads from replicas in block, yield its ``RoutingState``."""
+    state = RoutingState(primary)
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
+
+
+@contextlib.contextmanager
+def use_primary():
+    """Force all reads of block to primary."""
+    token = _forced_primary.set(True)
+    try:
+        yield
+    finally:
+        _forced_primary.reset(token)
+
+
+def replica_lag(alias: str) -> float:
+    """Return replication lag of replica in seconds, infinity if down."""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0
+    try:
+        with connection.cursor() as cursor:
+            # replica without pending wal is not lagging, even if primary
+            # had no transactions for a long time
+            cursor.execute(
+                'SELECT CASE WHEN pg_last_wal_receive_lsn() '
+                '= pg_last_wal_replay_lsn() THEN 0 ELSE EXTRACT(EPOCH FROM '
+                'now() - pg_last_xact_replay_timestamp()) END')
+            lag = cursor.fetchone()[0]
+    except DatabaseError:
+        return float('inf')
+    return float(lag or 0)
+
+
+def available_replicas() -> list:
+    """Return replicas with acceptable lag, lags are checked periodically."""
+    max_lag = settings.REPLICA_MAX_LAG
+    if max_lag is None:
+        return list(settings.DATABASE_REPLICAS)
+    now = time.monotonic()
+    available = []
+    for alias in settings.DATABASE_REPLICAS:
+        checked, lag = _lags.get(alias, (None, None))
+        if checked is None \
+                or now - checked > settings.REPLICA_LAG_CHECK_INTERVAL:
+            lag = replica_lag(alias)
+            _lags[alias] = (now, lag)
+        if lag <= max_lag:
+            available.append(alias)
+    return available
+
+
+class ReplicaRouter:
+    """Send reads to replicas of default database and writes to primary."""
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or state.reads_primary or _forced_primary.get() \
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        replicas = available_replicas()
+        if not replicas:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            # read your writes
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get schema by replication
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
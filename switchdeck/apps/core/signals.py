@@ -0,0 +1,66 @@
+"""
+Track changes of objects.
+
+Versions of api collections are bumped and cache tags of objects are
+invalidated.
+"""
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .cache import invalidate_on_commit, is_invalidated_model, model_tag
+from .models import CollectionVersion
+
+
+def is_versioned(model) -> bool:
+    return model._meta.label_lower in settings.API_VERSIONED_MODELS
+
+
+def is_versioned_update(model, update_fields) -> bool:
+    unversioned = settings.API_UNVERSIONED_FIELDS.get(
+        model._meta.label_lower, ())
+    return not update_fields or not set(update_fields) <= set(unversioned)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_collection_version(sender, raw=False, update_fields=None,
+                            **kwargs):
+    if not raw and is_versioned(sender) \
+            and is_versioned_update(sender, update_fields):
+        CollectionVersion.bump_on_commit(sender._meta.label_lower)
+
+
+@receiver(m2m_changed)
+def bump_collection_version_m2m(sender, instance, action, reverse, model,
+                                **kwargs):
+    if not action.startswith('post_'):
+        return
+    changed = [model] if reverse else [type(instance)]
+    for changed_model in changed:
+        if is_versioned(changed_model):
+            CollectionVersion.bump_on_commit(
+                changed_model._meta.label_lower)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_cache_tags(sender, instance, raw=False, **kwargs):
+    if not raw and is_invalidated_model(sender):
+        invalidate_on_commit(model_tag(sender),
+                             model_tag(sender, instance.pk))
+
+
+@receiver(m2m_changed)
+def invalidate_cache_tags_m2m(sender, instance, action, model, pk_set,
+                              **kwargs):
+    if not action.startswith('post_'):
+        return
+    tags = []
+    if is_invalidated_model(type(instance)):
+        tags += [model_tag(type(instance)),
+                 model_tag(type(instance), instance.pk)]
+    if is_invalidated_model(model):
+        tags.append(model_tag(model))
+        tags += [model_tag(model, pk) for pk in pk_set or ()]
+    invalidate_on_commit(*tags)
@@ -0,0 +1,79 @@
+"""
+Preparation of master process for forking of workers.
+
+Gunicorn with ``preload_app`` and prefork pool of Celery import the site
+once in master process and fork workers from it. Pages of memory of
+master are shared by workers until written, so master loads lazily loaded
+parts of the site, which every worker would load for itself, closes
+connections, which must not be shared by processes, and moves its objects
+out of garbage collector: collections write to headers of tracked objects
+and would copy their pages into every worker.
+"""
+import gc
+import pathlib
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template import (TemplateDoesNotExist, TemplateSyntaxError,
+                             engines)
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+from django.template.utils import get_app_template_dirs
+from django.urls import get_resolver
+from django.utils import translation
+
+
+def _project_template_names(engine) -> set:
+    project = pathlib.Path(settings.BASE_DIR) / 'switchdeck'
+    directories = [pathlib.Path(directory) for directory in engine.dirs]
+    directories += [directory for directory in map(
+        pathlib.Path, get_app_template_dirs('templates'))
+        if project in directory.parents]
+    return {str(path.relative_to(directory))
+            for directory in directories
+            for path in directory.rglob('*') if path.is_file()}
+
+
+def preload_templates() -> int:
+    """
+    Compile project templates into cached loaders.
+
+    Return amount of compiled templates, engines without cached loader are
+    skipped.
+    """
+    compiled = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates) or not any(
+                isinstance(loader, CachedLoader)
+                for loader in backend.engine.template_loaders):
+            continue
+        for name in _project_template_names(backend.engine):
+            try:
+                backend.engine.get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError):
+                continue
+            compiled += 1
+    return compiled
+
+
+def warm_up() -> None:
+    """
+    Import views of URLconf, load catalogs of translations and compile
+    templates.
+    """
+    get_resolver().url_patterns
+    preload_templates()
+    for language, _ in settings.LANGUAGES:
+        with translation.override(language):
+            pass
+
+
+def prepare_fork() -> None:
+    """Prepare master process for forking, see module documentation."""
+    if not apps.ready:
+        import django
+        django.setup()
+    warm_up()
+    connections.close_all()
+    gc.freeze()
@@ -0,0 +1,17 @@
+from switchdeck.celery import app
+from switchdeck import sitemaps
+from .routers import use_replicas
+
+
+@app.task
+def generate_sitemaps(force=False):
+    # only reads, lagging sitemaps are fine
+    with use_replicas():
+        return sitemaps.generate_sitemaps(force=force)
+
+
+@app.task
+def write_session(session_key):
+    """Write session changed in cache to database."""
+    from .backends.sessions import SessionStore
+    return SessionStore(session_key).write_behind()
@@ -0,0 +1,705 @@
+import asyncio
+import gc
+import gzip
+import json
+import pathlib
+import tempfile
+import threading
+from unittest import mock, skipUnless
+
+from asgiref.sync import async_to_sync
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.template import engines
+from django.test import (RequestFactory, SimpleTestCase, TestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, get_resolver, resolve
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from switchdeck.apps.core.api.serializers import (UnsupportedField,
+                                                  ValuesSerializer)
+from switchdeck.apps.core.api.views import ValuesListMixin
+from switchdeck.apps.core.backends.sessions import SessionStore
+from switchdeck.apps.core import profiling, query_audit
+from switchdeck.apps.core.async_views import gather_queries
+from switchdeck.apps.core.dataset import generate_dataset
+from switchdeck.apps.core.backends.postgresql.base import connection_stats
+from switchdeck.apps.core.middleware import (PRIMARY_COOKIE_NAME,
+                                             ReplicaRoutingMiddleware)
+from switchdeck.apps.core.tasks import write_session
+from switchdeck.apps.core.startup import prepare_fork, preload_templates
+from switchdeck.apps.core.routers import (ReplicaRouter, use_primary,
+                                          use_replicas)
+from switchdeck.apps.core.cache import (cached_queryset, get_or_set,
+                                        invalidate, model_tag)
+
+from switchdeck.apps.game.models import Game
+from switchdeck.apps.lot.models import Comment, Lot
+from switchdeck.apps.place.models import Place
+from switchdeck.apps.users.models import Profile
+from switchdeck.sitemaps import (INDEX_FILE_NAME, MANIFEST_FILE_NAME,
+                                 generate_sitemaps)
+
+
+class APIQueriesTest(TestCase):
+    """Amount of queries of api lists does not grow with amount of rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        minsk = Place.objects.create(name='minsk', slug='minsk')
+        games = [Game.objects.create(name=f'game {i}', slug=f'game-{i}')
+                 for i in range(6)]
+        Game.objects.filter(pk=games[0].pk).update(cover='covers/game-0.png')
+        for i in range(6):
+            profile = Profile.create_profile(f'user{i}', f'user{i}@a.by',
+                                             'password', place=minsk)
+            wish = Lot.objects.create(profile=profile, game=games[i],
+                                      prop='w')
+            for game in games[:4]:
+                lot = Lot.objects.create(profile=profile, game=game,
+                                         prop='s')
+                lot.change_to.add(wish)
+                Comment.objects.create(author=profile, lot=lot, text='hi')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        # warm up per process caches, like current site
+        self.client.get('/api/')
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(200, response.status_code)
+        return response.json(), len(queries)
+
+    def test_lots_list(self):
+        data, count = self.get('/api/lots/')
+        self.assertEqual(24, len(data['results']))
+        # versions, count, page, change_to and comments prefetches
+        self.assertLessEqual(count, 5)
+        self.assertEqual(1, len(data['results'][0]['comments']))
+
+    def test_lots_sparse_fields(self):
+        data, count = self.get('/api/lots/?fields=id,price')
+        self.assertEqual({'id', 'price'}, set(data['results'][0]))
+        self.assertLessEqual(count, 3)
+
+    def test_lots_expand(self):
+        data, count = self.get(
+            '/api/lots/?expand=game,profile,comments,change_to')
+        lot = data['results'][0]
+        self.assertIn('name', lot['game'])
+        self.assertEqual({'url', 'user', 'place'}, set(lot['profile']))
+        self.assertEqual('hi', lot['comments'][0]['text'])
+        self.assertLessEqual(count, 5)
+
+    def test_profiles_list(self):
+        data, count = self.get('/api/profiles/?expand=user,place')
+        self.assertEqual(6, len(data['results']))
+        self.assertEqual('minsk', data['results'][0]['place']['name'])
+        self.assertEqual(5, len(data['results'][0]['lot_set']))
+        self.assertLessEqual(count, 4)
+
+    def test_comments_and_games_lists(self):
+        _, count = self.get('/api/comments/?expand=author')
+        self.assertLessEqual(count, 3)
+        _, count = self.get('/api/games/')
+        self.assertLessEqual(count, 3)
+
+    def test_lists_rendered_from_values(self):
+        for url in ('/api/lots/', '/api/comments/', '/api/games/',
+                    '/api/places/', '/api/profiles/', '/api/users/',
+                    '/api/lots/?fields=url,profile,price&page=2'):
+            fast, _ = self.get(url)
+            with mock.patch.object(ValuesListMixin, 'get_values_serializer',
+                                   return_value=None):
+                regular, _ = self.get(url)
+            self.assertEqual(regular, fast, url)
+            self.assertTrue(fast['results'], url)
+
+    def test_property_source_not_rendered_from_values(self):
+        class GameSerializer(serializers.ModelSerializer):
+            title = serializers.CharField(source='__str__')
+
+            class Meta:
+                model = Game
+                fields = ['id', 'title']
+
+        request = APIRequestFactory().get('/api/games/')
+        with self.assertRaises(UnsupportedField):
+            ValuesSerializer(GameSerializer(), Request(request))
+
+
+class OwnershipTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        minsk = Place.objects.create(name='minsk', slug='minsk')
+        game = Game.objects.create(name='game', slug='game')
+        self.john = Profile.create_profile('john', 'john@a.by', 'password',
+                                           place=minsk)
+        self.mary = Profile.create_profile('mary', 'mary@a.by', 'password',
+                                           place=minsk)
+        self.johns = Lot.objects.create(profile=self.john, game=game)
+        self.marys = Lot.objects.create(profile=self.mary, game=game)
+        self.comment = Comment.objects.create(author=self.mary,
+                                              lot=self.johns, text='hi')
+        self.client = APIClient()
+        self.client.force_authenticate(self.john.user)
+
+    def test_owner_can_change_lot(self):
+        response = self.client.patch(f'/api/lots/{self.johns.pk}/',
+                                     {'desc': 'mine'})
+        self.assertEqual(200, response.status_code)
+        response = self.client.patch(f'/api/lots/{self.marys.pk}/',
+                                     {'desc': 'mine'})
+        self.assertEqual(403, response.status_code)
+        response = self.client.patch(f'/api/comments/{self.comment.pk}/',
+                                     {'text': 'mine'})
+        self.assertEqual(403, response.status_code)
+
+    def test_anonymous_can_not_change(self):
+        self.client.force_authenticate(None)
+        response = self.client.patch(f'/api/lots/{self.johns.pk}/',
+                                     {'desc': 'mine'})
+        self.assertEqual(403, response.status_code)
+
+    def test_filter_by_owner(self):
+        data = self.client.get('/api/lots/?owner=me&fields=id').json()
+        self.assertEqual([{'id': self.johns.pk}], data['results'])
+        data = self.client.get(
+            f'/api/comments/?owner={self.mary.pk}&fields=id').json()
+        self.assertEqual([{'id': self.comment.pk}], data['results'])
+        self.client.force_authenticate(None)
+        data = self.client.get('/api/lots/?owner=me').json()
+        self.assertEqual([], data['results'])
+
+
+class ConditionalRequestsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.game = Game.objects.create(name='game', slug='game')
+        self.client = APIClient()
+        self.client.get('/api/')
+
+    def test_not_modified_without_queries(self):
+        response = self.client.get('/api/games/')
+        self.assertEqual(200, response.status_code)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('Last-Modified', response)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                '/api/games/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(304, response.status_code)
+        # only versions of collections are read
+        self.assertEqual(1, len(queries))
+
+    def test_change_invalidates_etag(self):
+        etag = self.client.get('/api/games/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.game.name = 'renamed'
+            self.game.save()
+            # version is bumped after commit of change
+            self.assertEqual(etag, self.client.get('/api/games/')['ETag'])
+        response = self.client.get('/api/games/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+
+    def test_comment_change_invalidates_etag(self):
+        minsk = Place.objects.create(name='minsk', slug='minsk')
+        john = Profile.create_profile('john', 'john@a.by', 'password',
+                                      place=minsk)
+        lot = Lot.objects.create(profile=john, game=self.game, prop='s')
+        etag = self.client.get('/api/comments/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(lot=lot, author=john, text='hi')
+        response = self.client.get('/api/comments/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+
+    def test_login_keeps_versions(self):
+        user = get_user_model().objects.create_user('mary')
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.force_login(user)
+        self.assertEqual([], callbacks)
+
+    def test_m2m_and_counters_bump_versions(self):
+        minsk = Place.objects.create(name='minsk', slug='minsk')
+        john = Profile.create_profile('john', 'john@a.by', 'password',
+                                      place=minsk)
+        places_etag = self.client.get('/api/places/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            lot = Lot.objects.create(profile=john, game=self.game, prop='s')
+            wish = Lot.objects.create(profile=john, game=self.game,
+                                      prop='w')
+        self.assertNotEqual(places_etag,
+                            self.client.get('/api/places/')['ETag'])
+        lots_etag = self.client.get('/api/lots/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            lot.change_to.add(wish)
+        self.assertNotEqual(lots_etag, self.client.get('/api/lots/')['ETag'])
+
+    def test_etag_depends_on_query_and_user(self):
+        etag = self.client.get('/api/games/')['ETag']
+        self.assertNotEqual(etag,
+                            self.client.get('/api/games/?fields=id')['ETag'])
+        user = get_user_model().objects.create_user('mary')
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/games/')
+        self.assertNotEqual(etag, response['ETag'])
+        self.assertIn('private', response['Cache-Control'])
+
+
+class TaggedCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.game = Game.objects.create(name='game', slug='game')
+        self.other_game = Game.objects.create(name='other', slug='other')
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_invalidated_by_tags(self):
+        tags = [model_tag(Game, self.game.pk)]
+        self.assertEqual(1, get_or_set('test:key', self.compute, tags))
+        self.assertEqual(1, get_or_set('test:key', self.compute, tags))
+        invalidate('unrelated')
+        self.assertEqual(1, get_or_set('test:key', self.compute, tags))
+        invalidate(*tags)
+        self.assertEqual(2, get_or_set('test:key', self.compute, tags))
+
+    def test_invalidated_by_signals(self):
+        tags = [model_tag(Game, self.game.pk)]
+        get_or_set('test:key', self.compute, tags)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_game.save()
+        self.assertEqual(1, get_or_set('test:key', self.compute, tags))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.game.save()
+            # readers before commit see old rows, entry stays valid
+            self.assertEqual(1, get_or_set('test:key', self.compute, tags))
+        self.assertEqual(2, get_or_set('test:key', self.compute, tags))
+        minsk = Place.objects.create(name='minsk', slug='minsk')
+        john = Profile.create_profile('john', 'john@a.by', 'password',
+                                      place=minsk)
+        lot = Lot.objects.create(profile=john, game=self.game, prop='s')
+        wish = Lot.objects.create(profile=john, game=self.game, prop='w')
+        tags = [model_tag(Lot, wish.pk)]
+        get_or_set('test:wish', self.compute, tags)
+        with self.captureOnCommitCallbacks(execute=True):
+            lot.change_to.add(wish)
+        self.assertEqual(4, get_or_set('test:wish', self.compute, tags))
+
+    def test_cached_queryset_tagged_by_joined_models(self):
+        minsk = Place.objects.create(name='minsk', slug='minsk')
+        john = Profile.create_profile('john', 'john@a.by', 'password',
+                                      place=minsk)
+        Lot.objects.create(profile=john, game=self.game, prop='s')
+        queryset = Lot.objects.select_related('game').order_by('pk')
+        self.assertEqual('game', cached_queryset(queryset)[0].game.name)
+        with self.assertNumQueries(0):
+            self.assertEqual('game', cached_queryset(queryset)[0].game.name)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.game.name = 'renamed'
+            self.game.save()
+        self.assertEqual('renamed', cached_queryset(queryset)[0].game.name)
+
+    def test_cached_view_for_anonymous(self):
+        self.assertContains(self.client.get('/games/'), 'Other')
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get('/games/'), 'Other')
+        with self.captureOnCommitCallbacks(execute=True):
+            Game.objects.create(name='new game', slug='new-game')
+        self.assertContains(self.client.get('/games/'), 'New Game')
+        with self.captureOnCommitCallbacks(execute=True):
+            Place.objects.create(name='minsk', slug='minsk')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/games/')
+        self.assertTrue(queries)
+        get_user_model().objects.create_user('mary', password='password')
+        self.client.login(username='mary', password='password')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/games/')
+        self.assertTrue(queries)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_MAX_LAG=None)
+class ReplicaRoutingTest(SimpleTestCase):
+    databases = {'default'}
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def read_db(self):
+        return self.router.db_for_read(Game)
+
+    def test_primary_outside_of_requests(self):
+        self.assertEqual('default', self.read_db())
+        with use_replicas():
+            self.assertEqual('replica', self.read_db())
+            with use_primary():
+                self.assertEqual('default', self.read_db())
+            self.assertEqual('default', self.router.db_for_write(Game))
+            # read your writes
+            self.assertEqual('default', self.read_db())
+
+    def test_transactions_read_primary(self):
+        with use_replicas(), transaction.atomic():
+            self.assertEqual('default', self.read_db())
+
+    def test_lagging_replicas_skipped(self):
+        with override_settings(REPLICA_MAX_LAG=10), \
+                mock.patch('switchdeck.apps.core.routers.replica_lag',
+                           return_value=60), use_replicas():
+            self.assertEqual('default', self.read_db())
+
+    def call(self, request):
+        databases = []
+
+        def view(request):
+            databases.append(self.read_db())
+            if request.method == 'POST':
+                self.router.db_for_write(Game)
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(view)(request)
+        return databases[0], response
+
+    def test_writers_pinned_to_primary(self):
+        factory = RequestFactory()
+        database, response = self.call(factory.get('/'))
+        self.assertEqual('replica', database)
+        self.assertNotIn(PRIMARY_COOKIE_NAME, response.cookies)
+        database, response = self.call(factory.post('/'))
+        self.assertEqual('default', database)
+        cookie = response.cookies[PRIMARY_COOKIE_NAME]
+        request = factory.get('/')
+        request.COOKIES[PRIMARY_COOKIE_NAME] = cookie.value
+        database, _ = self.call(request)
+        self.assertEqual('default', database)
+
+
+@skipUnless(connection.vendor == 'postgresql'
+            and connection.settings_dict.get('CONN_HEALTH_CHECKS'),
+            'health checks of postgresql backend')
+class ConnectionHealthCheckTest(SimpleTestCase):
+    databases = {'default'}
+
+    def test_broken_connection_replaced(self):
+        connection.ensure_connection()
+        opened = connection_stats().get('opened', 0)
+        # connection dropped by database between requests
+        connection.connection.close()
+        connection.close_if_unusable_or_obsolete()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        stats = connection_stats()
+        self.assertEqual(opened + 1, stats['opened'])
+        self.assertEqual(1, stats['health_check_failures'])
+
+
+class AsyncViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        minsk = Place.objects.create(name='minsk', slug='minsk')
+        self.game = Game.objects.create(name='tloz', slug='tloz')
+        john = Profile.create_profile('john', 'john@a.by', 'password',
+                                      place=minsk)
+        Lot.objects.create(profile=john, game=self.game, prop='s')
+        Lot.objects.create(profile=john, game=self.game, prop='b')
+
+    def test_index(self):
+        response = self.client.get('/')
+        self.assertEqual([self.game], response.context['games'])
+
+    def test_class_based_view_is_coroutine(self):
+        view = resolve('/places/minsk/').func
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+        self.assertEqual('PlaceView', view.view_class.__name__)
+        response = self.client.get('/places/minsk/')
+        self.assertEqual(200, response.status_code)
+
+    def test_search(self):
+        response = self.client.get('/lots/search/')
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn('lots', response.context)
+        response = self.client.get('/lots/search/?query=True&game=tloz'
+                                   '&place=minsk&proposition=s')
+        self.assertEqual(self.game, response.context['game'])
+        self.assertEqual(['s'], [lot.prop for lot in response.context['lots']])
+        response = self.client.get('/lots/search/?query=True&game=nope'
+                                   '&proposition=a')
+        self.assertEqual('nope', response.context['no_game'])
+        self.assertEqual(2, len(response.context['lots']))
+        response = self.client.post('/lots/search/', {
+            'game': 'tloz', 'place': '', 'proposition': 'b'})
+        self.assertRedirects(response, '/lots/search/?query=True&game=tloz'
+                                       '&place=&proposition=b')
+
+
+class GatherQueriesTest(SimpleTestCase):
+    def test_run_at_once(self):
+        # both functions must be running to pass the barrier
+        barrier = threading.Barrier(2, timeout=5)
+        self.assertEqual([0, 1], sorted(async_to_sync(gather_queries)(
+            barrier.wait, barrier.wait)))
+
+    @override_settings(ASYNC_CONCURRENT_QUERIES=False)
+    def test_run_one_by_one(self):
+        order = []
+        self.assertEqual([None, None], async_to_sync(gather_queries)(
+            lambda: order.append(1), lambda: order.append(2)))
+        self.assertEqual([1, 2], order)
+
+
+@override_settings(PROFILING_SAMPLE_RATE=1,
+                   PROFILING_METRICS_TOKEN='secret')
+class ProfilingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        profiling.reset()
+        self.addCleanup(profiling.reset)
+        Game.objects.create(name='tloz', slug='tloz')
+
+    def test_views_profiled(self):
+        self.client.get('/games/')
+        self.client.get('/games/')
+        self.client.get('/missing/')
+        views = {view['view']: view for view in profiling.summaries()}
+        self.assertEqual({'game:game_list', '<unresolved>'}, set(views))
+        games = views['game:game_list']
+        self.assertEqual(2, games['count'])
+        self.assertEqual(1, games['cache_hits'])
+        self.assertEqual(1, games['cache_misses'])
+        metrics = games['metrics']
+        self.assertGreater(metrics['queries']['sum'], 0)
+        self.assertGreater(metrics['query_seconds']['sum'], 0)
+        self.assertGreater(metrics['template_seconds']['sum'], 0)
+        self.assertEqual([0.5, 0.95, 0.99], [
+            quantile for quantile, _
+            in metrics['duration_seconds']['quantiles']])
+
+    @override_settings(PROFILING_SAMPLE_RATE=0)
+    def test_disabled(self):
+        self.client.get('/games/')
+        self.assertEqual([], profiling.summaries())
+
+    def test_metrics(self):
+        self.client.get('/games/')
+        self.assertEqual(403, self.client.get('/metrics').status_code)
+        self.assertEqual(403, self.client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code)
+        response = self.client.get('/metrics',
+                                   HTTP_AUTHORIZATION='Bearer secret')
+        self.assertContains(response, '# TYPE switchdeck_view_queries summary')
+        worker = f'worker="{profiling.worker_name()}"'
+        self.assertContains(
+            response, 'switchdeck_view_duration_seconds_count'
+                      f'{{{worker},view="game:game_list"}} 1')
+        self.assertContains(
+            response, 'switchdeck_view_cache_misses_total'
+                      f'{{{worker},view="game:game_list"}} 1')
+
+    def test_admin_page(self):
+        self.client.get('/games/')
+        self.assertEqual(302, self.client.get('/admin/profiling/').status_code)
+        get_user_model().objects.create_user('admin', password='admin',
+                                             is_staff=True)
+        self.client.login(username='admin', password='admin')
+        response = self.client.get('/admin/profiling/')
+        self.assertContains(response, 'game:game_list')
+        self.assertContains(response, '<th>p95</th>', html=True)
+
+
+class QueryAuditTest(TestCase):
+    def setUp(self):
+        Game.objects.create(name='tloz', slug='tloz')
+
+    def audit(self, path, get_response):
+        request = RequestFactory().get(path)
+        request.resolver_match = resolve(path)
+        return query_audit.QueryAuditMiddleware(get_response)(request)
+
+    def test_budgets_declared_by_urlconfs(self):
+        budgets = query_audit.query_budgets()
+        self.assertIn('index', budgets)
+        self.assertIn('lot-list', budgets)
+        self.assertIn('game:game_detail', budgets)
+        self.assertIn('place:place_list', budgets)
+
+    def test_budget_exceeded(self):
+        def view(request):
+            list(Game.objects.all())
+            list(Place.objects.all())
+            return HttpResponse()
+
+        with mock.patch.object(query_audit, 'query_budgets',
+                               return_value={'game:game_list': 2}):
+            self.audit('/games/', view)
+        with mock.patch.object(query_audit, 'query_budgets',
+                               return_value={'game:game_list': 1}):
+            with self.assertRaisesMessage(query_audit.QueryBudgetExceeded,
+                                          'made 2 queries, budget is 1'):
+                self.audit('/games/', view)
+
+    def test_report(self):
+        report = query_audit.Report()
+        with mock.patch.object(query_audit, 'report', report):
+            self.audit('/games/', lambda request: HttpResponse([
+                list(Game.objects.filter(pk__in=[1] * size))
+                for size in range(1, 4)]))
+            self.audit('/games/', lambda request: HttpResponse(
+                Game.objects.filter(description='tloz')))
+        self.assertEqual([('game:game_list', 3)], [
+            (view, count) for (view, _), count in report.repeats.items()])
+        report.explain()
+        self.assertIn(('game:game_list', 'game_game'), report.scans)
+
+
+class DatasetTest(TestCase):
+    def test_generate(self):
+        counts = generate_dataset(scale=0.05, seed=1, prefix='a')
+        self.assertEqual(50, Profile.objects.count())
+        self.assertEqual(counts['lots'], Lot.objects.count())
+        for name in ('comments', 'change_to', 'messages', 'parse_results'):
+            self.assertGreater(counts[name], 0, name)
+        place = Place.objects.first()
+        self.assertEqual(place.lots.filter(active=True, prop='s').count(),
+                         place.sell_count)
+        # the same seed gives the same data
+        self.assertEqual(counts, generate_dataset(scale=0.05, seed=1,
+                                                  prefix='b'))
+
+
+class PrepareForkTest(SimpleTestCase):
+    def test_prepare_fork(self):
+        self.addCleanup(gc.unfreeze)
+        # fresh resolver, other tests may have loaded URLconf already
+        clear_url_caches()
+        self.assertNotIn('url_patterns', vars(get_resolver()))
+        with mock.patch('switchdeck.apps.core.startup.connections') \
+                as connections:
+            prepare_fork()
+        connections.close_all.assert_called_once_with()
+        self.assertIn('url_patterns', vars(get_resolver()))
+        self.assertGreater(gc.get_freeze_count(), 0)
+
+    def test_preload_templates(self):
+        # cached loader is used by default without debug
+        self.assertGreater(preload_templates(), 0)
+        loader = engines.all()[0].engine.template_loaders[0]
+        self.assertIn('index.html', loader.get_template_cache)
+        templates = settings.TEMPLATES[0]
+        with self.settings(TEMPLATES=[{
+                **templates, 'APP_DIRS': False,
+                'OPTIONS': {**templates['OPTIONS'], 'loaders': [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]}}]):
+            self.assertEqual(0, preload_templates())
+
+
+@override_settings(SESSION_WRITE_BEHIND_DELAY=30)
+class SessionWriteBehindTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = SessionStore()
+        self.session['visits'] = 1
+        self.session.create()
+
+    def stored(self):
+        return Session.objects.get(
+            session_key=self.session.session_key).get_decoded()['visits']
+
+    def test_changes_written_behind(self):
+        with mock.patch.object(write_session, 'apply_async') as apply_async, \
+                CaptureQueriesContext(connection) as queries:
+            for visits in (2, 3):
+                self.session['visits'] = visits
+                self.session.save()
+        self.assertEqual(0, len(queries))
+        apply_async.assert_called_once_with((self.session.session_key,),
+                                            countdown=30)
+        self.assertEqual(3, SessionStore(self.session.session_key)['visits'])
+        self.assertEqual(1, self.stored())
+        self.assertTrue(write_session(self.session.session_key))
+        self.assertEqual(3, self.stored())
+
+    def test_deleted_session_not_written(self):
+        with mock.patch.object(write_session, 'apply_async'):
+            self.session['visits'] = 2
+            self.session.save()
+        self.session.delete()
+        self.assertFalse(write_session(self.session.session_key))
+        self.assertFalse(Session.objects.exists())
+
+
+class SitemapGenerationTest(TestCase):
+    # static and flatpages sitemaps are written every time
+    UNSECTIONED = 2
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = pathlib.Path(directory.name)
+        settings_override = override_settings(SITEMAP_ROOT=self.root,
+                                              SITEMAP_SECTION_SIZE=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.games = [Game.objects.create(name=f'game {i}', slug=f'game{i}')
+                      for i in range(5)]
+
+    def read(self, file_name):
+        with gzip.open(self.root / file_name, 'rt') as f:
+            return f.read()
+
+    def test_sections(self):
+        written = generate_sitemaps()
+        self.assertEqual(self.UNSECTIONED + 3, written)
+        manifest = json.loads((self.root / MANIFEST_FILE_NAME).read_text())
+        bounds = [self.games[1].pk, self.games[3].pk]
+        self.assertEqual(
+            list(zip([0] + bounds, bounds + [None])),
+            [(section['first'], section['last'])
+             for section in manifest['game']])
+        self.assertIn('/games/game0/', self.read('game-1.xml.gz'))
+        self.assertIn('/games/game4/', self.read('game-3.xml.gz'))
+        self.assertIn('game-3.xml.gz',
+                      (self.root / INDEX_FILE_NAME).read_text())
+
+    def test_only_changed_sections_written(self):
+        generate_sitemaps()
+        self.assertEqual(self.UNSECTIONED, generate_sitemaps())
+        self.games[2].delete()
+        Game.objects.create(name='game 5', slug='game5')
+        # the second section loses a game, the last one gets new one
+        self.assertEqual(self.UNSECTIONED + 2, generate_sitemaps())
+        self.assertNotIn('/games/game2/', self.read('game-2.xml.gz'))
+        self.assertEqual(self.UNSECTIONED + 3, generate_sitemaps(force=True))
+
+    def test_renamed_rows_written(self):
+        generate_sitemaps()
+        self.games[2].slug = 'renamed'
+        self.games[2].save()
+        self.assertEqual(self.UNSECTIONED + 1, generate_sitemaps())
+        self.assertIn('/games/renamed/', self.read('game-2.xml.gz'))
+
+    def test_empty_section_file_deleted(self):
+        generate_sitemaps()
+        Game.objects.filter(pk__in=[self.games[0].pk,
+                                    self.games[1].pk]).delete()
+        generate_sitemaps()
+        self.assertFalse((self.root / 'game-1.xml.gz').exists())
+        self.assertTrue((self.root / 'game-2.xml.gz').exists())
+        self.assertNotIn('game-1.xml.gz',
+                         (self.root / INDEX_FILE_NAME).read_text())
@@ -1,8 +1,22 @@
+import hmac
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.sitemaps.views import sitemap as live_sitemap
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, HttpResponse
 from django.shortcuts import render
+from django.utils.translation import gettext_lazy as _
 
 from switchdeck.apps.game.models import Game
+from switchdeck.sitemaps import sitemaps, INDEX_FILE_NAME
+
+from . import profiling
 
-def index(request):
+
+async def index(request):
     """
     Index page view.
 
@@ -15,5 +29,63 @@ def index(request):
 
     :template:`index.html`
     """
-    context = {'games': Game.objects_ordered_by_sell()}
-    return render(request, 'index.html', context)
+    games = await sync_to_async(list)(Game.objects_ordered_by_sell())
+    return await sync_to_async(render)(request, 'index.html',
+                                       {'games': games})
+
+
+def sitemap(request):
+    """
+    Sitemap index pregenerated by ``generate_sitemaps`` task.
+
+    Falls back to sitemap built on request while index is not generated.
+    """
+    try:
+        index_file = open(settings.SITEMAP_ROOT / INDEX_FILE_NAME, 'rb')
+    except FileNotFoundError:
+        return live_sitemap(request, sitemaps)
+    return FileResponse(index_file, content_type='application/xml')
+
+
+@staff_member_required
+def profiling_stats(request):
+    """
+    Profiling statistics of views of this process, for staff.
+
+    **Context**
+
+    ``views``
+        Summaries of profiled views, see ``switchdeck.apps.core.profiling``.
+
+    **Template**
+
+    :template:`admin/profiling.html`
+    """
+    return render(request, 'admin/profiling.html', {
+        **admin.site.each_context(request),
+        'title': _('Profiling of views'),
+        'views': profiling.summaries(),
+        'metrics': profiling.METRICS,
+        'quantiles': profiling.QUANTILES,
+        'sample_rate': settings.PROFILING_SAMPLE_RATE,
+        'window': settings.PROFILING_WINDOW,
+    })
+
+
+def _has_metrics_token(request) -> bool:
+    token = settings.PROFILING_METRICS_TOKEN
+    return bool(token) and hmac.compare_digest(
+        request.headers.get('Authorization', ''), f'Bearer {token}')
+
+
+def metrics(request):
+    """
+    Profiling statistics in Prometheus text format.
+
+    Available for staff and for scrapers with ``PROFILING_METRICS_TOKEN``
+    as bearer token.
+    """
+    if not (request.user.is_staff or _has_metrics_token(request)):
+        raise PermissionDenied
+    return HttpResponse(profiling.prometheus_metrics(),
+                        content_type='text/plain; version=0.0.4')
@@ -1,9 +1,11 @@
 from rest_framework import serializers
 
+from switchdeck.apps.core.api.serializers import SparseFieldsMixin
 from ..models import Game
 
 
-class GameSerializer(serializers.HyperlinkedModelSerializer):
+class GameSerializer(SparseFieldsMixin,
+                     serializers.HyperlinkedModelSerializer):
     """Serializer/Desirializer of ``Game`` model."""
 
     class Meta:
@@ -1,15 +1,20 @@
 from rest_framework import viewsets, permissions
 
+from switchdeck.apps.core.api.views import (
+    ConditionalMixin, EagerLoadingMixin, ValuesListMixin)
 from .serializers import GameSerializer
 from ..models import Game
 
 
-class GameViewSet(viewsets.ModelViewSet):
+class GameViewSet(ConditionalMixin, ValuesListMixin, EagerLoadingMixin,
+                  viewsets.ModelViewSet):
     """List of api views for ``Game`` model."""
 
-    queryset = Game.objects.all()
+    queryset = Game.objects.order_by('pk')
     serializer_class = GameSerializer
     permission_classes = [
         permissions.IsAuthenticatedOrReadOnly,
         # IsStuffOrReadOnly
-    ]
\ No newline at end of file
+    ]
+    conditional_models = [Game]
+    cache_max_age = 5 * 60
\ No newline at end of file
@@ -1,3 +1,47 @@
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from switchdeck.apps.catalog_service.models import Catalog, Link, ParseResult
+from switchdeck.apps.lot.models import Lot
+from switchdeck.apps.place.models import Place
+from switchdeck.apps.users.models import Profile
+
+from .models import Game
+
+
+class GamePageTest(TestCase):
+    def setUp(self):
+        self.game = Game.objects.create(name='tloz', slug='tloz')
+        minsk = Place.objects.create(name='minsk', slug='minsk')
+        john = Profile.create_profile('john', 'john@example.com',
+                                      'passwordjohn', place=minsk)
+        for prop in ('s', 's', 'b'):
+            Lot.objects.create(profile=john, game=self.game, prop=prop,
+                               desc='lot')
+        catalog = Catalog.objects.create(name='shop', slug='shop',
+                                         url='https://shop.by',
+                                         price_selector='.price')
+        link = Link.objects.create(game=self.game, catalog=catalog,
+                                   url='https://shop.by/tloz')
+        ParseResult.objects.create(link=link, price='10.50')
+        ParseResult.objects.create(link=link, successful=False)
+        other = Catalog.objects.create(name='other', slug='other',
+                                       url='https://other.by',
+                                       price_selector='.price')
+        Link.objects.create(game=self.game, catalog=other,
+                            url='https://other.by/tloz')
+
+    def test_game_page(self):
+        response = self.client.get('/games/tloz/')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, response.context['sell_list_count'])
+        self.assertEqual(1, response.context['buy_list_count'])
+        self.assertEqual(2, len(response.context['sell_list']))
+        links = response.context['catalog_links']
+        self.assertEqual(['https://shop.by/tloz'], [link.url for link in links])
+        self.assertEqual(Decimal('10.50'), links[0].last_price)
+        self.assertContains(response, 'https://shop.by/tloz')
+
+    def test_missing_game(self):
+        self.assertEqual(404, self.client.get('/games/nope/').status_code)
@@ -1,14 +1,14 @@
 from django.urls import path, include
 
 from .views import (
-    GameDetailView, GameListView, GameBuyListView, GameSellListView)
+    game_slug, GameListView, GameBuyListView, GameSellListView)
 
 
 app_name = 'game'
 
 urlpatterns = [
     path('<slug:slug>/', include([
-        path('', GameDetailView.as_view(), name='game_detail'),
+        path('', game_slug, name='game_detail'),
         # Additional page with lots to sell
         path('sell-list/', GameSellListView.as_view(),
              name='game_sell_list'),
@@ -18,4 +18,12 @@ urlpatterns = [
     ])),
     # Page with all games.
     path('', GameListView.as_view(), name='game_list'),
-]
\ No newline at end of file
+]
+
+# Most queries of requests by url names, checked by tests
+query_budgets = {
+    'game_detail': 8,
+    'game_sell_list': 5,
+    'game_buy_list': 5,
+    'game_list': 5,
+}
@@ -1,44 +1,35 @@
+from asgiref.sync import sync_to_async
+from django.db import models
 from django.shortcuts import render, get_object_or_404
-from django.views.generic import DetailView, ListView
+from django.utils.decorators import method_decorator
+from django.views.generic import ListView
 
+from switchdeck.apps.catalog_service.models import ParseResult
+from switchdeck.apps.core.async_views import gather_queries
+from switchdeck.apps.core.cache import cache_view, model_tag
+from switchdeck.apps.place.models import Place
 from .models import Game
 
-class GameDetailView(DetailView):
-    """
-    Page with game info.
-
-    **Arguments**
+# Amount of lots of every proposition on game page
+LOTS_PER_PAGE = 15
 
-    ``slug: slug``
-        Slug name of the :model:`switchdeck.Game` instance in database.
 
-    **Context**
+def catalog_prices(game):
+    """Return links of game to catalogs with their ``last_price``."""
+    last_price = ParseResult.objects.filter(
+        link=models.OuterRef('pk'), successful=True)\
+        .order_by('-time').values('price')[:1]
+    return game.links.select_related('catalog')\
+        .annotate(last_price=models.Subquery(last_price))\
+        .filter(last_price__isnull=False)
 
-    ``object``
-        An instanse of :model:`switchdeck.Game`.
-    ``sell_list``
-        Related :model:`switchdeck.Lot` instances, ready to sell.
-    ``buy_list``
-        Related :model:`switchdeck.Lot` instances, ready to buy.
-    
-    **Template**
 
-    :template:`game/game-detail.html`
-    """
-
-    model = Game
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['sell_list'] = self.object.lots_to_sell()
-        context['buy_list'] = self.object.lots_to_buy()
-        return context
-
-# Create your views here.
-def game_slug(request, slug):
+async def game_slug(request, slug):
     """
     Page with game info.
 
+    Lots, their amounts and catalog prices are loaded at once.
+
     **Arguments**
 
     ``slug: slug``
@@ -46,32 +37,48 @@ def game_slug(request, slug):
 
     **Context**
 
-    ``game``
+    ``game``, ``object``
         An instanse of :model:`switchdeck.Game`.
     ``sell_list``
-        Related :model:`switchdeck.Lot` instances, ready to sell.
+        First page of related :model:`switchdeck.Lot` instances, ready to
+        sell.
     ``buy_list``
-        Related :model:`switchdeck.Lot` instances, ready to buy.
+        First page of related :model:`switchdeck.Lot` instances, ready to
+        buy.
     ``sell_list_count``
         Amount of related :model:`switchdeck.Lot` instances, ready to
         sell.
     ``buy_list_count``
         Amount of related :model:`switchdeck.Lot` instances, ready to buy.
+    ``catalog_links``
+        Links of game to catalogs with ``last_price``.
 
     **Template**
 
-    :template:`game/game-detail.html`
+    :template:`game/game_detail.html`
     """
-    game = get_object_or_404(Game, slug=slug)
-    context = {'game': game}
-    lots_to_sell = game.lots_to_sell()
-    lots_to_buy = game.lots_to_buy()
-    context['sell_list'] = lots_to_sell[:LOTS_PER_PAGE]
-    context['buy_list'] = lots_to_buy[:LOTS_PER_PAGE]
-    context['sell_list_count'] = lots_to_sell.count()
-    context['buy_list_count'] = lots_to_buy.count()
-    return render(request, 'switchdeck/game.html', context)
-
+    game = await sync_to_async(get_object_or_404)(Game, slug=slug)
+    lots_to_sell = game.lots_to_sell().select_related('game')
+    lots_to_buy = game.lots_to_buy().select_related('game')
+    sell_list, buy_list, sell_list_count, buy_list_count, catalog_links = \
+        await gather_queries(
+            lambda: list(lots_to_sell[:LOTS_PER_PAGE]),
+            lambda: list(lots_to_buy[:LOTS_PER_PAGE]),
+            lots_to_sell.count,
+            lots_to_buy.count,
+            lambda: list(catalog_prices(game)))
+    context = {'game': game, 'object': game,
+               'sell_list': sell_list, 'buy_list': buy_list,
+               'sell_list_count': sell_list_count,
+               'buy_list_count': buy_list_count,
+               'catalog_links': catalog_links}
+    return await sync_to_async(render)(request, 'game/game_detail.html',
+                                       context)
+
+
+@method_decorator(cache_view('game-list',
+                             tags=[model_tag(Game), model_tag(Place)]),
+                  name='dispatch')
 class GameListView(ListView):
     """
     Show the list of all available games.
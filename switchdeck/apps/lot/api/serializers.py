@@ -1,10 +1,11 @@
 """Serialization classes and method for REST api JSON."""
 from rest_framework import serializers
 
+from switchdeck.apps.core.api.serializers import SparseFieldsMixin
 from ..models import Lot, Comment
 
 
-class LotSerializer(serializers.HyperlinkedModelSerializer):
+class LotSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
     """Serializer/Desirializer of ``Lot`` model."""
 
     class Meta:
@@ -13,9 +14,24 @@ class LotSerializer(serializers.HyperlinkedModelSerializer):
         model = Lot
         fields = ['url', 'id', 'profile', 'game', 'active', 'desc', 'prop',
                   'price', 'public_date', 'up_time', 'change_to', 'comments']
-
-
-class CommentSerializer(serializers.HyperlinkedModelSerializer):
+        expandable_fields = {
+            'profile': ('switchdeck.apps.users.api.serializers.'
+                        'ProfileSerializer',
+                        {'fields': ['url', 'user', 'place']}),
+            'game': 'switchdeck.apps.game.api.serializers.GameSerializer',
+            'change_to': ('switchdeck.apps.lot.api.serializers.LotSerializer',
+                          {'many': True,
+                           'fields': ['url', 'id', 'game', 'prop', 'price']}),
+            'comments': ('switchdeck.apps.lot.api.serializers.'
+                         'CommentSerializer',
+                         {'many': True,
+                          'fields': ['url', 'id', 'author', 'timestamp',
+                                     'text']}),
+        }
+
+
+class CommentSerializer(SparseFieldsMixin,
+                        serializers.HyperlinkedModelSerializer):
     """Serializer/Desirializer of ``Comment`` model."""
 
     class Meta:
@@ -23,4 +39,9 @@ class CommentSerializer(serializers.HyperlinkedModelSerializer):
 
         model = Comment
         fields = ['url', 'id', 'author', 'timestamp', 'text', 'lot']
+        expandable_fields = {
+            'author': ('switchdeck.apps.users.api.serializers.'
+                       'ProfileSerializer',
+                       {'fields': ['url', 'user', 'place']}),
+        }
 
@@ -1,7 +1,12 @@
 """All views related to REST api of app."""
 from rest_framework import viewsets, permissions
-from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
 
+from switchdeck.apps.core.api.permissions import IsOwnerOrReadOnly
+from switchdeck.apps.core.api.views import (
+    ConditionalMixin, EagerLoadingMixin, OwnerFilterMixin, ValuesListMixin)
+from switchdeck.apps.game.models import Game
+from switchdeck.apps.users.models import Profile
 from . import serializers
 from .. import models
 
@@ -15,13 +20,12 @@ class IsStuffOrReadOnly(permissions.BasePermission):
 
         Return `True` if used safe methods of user is from staff.
         """
-        print(dir(request.user))
         if request.method in permissions.SAFE_METHODS:
             return True
         return request.user.is_staff
 
 
-class IsOwnerProfileOrReadOnly(permissions.BasePermission):
+class IsOwnerProfileOrReadOnly(IsOwnerOrReadOnly):
     """
     Permission checker.
 
@@ -29,19 +33,10 @@ class IsOwnerProfileOrReadOnly(permissions.BasePermission):
     ``profile`` field.
     """
 
-    def has_object_permission(self, request, view, obj):
-        """
-        Check HTTP method and user permissions.
-
-        Return `True` if used safe methods of user on them profile page.
-        """
-        print(dir(request.user))
-        if request.method in permissions.SAFE_METHODS:
-            return True
-        return obj.profile == request.user.profile
+    owner_field = 'profile'
 
 
-class IsOwnerAuthorOrReadOnly(permissions.BasePermission):
+class IsOwnerAuthorOrReadOnly(IsOwnerOrReadOnly):
     """
     Permission checker.
 
@@ -49,31 +44,40 @@ class IsOwnerAuthorOrReadOnly(permissions.BasePermission):
     ``author`` field.
     """
 
-    def has_object_permission(self, request, view, obj):
-        """
-        Check HTML method and user permissions.
+    owner_field = 'author'
 
-        Return `True` if used safe methods of user own this comment.
-        """
-        print(dir(request.user))
-        if request.method in permissions.SAFE_METHODS:
-            return True
-        return obj.author == request.user.profile
 
-
-class LotViewSet(viewsets.ModelViewSet):
+class LotViewSet(ConditionalMixin, ValuesListMixin, OwnerFilterMixin,
+                 EagerLoadingMixin, viewsets.ModelViewSet):
     """List of api views for ``Lot`` model."""
 
     queryset = models.Lot.objects.all()
     serializer_class = serializers.LotSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly,
                           IsOwnerProfileOrReadOnly]
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+    conditional_models = [models.Lot, models.Comment, Profile, Game]
+    cache_max_age = 30
+    # hyperlinks of many related objects need only their ids
+    prefetch_related_fields = {
+        'change_to': [Prefetch('change_to',
+                               models.Lot.objects.only('id').order_by())],
+        'comments': [Prefetch('comments',
+                              models.Comment.objects.only('id', 'lot_id'))],
+    }
+    select_related_expand = {'profile': ['profile'], 'game': ['game']}
+    prefetch_related_expand = {'change_to': ['change_to'],
+                               'comments': ['comments']}
+
+
+class CommentViewSet(ConditionalMixin, ValuesListMixin, OwnerFilterMixin,
+                     EagerLoadingMixin, viewsets.ModelViewSet):
     """List of api views for ``Comment`` model."""
 
     queryset = models.Comment.objects.all()
     serializer_class = serializers.CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly,
                           IsOwnerAuthorOrReadOnly]
+    owner_field = 'author'
+    conditional_models = [models.Comment, Profile]
+    cache_max_age = 60
+    select_related_expand = {'author': ['author']}
@@ -120,16 +120,32 @@ class SearchForm(forms.Form):
         ('a', 'all')
     ))
 
-    def __init__(self, *args, **kwargs):
-        """Initiate form, fill it with needed widgets."""
+    def __init__(self, *args, game_names=None, place_names=None, **kwargs):
+        """
+        Initiate form, fill it with needed widgets.
+
+        Names of games and places are queried if not given.
+        """
         super().__init__(*args, **kwargs)
-        list_game = [game.name for game in Game.objects.all()]
-        list_game.sort()
+        if game_names is None:
+            game_names = search_game_names()
+        if place_names is None:
+            place_names = search_place_names()
         self.fields['game'].widget = DatalistWidget(
-            datalist=list_game,
+            datalist=game_names,
             name='game'
         )
         self.fields['place'].widget = DatalistWidget(
-            datalist=[place.name for place in Place.objects.all()],
+            datalist=place_names,
             name='place'
         )
+
+
+def search_game_names() -> list:
+    """Return sorted names of games for ``SearchForm``."""
+    return sorted(Game.objects.values_list('name', flat=True))
+
+
+def search_place_names() -> list:
+    """Return names of places for ``SearchForm``."""
+    return list(Place.objects.values_list('name', flat=True))
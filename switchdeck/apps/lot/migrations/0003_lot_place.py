@@ -0,0 +1,44 @@
+# Generated by Django 4.0 on 2026-10-19 18:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_places_from_profiles(apps, schema_editor):
+    """Fill ``Lot.place`` from related profiles and count place lots."""
+    Lot = apps.get_model('lot', 'Lot')
+    Place = apps.get_model('place', 'Place')
+    Profile = apps.get_model('users', 'Profile')
+    Lot.objects.update(place=models.Subquery(
+        Profile.objects.filter(pk=models.OuterRef('profile'))
+        .values('place')[:1]))
+    for place in Place.objects.all():
+        active = Lot.objects.filter(place=place, active=True)
+        place.sell_count = active.filter(prop='s').count()
+        place.buy_count = active.filter(prop='b').count()
+        place.popularity = Profile.objects.filter(place=place).count()\
+            + active.count()
+        place.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0002_place_counters'),
+        ('lot', '0002_auto_20201202_0003'),
+        ('users', '0003_auto_20210509_1914'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lot',
+            name='place',
+            field=models.ForeignKey(editable=False, help_text='Place of the lot owner. Copied from related ``Profile`` to filter lots by place without joins.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lots', related_query_name='lot', to='place.place', verbose_name='Place'),
+        ),
+        migrations.AddIndex(
+            model_name='lot',
+            index=models.Index(fields=['place', 'prop', 'active', '-up_time'], name='lot_place_listing_idx'),
+        ),
+        migrations.RunPython(copy_places_from_profiles,
+                             migrations.RunPython.noop),
+    ]
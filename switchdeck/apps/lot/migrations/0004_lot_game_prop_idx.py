@@ -0,0 +1,17 @@
+# Generated by Django 4.0 on 2026-10-19 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lot', '0003_lot_place'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lot',
+            index=models.Index(fields=['game', 'prop', 'active'], name='lot_game_prop_idx'),
+        ),
+    ]
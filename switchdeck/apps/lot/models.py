@@ -8,6 +8,9 @@ from django.utils import timezone
 from django.urls import reverse
 from django.conf import settings
 
+from switchdeck.apps.users.identity import (
+    get_profile_identity, request_profile_id)
+
 class Lot(models.Model):
     """
     ``Lot`` represent the relation between ``Profile``
@@ -28,6 +31,16 @@ class Lot(models.Model):
         verbose_name=_('Profile'),
         help_text=_("Related Profile. Represent the owner of ``Lot`` "
                     "instance"))
+    place = models.ForeignKey(
+        'place.Place',
+        on_delete=models.SET_NULL,
+        null=True,
+        editable=False,
+        related_name='lots',
+        related_query_name='lot',
+        verbose_name=_('Place'),
+        help_text=_("Place of the lot owner. Copied from related ``Profile`` "
+                    "to filter lots by place without joins."))
     game = models.ForeignKey(
         'game.Game',
         on_delete=models.CASCADE,
@@ -81,22 +94,82 @@ class Lot(models.Model):
         ordering = ['-up_time']
         verbose_name = _('Lot')
         verbose_name_plural = _('Lots')
+        indexes = [
+            # place page listings: active lots of place by prop, last upped
+            models.Index(fields=['place', 'prop', 'active', '-up_time'],
+                         name='lot_place_listing_idx'),
+            # wishes-by-game lookup for notifications
+            models.Index(fields=['game', 'prop', 'active'],
+                         name='lot_game_prop_idx'),
+        ]
 
-    @property
-    def place(self) -> 'Place':
+    # fields of lot counted by counters of its place
+    COUNTED_FIELDS = ('place_id', 'prop', 'active')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Load `Lot` and remember loaded values of counted fields."""
+        lot = super().from_db(db, field_names, values)
+        lot._counted_values = lot._loaded_counted_values()
+        return lot
+
+    def refresh_from_db(self, using=None, fields=None):
+        """Reload `Lot` and remember reloaded values of counted fields."""
+        super().refresh_from_db(using, fields)
+        self._remember_counted_values(fields)
+
+    def _loaded_counted_values(self) -> dict:
+        # deferred fields are not loaded here
+        return {name: self.__dict__[name] for name in self.COUNTED_FIELDS
+                if name in self.__dict__}
+
+    def _remember_counted_values(self, fields=None) -> None:
+        """Remember values of counted fields stored in database."""
+        values = self._loaded_counted_values()
+        if fields is not None:
+            stored = {self._meta.get_field(name).attname for name in fields}
+            values = {name: value for name, value in values.items()
+                      if name in stored}
+        self._counted_values = {**getattr(self, '_counted_values', {}),
+                                **values}
+
+    def counted_changes(self) -> dict:
         """
-        Return `Place` property of `Lot`.
+        Return ``{field: old value}`` of counted fields changed since load.
 
-        Related :model:`switchdeck.Place` instance. Setted by ``Profile``
-        field instance
+        Fields of lots not loaded from database are changed, old values
+        of fields unknown are ``None``.
         """
-        return self.profile.place
+        loaded = getattr(self, '_counted_values', {})
+        return {name: loaded.get(name) for name in self.COUNTED_FIELDS
+                if name not in loaded or loaded[name] != getattr(self, name)}
+
+    def save(self, *args, **kwargs):
+        """Save `Lot` and copy ``place`` from related ``Profile`` if unset."""
+        if self.place_id is None:
+            self.place_id = self.profile.place_id
+        super().save(*args, **kwargs)
+        self._remember_counted_values(kwargs.get('update_fields'))
 
     def __str__(self) -> str:
         """Return readable representation of `Lot`."""
-        return f"{self.profile.user} {self.get_prop_display()} " +\
+        return f"{self.owner} {self.get_prop_display()} " +\
             f"{self.game.name}"
 
+    @property
+    def owner(self) -> 'ProfileIdentity':
+        """
+        Return cached identity of the lot owner.
+
+        Used instead of ``profile`` and ``profile.user`` when only username
+        or profile URL is needed.
+        """
+        return get_profile_identity(self.profile_id)
+
+    def is_owned_by(self, request) -> bool:
+        """Return True if lot belongs to the user of request."""
+        return self.profile_id == request_profile_id(request)
+
     @property
     def ready_to_sell(self):
         """Return True, if lot ready to sale."""
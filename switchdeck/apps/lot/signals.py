@@ -0,0 +1,5 @@
+"""Signals sent by lots."""
+from django.dispatch import Signal
+
+# Sent when lot is set to sell. Arguments: ``lot``.
+lot_put_on_sale = Signal()
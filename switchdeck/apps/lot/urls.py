@@ -50,3 +50,8 @@ urlpatterns = [
     # Lots search page/
     path('search/', views.search, name='search'),
 ]
+
+# Most queries of requests by url names, checked by tests
+query_budgets = {
+    'search': 7,
+}
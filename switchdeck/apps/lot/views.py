@@ -1,4 +1,5 @@
 """All common views of the path."""
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -13,7 +14,13 @@ from django.views.decorators.http import require_POST
 from django.core.exceptions import PermissionDenied
 from django.db import models
 
+from switchdeck.apps.core.async_views import gather_queries
+from switchdeck.apps.game.models import Game
+from switchdeck.apps.place.models import Place
+from switchdeck.apps.users.identity import request_profile_id
+
 from .models import Lot, Comment
+from .signals import lot_put_on_sale
 from . import forms
 
 from django.conf import settings
@@ -55,7 +62,7 @@ def lot_view(request, glid: int):
         form = forms.CommentForm(request.POST)
         if form.is_valid():
             if request.user.is_authenticated:
-                comm = Comment(author=request.user.profile,
+                comm = Comment(author_id=request_profile_id(request),
                                game_instance=lot_item,
                                text=form.cleaned_data['text'])
                 comm.save()
@@ -91,13 +98,16 @@ def add_game(request):
         form = forms.LotForm(request.POST)
         if form.is_valid():
             gl = Lot(
-                profile=request.user.profile,
+                profile_id=request.profile_identity.profile_id,
+                place_id=request.profile_identity.place_id,
                 game=form.cleaned_data['game'],
                 desc=form.cleaned_data['desc'],
                 prop=form.cleaned_data['prop'],
                 price=form.cleaned_data['price']
             )
             gl.save()
+            if gl.prop == 's':
+                lot_put_on_sale.send(sender=Lot, lot=gl)
             return redirect(gl)
     else:
         context['form'] = forms.LotForm()
@@ -118,7 +128,8 @@ def add_game_reduced(request, prop):
         form = forms.LotReducedForm(request.POST)
         if form.is_valid():
             gl = Lot(
-                profile=request.user.profile,
+                profile_id=request.profile_identity.profile_id,
+                place_id=request.profile_identity.place_id,
                 game=form.cleaned_data['game'],
                 desc=form.cleaned_data['desc'],
                 prop=prop,
@@ -142,10 +153,10 @@ def delete_game(request, glid: int):
     Than redirecting to user profile page.
     """
     lot_item = get_object_or_404(Lot, id=glid)
-    if request.user == lot_item.profile.user:
+    if lot_item.is_owned_by(request):
         lot_item.delete()
         messages.success(request, f"{lot_item.game.name.title()} removed")
-        return redirect(request.user.profile)
+        return redirect(request.profile_identity)
     else:
         return HttpResponseForbidden
 
@@ -155,7 +166,7 @@ def delete_comment(request, cid: int):
     """Veiw delete comment on GET."""
     comment = get_object_or_404(Comment, id=cid)
     next = request.GET.get('next', reverse('index'))
-    if request.user == comment.author.user:
+    if comment.author_id == request_profile_id(request):
         comment.delete()
         messages.success(request, 'Comment removed')
         return redirect(next)
@@ -168,7 +179,7 @@ def set_game(request, glid: int, set_prop: str):
     """Set new prop to that lot."""
     context = dict()
     lot = get_object_or_404(Lot, id=glid)
-    if request.user != lot.profile.user:
+    if not lot.is_owned_by(request):
         return HttpResponseForbidden
 
     # cleared change_to fields per change of prop
@@ -199,6 +210,8 @@ def set_game(request, glid: int, set_prop: str):
                 lot.public_date = timezone.now()
                 lot.up_time = timezone.now()
                 lot.save()
+                if set_prop == 's':
+                    lot_put_on_sale.send(sender=Lot, lot=lot)
                 messages.success(request, f"{lot.game.name.title()} "
                                  f"setted to {lot.get_prop_display()} "
                                  "list")
@@ -217,7 +230,7 @@ def set_game(request, glid: int, set_prop: str):
 def change_description(request, glid: int):
     """View method to change description of lot."""
     gl = get_object_or_404(Lot, id=glid)
-    if gl.profile != request.user.profile:
+    if not gl.is_owned_by(request):
         return HttpResponseForbidden
     form = forms.ChangeDescLotForm(request.POST)
     if form.is_valid():
@@ -233,7 +246,7 @@ def change_description(request, glid: int):
 def change_price(request, glid: int):
     """View method to price description of lot."""
     gl = get_object_or_404(Lot, id=glid)
-    if gl.profile != request.user.profile:
+    if not gl.is_owned_by(request):
         return HttpResponseForbidden
     form = forms.ChangePriceLotForm(request.POST)
     if form.is_valid():
@@ -248,7 +261,7 @@ def change_price(request, glid: int):
 def change_activation(request, glid: int, activate: bool):
     """View method to change activation status of lot."""
     gl = get_object_or_404(Lot, id=glid)
-    if gl.profile != request.user.profile:
+    if not gl.is_owned_by(request):
         return HttpResponseForbidden
     if activate and not gl.active:
         gl.active = True
@@ -273,7 +286,7 @@ class UpdateChangeToView(LoginRequiredMixin, FormView):
         super().setup(request, *args, **kwargs)
         self.object = get_object_or_404(Lot, pk=kwargs['glid'])
         if request.user.is_authenticated\
-                and self.object.profile.user != request.user:
+                and not self.object.is_owned_by(request):
             raise PermissionDenied
 
     def get_form_kwargs(self):
@@ -309,10 +322,12 @@ class UpdateChangeToView(LoginRequiredMixin, FormView):
         return self.object.get_absolute_url()
 
 
-def search(request):
+async def search(request):
     """
     Page with form to search gamelsites and results of searching
 
+    Names for the form, searched game and place are loaded at once.
+
     **Context**
 
     ``form``
@@ -324,58 +339,71 @@ def search(request):
 
     :template:`switchdeck/search.html`
     """
-
-    if request.method == 'GET':
-        context = dict()
-        context['form'] = forms.SearchForm
-        if request.GET.get('query', False):
-            context['search_posted'] = True
-            query = Lot.objects.filter(active=True)
-            if request.GET.get('game', '') != '':
-                try:
-                    game = Game.objects.get(name=request.GET['game'])
-                except Game.DoesNotExist:
-                    context['no_game'] = request.GET['game']
-                else:
-                    query = query.filter(game=game)
-                    context['game'] = game
-            else:
-                context['all_game'] = True
-
-            if request.GET.get('place', '') != '':
-                try:
-                    place = Place.objects.get(name=request.GET['place'])
-                except Place.DoesNotExist:
-                    context['no_place'] = request.GET['place']
-                else:
-                    query = query.filter(profile__place=place)
-                    context['place'] = place
+    if request.method == 'POST':
+        return await sync_to_async(search_redirect)(request)
+    context = dict()
+    game_name = request.GET.get('game', '')
+    place_name = request.GET.get('place', '')
+    queries = [forms.search_game_names, forms.search_place_names]
+    searched = request.GET.get('query', False)
+    if searched:
+        queries += [
+            lambda: game_name and Game.objects.filter(name=game_name).first(),
+            lambda: place_name
+            and Place.objects.filter(name=place_name).first()]
+    results = await gather_queries(*queries)
+    names = {'game_names': results[0], 'place_names': results[1]}
+    context['form'] = forms.SearchForm(**names)
+    if searched:
+        game, place = results[2:]
+        context['search_posted'] = True
+        query = Lot.objects.filter(active=True)
+        if game_name != '':
+            if not game:
+                context['no_game'] = game_name
             else:
-                context['all_place'] = True
+                query = query.filter(game=game)
+                context['game'] = game
+        else:
+            context['all_game'] = True
 
-            prop = request.GET.get('proposition', 'a')
-            if prop == 's' or prop == 'b':
-                context['prop'] = prop
-                query = query.filter(prop=prop)
+        if place_name != '':
+            if not place:
+                context['no_place'] = place_name
             else:
-                context['prop'] = 'a'
-                query = query.filter(models.Q(prop='s') | models.Q(prop='b'))
-
-            context['lots'] = query
-
-            context['form'] = forms.SearchForm({
-                'game': request.GET.get('game', ''),
-                'place': request.GET.get('place', ''),
-                'proposition': request.GET.get('proposition', 's')
-            })
-        return render(request, 'lot/search.html', context)
-    elif request.method == 'POST':
-        form = forms.SearchForm(request.POST)
-        if form.is_valid():
-            q = QueryDict(mutable=True)
-            q['query'] = True
-            q['game'] = form.cleaned_data['game']
-            q['place'] = form.cleaned_data['place']
-            q['proposition'] = form.cleaned_data['proposition']
-            return HttpResponseRedirect(reverse('search') + '?'
-                                        + q.urlencode())
+                query = query.filter(place=place)
+                context['place'] = place
+        else:
+            context['all_place'] = True
+
+        prop = request.GET.get('proposition', 'a')
+        if prop == 's' or prop == 'b':
+            context['prop'] = prop
+            query = query.filter(prop=prop)
+        else:
+            context['prop'] = 'a'
+            query = query.filter(models.Q(prop='s') | models.Q(prop='b'))
+
+        context['lots'] = await sync_to_async(list)(
+            query.select_related('game'))
+
+        context['form'] = forms.SearchForm({
+            'game': game_name,
+            'place': place_name,
+            'proposition': request.GET.get('proposition', 's')
+        }, **names)
+    return await sync_to_async(render)(request, 'lot/search.html', context)
+
+
+def search_redirect(request):
+    """Redirect posted search form to page with its results."""
+    form = forms.SearchForm(request.POST)
+    if form.is_valid():
+        q = QueryDict(mutable=True)
+        q['query'] = True
+        q['game'] = form.cleaned_data['game']
+        q['place'] = form.cleaned_data['place']
+        q['proposition'] = form.cleaned_data['proposition']
+        return HttpResponseRedirect(reverse('lot:search') + '?'
+                                    + q.urlencode())
+    return render(request, 'lot/search.html', {'form': form})
@@ -0,0 +1,25 @@
+from django.contrib import admin
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from .models import OutgoingEmail
+from .tasks import send_queued_emails
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'from_email', 'created', 'status', 'attempts')
+    list_filter = ('status', )
+    date_hierarchy = 'created'
+    search_fields = ('subject', )
+    readonly_fields = ('created', 'sent', 'last_error')
+
+    def retry_queryset(self, request, queryset):
+        # backoff of failed attempts is dropped too, sent by the next run
+        queryset.update(status=OutgoingEmail.STATUSES.PENDING, attempts=0,
+                        next_attempt=timezone.now())
+        send_queued_emails.delay()
+        self.message_user(request, message=_('queued'))
+    retry_queryset.short_description = _("Send selected emails again.")
+
+    actions = [retry_queryset, ]
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class MailerConfig(AppConfig):
+    name = 'switchdeck.apps.mailer'
+    verbose_name = _('Mailer')
+    verbose_name_plural = _('Mailers')
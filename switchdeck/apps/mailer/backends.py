@@ -0,0 +1,41 @@
+"""Email backend which stores messages to the queue instead of sending."""
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.conf import settings
+from django.db import transaction
+
+from .models import OutgoingEmail
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Persist messages as ``OutgoingEmail`` and send them by celery.
+
+    Messages with attachments are not queued and sent at once through
+    ``MAILER_EMAIL_BACKEND``.
+    """
+
+    def send_messages(self, email_messages):
+        """Queue messages, return amount of accepted messages."""
+        queued, direct = [], []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            if message.attachments:
+                direct.append(message)
+            else:
+                queued.append(OutgoingEmail.from_message(message))
+        if queued:
+            OutgoingEmail.objects.bulk_create(queued)
+            transaction.on_commit(schedule_sending)
+        if direct:
+            get_connection(settings.MAILER_EMAIL_BACKEND,
+                           fail_silently=self.fail_silently)\
+                .send_messages(direct)
+        return len(queued) + len(direct)
+
+
+def schedule_sending():
+    """Ask celery worker to send the queue."""
+    from .tasks import send_queued_emails
+    send_queued_emails.delay()
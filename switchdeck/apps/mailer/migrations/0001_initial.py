@@ -0,0 +1,45 @@
+# Generated by Django 4.0 on 2026-10-19 18:12
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(blank=True, max_length=255, verbose_name='Subject')),
+                ('body', models.TextField(blank=True, verbose_name='Body')),
+                ('html_body', models.TextField(blank=True, help_text='Alternative ``text/html`` content of message.', verbose_name='HTML body')),
+                ('from_email', models.CharField(max_length=255, verbose_name='From')),
+                ('to', models.JSONField(default=list, verbose_name='To')),
+                ('cc', models.JSONField(default=list, verbose_name='Cc')),
+                ('bcc', models.JSONField(default=list, verbose_name='Bcc')),
+                ('reply_to', models.JSONField(default=list, verbose_name='Reply to')),
+                ('headers', models.JSONField(default=dict, verbose_name='Headers')),
+                ('status', models.CharField(choices=[('p', 'pending'), ('s', 'sent'), ('f', 'failed')], default='p', max_length=1, verbose_name='Status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='Amount of failed attempts to send message.', verbose_name='Attempts')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last error')),
+                ('next_attempt', models.DateTimeField(default=django.utils.timezone.now, help_text='Message is not sent before this time.', verbose_name='Next attempt')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                ('sent', models.DateTimeField(blank=True, null=True, verbose_name='Sent')),
+            ],
+            options={
+                'verbose_name': 'Outgoing email',
+                'verbose_name_plural': 'Outgoing emails',
+                'ordering': ('created',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outgoingemail',
+            index=models.Index(fields=['status', 'next_attempt'], name='mailer_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.0 on 2026-10-19 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outgoingemail',
+            name='status',
+            field=models.CharField(choices=[('p', 'pending'), ('g', 'sending'), ('s', 'sent'), ('f', 'failed')], default='p', max_length=1, verbose_name='Status'),
+        ),
+    ]
@@ -0,0 +1,180 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class OutgoingEmail(models.Model):
+    """
+    Email message persisted by the queued email backend.
+
+    Sent later by celery worker through ``MAILER_EMAIL_BACKEND``.
+    """
+
+    class STATUSES(models.TextChoices):
+        PENDING = 'p', _('pending')
+        SENDING = 'g', _('sending')
+        SENT = 's', _('sent')
+        FAILED = 'f', _('failed')
+
+    subject = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name=_('Subject'))
+    body = models.TextField(
+        blank=True,
+        verbose_name=_('Body'))
+    html_body = models.TextField(
+        blank=True,
+        verbose_name=_('HTML body'),
+        help_text=_("Alternative ``text/html`` content of message."))
+    from_email = models.CharField(
+        max_length=255,
+        verbose_name=_('From'))
+    to = models.JSONField(
+        default=list,
+        verbose_name=_('To'))
+    cc = models.JSONField(
+        default=list,
+        verbose_name=_('Cc'))
+    bcc = models.JSONField(
+        default=list,
+        verbose_name=_('Bcc'))
+    reply_to = models.JSONField(
+        default=list,
+        verbose_name=_('Reply to'))
+    headers = models.JSONField(
+        default=dict,
+        verbose_name=_('Headers'))
+    status = models.CharField(
+        max_length=1,
+        choices=STATUSES.choices,
+        default=STATUSES.PENDING,
+        verbose_name=_('Status'))
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name=_('Attempts'),
+        help_text=_("Amount of failed attempts to send message."))
+    last_error = models.TextField(
+        blank=True,
+        verbose_name=_('Last error'))
+    next_attempt = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('Next attempt'),
+        help_text=_("Message is not sent before this time."))
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Created'))
+    sent = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Sent'))
+
+    class Meta:
+        verbose_name = _('Outgoing email')
+        verbose_name_plural = _('Outgoing emails')
+        ordering = ('created', )
+        indexes = [
+            models.Index(fields=['status', 'next_attempt'],
+                         name='mailer_queue_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.subject} -> {", ".join(self.to)}'
+
+    @classmethod
+    def pending(cls):
+        """
+        Return messages waiting to be sent now.
+
+        Messages claimed by lost workers are pending again once their
+        claims expire.
+        """
+        return cls.objects.filter(
+            status__in=[cls.STATUSES.PENDING, cls.STATUSES.SENDING],
+            next_attempt__lte=timezone.now())
+
+    @classmethod
+    def claim(cls, batch_size: int) -> list:
+        """
+        Return batch of pending messages marked as being sent.
+
+        Claims are committed at once, so messages are sent out of
+        transaction and other workers skip them until
+        ``MAILER_CLAIM_TIMEOUT`` passes.
+        """
+        with transaction.atomic():
+            batch = list(cls.pending().select_for_update(
+                skip_locked=True)[:batch_size])
+            cls.objects.filter(pk__in=[email.pk for email in batch]).update(
+                status=cls.STATUSES.SENDING,
+                next_attempt=timezone.now() + timedelta(
+                    seconds=settings.MAILER_CLAIM_TIMEOUT))
+        return batch
+
+    @classmethod
+    def release(cls, batch) -> None:
+        """Return claimed messages to queue without counting attempt."""
+        cls.objects.filter(pk__in=[email.pk for email in batch]).update(
+            status=cls.STATUSES.PENDING, next_attempt=timezone.now())
+
+    @classmethod
+    def from_message(cls, message) -> 'OutgoingEmail':
+        """Return unsaved instance built from ``EmailMessage``."""
+        html_body = ''
+        for content, mimetype in getattr(message, 'alternatives', []):
+            if mimetype == 'text/html':
+                html_body = content
+        return cls(
+            subject=message.subject,
+            body=message.body,
+            html_body=html_body,
+            from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+            to=list(message.to),
+            cc=list(message.cc),
+            bcc=list(message.bcc),
+            reply_to=list(message.reply_to),
+            headers=dict(message.extra_headers))
+
+    def to_message(self, connection=None) -> EmailMultiAlternatives:
+        """Return ``EmailMessage`` ready to send through ``connection``."""
+        message = EmailMultiAlternatives(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_email,
+            to=self.to,
+            cc=self.cc,
+            bcc=self.bcc,
+            reply_to=self.reply_to,
+            headers=self.headers,
+            connection=connection)
+        if self.html_body:
+            message.attach_alternative(self.html_body, 'text/html')
+        return message
+
+    def mark_sent(self) -> None:
+        """Mark message as successfully sent."""
+        self.status = self.STATUSES.SENT
+        self.sent = timezone.now()
+        self.save(update_fields=['status', 'sent'])
+
+    def mark_failed(self, error: Exception) -> None:
+        """
+        Count failed attempt and postpone next one.
+
+        Delay between attempts grows exponentially, message is given up
+        after ``MAILER_MAX_ATTEMPTS``.
+        """
+        self.attempts += 1
+        self.last_error = repr(error)
+        self.next_attempt = timezone.now() + timedelta(
+            minutes=2 ** self.attempts)
+        if self.attempts >= settings.MAILER_MAX_ATTEMPTS:
+            self.status = self.STATUSES.FAILED
+        else:
+            self.status = self.STATUSES.PENDING
+        self.save(update_fields=['attempts', 'last_error', 'next_attempt',
+                                 'status'])
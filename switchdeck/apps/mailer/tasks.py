@@ -0,0 +1,48 @@
+import logging
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+from switchdeck.celery import app
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+@app.task(bind=True, max_retries=5)
+def send_queued_emails(self, batch_size=None):
+    """
+    Send batch of pending messages through one reused connection.
+
+    Messages are claimed in short transaction and sent out of it, so slow
+    SMTP holds no locks. Schedules itself again while the queue is not
+    empty. Connection errors retry the task with exponential backoff,
+    errors of single messages postpone these messages.
+    """
+    batch_size = batch_size or settings.MAILER_BATCH_SIZE
+    sent = 0
+    batch = OutgoingEmail.claim(batch_size)
+    if not batch:
+        return sent
+    connection = get_connection(settings.MAILER_EMAIL_BACKEND)
+    try:
+        connection.open()
+    except Exception as e:
+        logger.warning('Cannot open mail connection: %r', e)
+        OutgoingEmail.release(batch)
+        raise self.retry(exc=e, countdown=60 * 2 ** self.request.retries)
+    try:
+        for email in batch:
+            try:
+                email.to_message(connection).send()
+            except Exception as e:
+                logger.warning('Cannot send email %s: %r', email.pk, e)
+                email.mark_failed(e)
+            else:
+                email.mark_sent()
+                sent += 1
+    finally:
+        connection.close()
+    if len(batch) == batch_size:
+        send_queued_emails.delay(batch_size)
+    return sent
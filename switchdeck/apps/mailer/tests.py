@@ -0,0 +1,83 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .backends import QueuedEmailBackend
+from .models import OutgoingEmail
+from .tasks import send_queued_emails
+
+
+@override_settings(
+    EMAIL_BACKEND='switchdeck.apps.mailer.backends.QueuedEmailBackend',
+    MAILER_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class QueuedEmailTest(TestCase):
+    def test_send_mail_is_queued(self):
+        mail.send_mail('subject', 'body', 'from@example.com',
+                       ['to@example.com'])
+        self.assertEqual(0, len(mail.outbox))
+        self.assertEqual(1, OutgoingEmail.pending().count())
+
+    def test_queue_sent_by_batches(self):
+        for i in range(3):
+            mail.send_mail(f'subject {i}', 'body', 'from@example.com',
+                           ['to@example.com'])
+        with mock.patch.object(send_queued_emails, 'delay') as delay:
+            self.assertEqual(2, send_queued_emails.run(batch_size=2))
+            delay.assert_called_once_with(2)
+            self.assertEqual(1, send_queued_emails.run(batch_size=2))
+        self.assertEqual(3, len(mail.outbox))
+        self.assertFalse(OutgoingEmail.pending().exists())
+
+    def test_html_alternative_kept(self):
+        message = mail.EmailMultiAlternatives(
+            'subject', 'body', 'from@example.com', ['to@example.com'])
+        message.attach_alternative('<p>body</p>', 'text/html')
+        QueuedEmailBackend().send_messages([message])
+        send_queued_emails.run()
+        self.assertEqual([('<p>body</p>', 'text/html')],
+                         mail.outbox[0].alternatives)
+
+    def test_claimed_emails_skipped_until_claim_expires(self):
+        for i in range(2):
+            mail.send_mail(f'subject {i}', 'body', 'from@example.com',
+                           ['to@example.com'])
+        claimed = OutgoingEmail.claim(1)
+        self.assertEqual(1, len(claimed))
+        self.assertEqual(1, OutgoingEmail.pending().count())
+        self.assertEqual(OutgoingEmail.STATUSES.SENDING,
+                         OutgoingEmail.objects.get(pk=claimed[0].pk).status)
+        OutgoingEmail.objects.filter(pk=claimed[0].pk).update(
+            next_attempt=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(2, OutgoingEmail.pending().count())
+
+    def test_failed_email_pending_again(self):
+        mail.send_mail('subject', 'body', 'from@example.com',
+                       ['to@example.com'])
+        with mock.patch('django.core.mail.EmailMessage.send',
+                        side_effect=OSError('refused')):
+            self.assertEqual(0, send_queued_emails.run())
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(OutgoingEmail.STATUSES.PENDING, email.status)
+        self.assertEqual(1, email.attempts)
+
+    def test_retried_email_sent_by_next_run(self):
+        mail.send_mail('subject', 'body', 'from@example.com',
+                       ['to@example.com'])
+        email = OutgoingEmail.objects.get()
+        for attempt in range(settings.MAILER_MAX_ATTEMPTS):
+            email.mark_failed(OSError('refused'))
+        self.assertEqual(OutgoingEmail.STATUSES.FAILED, email.status)
+        admin = get_user_model().objects.create_superuser(
+            'admin', 'admin@example.com', 'admin')
+        self.client.force_login(admin)
+        with mock.patch.object(send_queued_emails, 'delay') as delay:
+            self.client.post('/admin/mailer/outgoingemail/', {
+                'action': 'retry_queryset', '_selected_action': [email.pk]})
+        delay.assert_called_once_with()
+        self.assertEqual(1, send_queued_emails.run())
+        self.assertEqual(1, len(mail.outbox))
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('profile', 'lot', 'created', 'read', 'digested')
+    list_filter = ('read', )
+    date_hierarchy = 'created'
+    raw_id_fields = ('profile', 'lot')
@@ -0,0 +1,13 @@
+from rest_framework import serializers
+
+from ..models import Notification
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    lot = serializers.HyperlinkedRelatedField(
+        view_name='lot-detail', read_only=True)
+
+    class Meta:
+        model = Notification
+        fields = ('id', 'lot', 'created', 'read')
+        read_only_fields = ('id', 'lot', 'created')
@@ -0,0 +1,35 @@
+from rest_framework import viewsets, permissions, mixins, serializers
+from rest_framework.exceptions import ValidationError
+
+from switchdeck.apps.users.identity import request_profile_id
+
+from .serializers import Notification, NotificationSerializer
+
+
+class NotificationViewSet(
+    mixins.ListModelMixin,
+    mixins.UpdateModelMixin,
+    viewsets.GenericViewSet
+    ):
+    """
+    Notifications of request user about wished games on sale.
+
+    ``?unread=1`` returns only unread notifications, ``?unread=0`` only
+    read ones.
+    """
+
+    serializer_class = NotificationSerializer
+    queryset = Notification.objects.all()
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = Notification.objects\
+            .filter(profile_id=request_profile_id(self.request))
+        unread = self.request.query_params.get('unread')
+        if unread is not None:
+            try:
+                unread = serializers.BooleanField().to_internal_value(unread)
+            except ValidationError as e:
+                raise ValidationError({'unread': e.detail})
+            queryset = queryset.filter(read=not unread)
+        return queryset
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class NotificationsConfig(AppConfig):
+    name = 'switchdeck.apps.notifications'
+    verbose_name = _('Notification')
+    verbose_name_plural = _('Notifications')
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,45 @@
+# Generated by Django 4.0 on 2026-10-19 18:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('users', '0003_auto_20210509_1914'),
+        ('lot', '0004_lot_game_prop_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                ('read', models.BooleanField(default=False, verbose_name='Read')),
+                ('digested', models.DateTimeField(blank=True, help_text='Time of sending in email digest.', null=True, verbose_name='Digested')),
+                ('lot', models.ForeignKey(help_text='Lot set to sell.', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='lot.lot', verbose_name='Lot')),
+                ('profile', models.ForeignKey(help_text='Notified profile.', on_delete=django.db.models.deletion.CASCADE, related_name='notifications', related_query_name='notification', to='users.profile', verbose_name='Profile')),
+            ],
+            options={
+                'verbose_name': 'Notification',
+                'verbose_name_plural': 'Notifications',
+                'ordering': ('-created',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['profile', '-created'], name='notification_profile_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['digested', 'profile'], name='notification_digest_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('profile', 'lot'), name='notification_unique_lot'),
+        ),
+    ]
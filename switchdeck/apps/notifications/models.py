@@ -0,0 +1,49 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class Notification(models.Model):
+    """Notification of profile about lot of wished game set to sell."""
+
+    profile = models.ForeignKey(
+        'users.Profile',
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        related_query_name='notification',
+        verbose_name=_('Profile'),
+        help_text=_("Notified profile."))
+    lot = models.ForeignKey(
+        'lot.Lot',
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('Lot'),
+        help_text=_("Lot set to sell."))
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Created'))
+    read = models.BooleanField(
+        default=False,
+        verbose_name=_('Read'))
+    digested = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Digested'),
+        help_text=_("Time of sending in email digest."))
+
+    class Meta:
+        verbose_name = _('Notification')
+        verbose_name_plural = _('Notifications')
+        ordering = ('-created', )
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'lot'],
+                                    name='notification_unique_lot'),
+        ]
+        indexes = [
+            models.Index(fields=['profile', '-created'],
+                         name='notification_profile_idx'),
+            models.Index(fields=['digested', 'profile'],
+                         name='notification_digest_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.profile_id} <- {self.lot_id}'
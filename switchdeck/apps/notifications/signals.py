@@ -0,0 +1,14 @@
+"""Signal handlers scheduling notifications."""
+from django.db import transaction
+from django.dispatch import receiver
+
+from switchdeck.apps.lot.signals import lot_put_on_sale
+
+from .tasks import notify_wishers
+
+
+@receiver(lot_put_on_sale)
+def schedule_notify_wishers(sender, lot, **kwargs):
+    """Notify wishers of lot game by celery worker, once lot is public."""
+    transaction.on_commit(lambda: notify_wishers.apply_async(
+        (lot.pk,), eta=lot.public_date))
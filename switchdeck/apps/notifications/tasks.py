@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.mail import send_mass_mail
+from django.db.models import Prefetch, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from switchdeck.celery import app
+from switchdeck.apps.lot.models import Lot
+from switchdeck.apps.users.models import Profile
+from .models import Notification
+
+
+@app.task
+def notify_wishers(lot_id, batch_size=None):
+    """
+    Create notifications for profiles wishing game of lot to sell.
+
+    Wishers are profiles with active lots of same game marked as ``wish``
+    or ``buy``. Lots published in future are skipped, task of such lot
+    is scheduled to its public date. Notifications are created by batches.
+    """
+    batch_size = batch_size or settings.NOTIFICATIONS_BATCH_SIZE
+    try:
+        lot = Lot.objects.get(pk=lot_id, prop='s', active=True,
+                              public_date__lte=timezone.now())
+    except Lot.DoesNotExist:
+        return 0
+    wishers = Lot.objects\
+        .filter(game_id=lot.game_id, active=True)\
+        .filter(Q(prop='w') | Q(prop='b'))\
+        .exclude(profile_id=lot.profile_id)\
+        .order_by('profile_id')\
+        .values_list('profile_id', flat=True)\
+        .distinct()
+    created = 0
+    last_profile_id = 0
+    while True:
+        profile_ids = list(
+            wishers.filter(profile_id__gt=last_profile_id)[:batch_size])
+        Notification.objects.bulk_create(
+            [Notification(profile_id=profile_id, lot_id=lot.pk)
+             for profile_id in profile_ids],
+            ignore_conflicts=True)
+        created += len(profile_ids)
+        if len(profile_ids) < batch_size:
+            return created
+        last_profile_id = profile_ids[-1]
+
+
+@app.task
+def send_notification_digests(batch_size=None):
+    """
+    Send email digests of new notifications.
+
+    Profile gets no more than one digest per
+    ``NOTIFICATIONS_DIGEST_INTERVAL`` with no more than
+    ``NOTIFICATIONS_PER_DIGEST`` lots, the rest waits for next digest.
+    Notifications of the whole batch of profiles are fetched at once.
+    """
+    batch_size = batch_size or settings.NOTIFICATIONS_BATCH_SIZE
+    now = timezone.now()
+    recently_digested = Notification.objects.filter(
+        digested__gte=now - timedelta(
+            seconds=settings.NOTIFICATIONS_DIGEST_INTERVAL))\
+        .values('profile')
+    profile_ids = Notification.objects\
+        .filter(digested__isnull=True)\
+        .exclude(profile__in=recently_digested)\
+        .values_list('profile', flat=True)\
+        .distinct()[:batch_size]
+    profiles = Profile.objects.filter(pk__in=list(profile_ids))\
+        .select_related('user')\
+        .prefetch_related(Prefetch(
+            'notifications',
+            queryset=Notification.objects.filter(digested__isnull=True)
+            .select_related('lot__game').order_by('created'),
+            to_attr='undigested'))
+    domain = Site.objects.get_current().domain
+    messages = []
+    digested = []
+    for profile in profiles:
+        notifications = profile.undigested[
+            :settings.NOTIFICATIONS_PER_DIGEST]
+        digested.extend(notification.pk for notification in notifications)
+        if not profile.user.email:
+            continue
+        messages.append((
+            "SwitchDeck: Wished games on sale",
+            render_to_string('notifications/digest_email.txt', {
+                'profile': profile,
+                'domain': domain,
+                'notifications': notifications}),
+            settings.NOTIFICATIONS_FROM_EMAIL,
+            [profile.user.email]))
+    send_mass_mail(messages)
+    Notification.objects.filter(pk__in=digested).update(digested=now)
+    return len(messages)
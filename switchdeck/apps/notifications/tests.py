@@ -0,0 +1,89 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.sites.models import Site
+from django.core import mail
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from switchdeck.apps.game.models import Game
+from switchdeck.apps.lot.models import Lot
+from switchdeck.apps.lot.signals import lot_put_on_sale
+from switchdeck.apps.place.models import Place
+from switchdeck.apps.users.models import Profile
+
+from .models import Notification
+from .tasks import notify_wishers, send_notification_digests
+
+
+class NotificationsTest(TestCase):
+    def setUp(self):
+        minsk = Place.objects.create(name='minsk', slug='minsk')
+        self.tloz = Game.objects.create(name='TLOZ', slug='tloz')
+        self.john = Profile.create_profile('john', 'john@example.com',
+                                           'passwordjohn', place=minsk)
+        self.mary = Profile.create_profile('mary', 'mary@example.com',
+                                           'passwordmary', place=minsk)
+        self.ann = Profile.create_profile('ann', 'ann@example.com',
+                                          'passwordann', place=minsk)
+        Lot.objects.create(profile=self.mary, game=self.tloz, prop='w')
+        Lot.objects.create(profile=self.ann, game=self.tloz, prop='b')
+        Lot.objects.create(profile=self.ann, game=self.tloz, prop='w',
+                           active=False)
+        self.lot = Lot.objects.create(profile=self.john, game=self.tloz,
+                                      prop='s')
+
+    def test_wishers_notified_by_batches(self):
+        self.assertEqual(2, notify_wishers.run(self.lot.pk, batch_size=1))
+        self.assertEqual(
+            {self.mary.pk, self.ann.pk},
+            set(Notification.objects.values_list('profile', flat=True)))
+        # repeated sell event does not duplicate notifications
+        notify_wishers.run(self.lot.pk)
+        self.assertEqual(2, Notification.objects.count())
+
+    def test_future_lot_not_notified(self):
+        self.lot.public_date = timezone.now() + timedelta(days=1)
+        self.lot.save()
+        self.assertEqual(0, notify_wishers.run(self.lot.pk))
+        self.assertFalse(Notification.objects.exists())
+        with mock.patch.object(notify_wishers, 'apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                lot_put_on_sale.send(sender=Lot, lot=self.lot)
+        apply_async.assert_called_once_with((self.lot.pk,),
+                                            eta=self.lot.public_date)
+
+    def test_digest_rate_limited(self):
+        notify_wishers.run(self.lot.pk)
+        mail.outbox = []
+        self.assertEqual(2, send_notification_digests.run())
+        self.assertIn(self.lot.get_absolute_url(), mail.outbox[0].body)
+        other = Lot.objects.create(profile=self.john, game=self.tloz,
+                                   prop='s')
+        notify_wishers.run(other.pk)
+        self.assertEqual(0, send_notification_digests.run())
+        self.assertEqual(2, Notification.objects
+                         .filter(digested__isnull=True).count())
+
+    def test_digest_queries_do_not_grow_with_profiles(self):
+        notify_wishers.run(self.lot.pk)
+        Site.objects.clear_cache()
+        # recently digested, profiles and their notifications with lots,
+        # site, update of digested
+        with self.assertNumQueries(5):
+            self.assertEqual(2, send_notification_digests.run())
+
+    def test_unread_filter(self):
+        notify_wishers.run(self.lot.pk)
+        Notification.objects.filter(profile=self.mary).update(read=True)
+        mary = Notification.objects.get(profile=self.mary)
+        client = APIClient()
+        client.force_authenticate(self.mary.user)
+        for value, expected in (('1', []), ('true', []), ('0', [mary.pk]),
+                                ('false', [mary.pk])):
+            response = client.get('/api/notifications/', {'unread': value})
+            self.assertEqual(expected, [notification['id'] for notification
+                                        in response.json()['results']])
+        response = client.get('/api/notifications/', {'unread': 'maybe'})
+        self.assertEqual(400, response.status_code)
@@ -7,8 +7,8 @@ from .models import Place
 class PlaceAdmin(admin.ModelAdmin):
     """`Place` class admin pages."""
 
-    list_display = ['name', 'popularity']
+    list_display = ['name', 'popularity', 'sell_count', 'buy_count']
     list_display_links = ['name']
     search_fields = ['name']
-    list_editable = ['popularity']
-    prepopulated_fields = {'slug': ('name',)}
\ No newline at end of file
+    readonly_fields = ['popularity', 'sell_count', 'buy_count']
+    prepopulated_fields = {'slug': ('name',)}
@@ -1,9 +1,10 @@
 from rest_framework.serializers import HyperlinkedModelSerializer
 
+from switchdeck.apps.core.api.serializers import SparseFieldsMixin
 from ..models import Place
 
 
-class PlaceSerializer(HyperlinkedModelSerializer):
+class PlaceSerializer(SparseFieldsMixin, HyperlinkedModelSerializer):
     """Serializer/Desirializer of ``Place`` model."""
 
     class Meta:
@@ -1,13 +1,18 @@
 from rest_framework.viewsets import ModelViewSet
 
+from switchdeck.apps.core.api.views import (
+    ConditionalMixin, EagerLoadingMixin, ValuesListMixin)
 from ..models import Place
 from .serializers import PlaceSerializer
 
-class PlaceViewSet(ModelViewSet):
+class PlaceViewSet(ConditionalMixin, ValuesListMixin, EagerLoadingMixin,
+                   ModelViewSet):
     """List of api views for ``Place`` model."""
 
     queryset = Place.objects.all()
     serializer_class = PlaceSerializer
+    conditional_models = [Place]
+    cache_max_age = 5 * 60
     # TODO maybe rewrite permissions
     # permission_classes = [permissions.IsAuthenticatedOrReadOnly,
     #                       IsStuffOrReadOnly]
\ No newline at end of file
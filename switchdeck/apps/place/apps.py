@@ -6,3 +6,6 @@ class PlaceConfig(AppConfig):
     name = 'switchdeck.apps.place'
     verbose_name = _('Place')
     verbose_name_plural = _('Places')
+
+    def ready(self):
+        from . import signals  # noqa: F401
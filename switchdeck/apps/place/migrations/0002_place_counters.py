@@ -0,0 +1,28 @@
+# Generated by Django 4.0 on 2026-10-19 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='buy_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Amount of active lots to buy in this place.', verbose_name='Buy count'),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='sell_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Amount of active lots to sell in this place.', verbose_name='Sell count'),
+        ),
+        migrations.AlterField(
+            model_name='place',
+            name='popularity',
+            field=models.IntegerField(default=0, help_text='Popularity of place. The higher popularity - the higher this place in place list. Counted from amount of profiles and active lots of the place.', verbose_name='Popularity'),
+        ),
+    ]
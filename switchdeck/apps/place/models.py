@@ -1,8 +1,15 @@
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+from switchdeck.apps.core.cache import invalidate_on_commit, model_tag
+from switchdeck.apps.core.models import CollectionVersion
+
+# Amount of lots on the first page of place lists. First pages are cached.
+LOTS_PER_PAGE = 15
+FIRST_PAGE_CACHE_TIMEOUT = 10 * 60
+
 
 class Place(models.Model):
     """Represent place for convinient searching."""
@@ -15,9 +22,20 @@ class Place(models.Model):
     popularity = models.IntegerField(
         default=0,
         help_text=_("Popularity of place. The higher popularity - the higher "
-                    "this place in place list."),
+                    "this place in place list. Counted from amount of "
+                    "profiles and active lots of the place."),
         verbose_name=_('Popularity')
     )
+    sell_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_('Sell count'),
+        help_text=_("Amount of active lots to sell in this place."))
+    buy_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_('Buy count'),
+        help_text=_("Amount of active lots to buy in this place."))
 
     class Meta():
         """Meta class for some `Place` class properties."""
@@ -34,5 +52,58 @@ class Place(models.Model):
     def get_absolute_url(self) -> str:
         """Return URL, there placed the info about a Place."""
         return reverse('place:place_detail', args=[self.slug])
-        
 
+    def active_lots(self, prop: str):
+        """
+        Return list of active lots of place with given prop.
+
+        Related :model:`switchdeck.Lot` instances, last upped first.
+        """
+        return self.lots.filter(active=True, prop=prop)\
+            .select_related('game')
+
+    def first_page_cache_key(self, prop: str) -> str:
+        """Return cache key of the first page of lots with given prop."""
+        return f'place:{self.pk}:lots:{prop}:first-page'
+
+    def first_page(self, prop: str) -> list:
+        """
+        Return cached first page of active lots with given prop.
+
+        Page is dropped from cache after commit of ``update_counters``.
+        """
+        key = self.first_page_cache_key(prop)
+        lots = cache.get(key)
+        if lots is None:
+            lots = list(self.active_lots(prop)[:LOTS_PER_PAGE])
+            cache.set(key, lots, FIRST_PAGE_CACHE_TIMEOUT)
+        return lots
+
+    def update_counters(self) -> None:
+        """
+        Recount lots of place and update ``popularity``.
+
+        Popularity is the sum of amount of related profiles and active lots.
+        Also drops cached first pages of place lists after commit.
+        """
+        counts = self.lots.filter(active=True).aggregate(
+            active=models.Count('pk'),
+            sell=models.Count('pk', filter=models.Q(prop='s')),
+            buy=models.Count('pk', filter=models.Q(prop='b')))
+        self.sell_count = counts['sell']
+        self.buy_count = counts['buy']
+        self.popularity = self.profile_set.count() + counts['active']
+        changed = Place.objects.filter(pk=self.pk).exclude(
+            sell_count=self.sell_count,
+            buy_count=self.buy_count,
+            popularity=self.popularity,
+        ).update(
+            sell_count=self.sell_count,
+            buy_count=self.buy_count,
+            popularity=self.popularity)
+        if changed:
+            # queryset update sends no signals
+            CollectionVersion.bump_on_commit(Place._meta.label_lower)
+            invalidate_on_commit(model_tag(Place), model_tag(Place, self.pk))
+        keys = [self.first_page_cache_key('s'), self.first_page_cache_key('b')]
+        transaction.on_commit(lambda: cache.delete_many(keys))
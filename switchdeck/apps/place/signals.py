@@ -0,0 +1,50 @@
+"""Signal handlers keeping place counters in sync with lots and profiles."""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from switchdeck.apps.lot.models import Lot
+from switchdeck.apps.users.models import Profile
+
+from .models import Place
+
+
+def update_places_counters(*place_ids) -> None:
+    """Update counters of places with given ids."""
+    for place in Place.objects.filter(pk__in=set(place_ids) - {None}):
+        place.update_counters()
+
+
+@receiver(post_save, sender=Lot)
+def lot_saved(sender, instance, update_fields=None, **kwargs):
+    """Recount places of saved lot if its place, prop or activity changed."""
+    changes = instance.counted_changes()
+    if update_fields is not None:
+        updated = {Lot._meta.get_field(name).attname
+                   for name in update_fields}
+        changes = {name: value for name, value in changes.items()
+                   if name in updated}
+    if changes:
+        update_places_counters(instance.place_id, changes.get('place_id'))
+
+
+@receiver(post_delete, sender=Lot)
+def lot_deleted(sender, instance, **kwargs):
+    """Recount lots of the place of deleted lot."""
+    update_places_counters(instance.place_id)
+
+
+@receiver(post_save, sender=Profile)
+def profile_saved(sender, instance, **kwargs):
+    """Move lots of the profile to the new place and recount places."""
+    moved_lots = Lot.objects.filter(profile=instance)\
+        .exclude(place=instance.place_id)
+    old_place_ids = list(
+        moved_lots.values_list('place', flat=True).distinct())
+    moved_lots.update(place=instance.place_id)
+    update_places_counters(instance.place_id, *old_place_ids)
+
+
+@receiver(post_delete, sender=Profile)
+def profile_deleted(sender, instance, **kwargs):
+    """Recount place of deleted profile."""
+    update_places_counters(instance.place_id)
@@ -0,0 +1,14 @@
+from switchdeck.celery import app
+from .models import Place
+
+
+@app.task
+def update_all_places_counters():
+    """
+    Recount counters of all places.
+
+    Counters are kept by signals, this fixes drift of queryset updates,
+    which send no signals.
+    """
+    for place in Place.objects.all():
+        place.update_counters()
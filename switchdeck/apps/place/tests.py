@@ -1,3 +1,86 @@
-from django.test import TestCase
+from django.test import TestCase, Client
+from django.core.cache import cache
 
-# Create your tests here.
+from switchdeck.apps.game.models import Game
+from switchdeck.apps.lot.models import Lot
+from switchdeck.apps.users.models import Profile
+
+from .models import Place
+
+
+class PlaceCountersTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.minsk = Place.objects.create(name='minsk', slug='minsk')
+        self.brest = Place.objects.create(name='brest', slug='brest')
+        self.tloz = Game.objects.create(name='TLOZ', slug='tloz')
+        self.john = Profile.create_profile('john', 'john@example.com',
+                                           'passwordjohn', place=self.minsk)
+
+    def test_lot_place_copied_from_profile(self):
+        lot = Lot.objects.create(profile=self.john, game=self.tloz, prop='s')
+        self.assertEqual(self.minsk.pk, lot.place_id)
+
+    def test_counters_follow_lots(self):
+        lot = Lot.objects.create(profile=self.john, game=self.tloz, prop='s')
+        Lot.objects.create(profile=self.john, game=self.tloz, prop='b')
+        self.minsk.refresh_from_db()
+        self.assertEqual(1, self.minsk.sell_count)
+        self.assertEqual(1, self.minsk.buy_count)
+        self.assertEqual(3, self.minsk.popularity)
+        lot.active = False
+        lot.save(update_fields=['active'])
+        self.minsk.refresh_from_db()
+        self.assertEqual(0, self.minsk.sell_count)
+
+    def test_counters_kept_on_other_changes(self):
+        lot = Lot.objects.create(profile=self.john, game=self.tloz, prop='s')
+        lot = Lot.objects.get(pk=lot.pk)
+        lot.desc = 'mint condition'
+        with self.assertNumQueries(1):
+            lot.save()
+        lot.prop = 'b'
+        with self.assertNumQueries(1):
+            lot.save(update_fields=['desc'])
+        lot.save()
+        self.minsk.refresh_from_db()
+        self.assertEqual((0, 1), (self.minsk.sell_count,
+                                  self.minsk.buy_count))
+
+    def test_profile_move_moves_lots(self):
+        lot = Lot.objects.create(profile=self.john, game=self.tloz, prop='s')
+        self.john.place = self.brest
+        self.john.save()
+        lot.refresh_from_db()
+        self.minsk.refresh_from_db()
+        self.brest.refresh_from_db()
+        self.assertEqual(self.brest.pk, lot.place_id)
+        self.assertEqual(0, self.minsk.popularity)
+        self.assertEqual(1, self.brest.sell_count)
+
+    def test_first_page_invalidated(self):
+        self.assertEqual([], self.minsk.first_page('s'))
+        with self.captureOnCommitCallbacks(execute=True):
+            lot = Lot.objects.create(profile=self.john, game=self.tloz,
+                                     prop='s')
+        self.assertEqual([lot], self.minsk.first_page('s'))
+
+    def test_place_lists_accessable(self):
+        Lot.objects.create(profile=self.john, game=self.tloz, prop='s')
+        c = Client()
+        self.assertEqual(200, c.get(self.minsk.get_absolute_url())
+                         .status_code)
+        self.assertEqual(200, c.get('/places/minsk/sell-list/').status_code)
+        self.assertEqual(404, c.get('/places/minsk/buy-list/').status_code)
+
+    def test_bad_page_size_falls_back_to_default(self):
+        Lot.objects.create(profile=self.john, game=self.tloz, prop='s')
+        c = Client()
+        for value in ('abc', '0', '-3'):
+            response = c.get('/places/minsk/sell-list/',
+                             {'objects-per-page': value})
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(24, response.context['paginator'].per_page)
+            self.assertNotIn('objects_per_page', response.context)
+        response = c.get('/places/minsk/sell-list/', {'objects-per-page': 5})
+        self.assertEqual(5, response.context['objects_per_page'])
@@ -1,10 +1,27 @@
-from django.urls import path
+from django.urls import path, include
 
-from .views import PlaceView, PlacesListView
+from .views import (
+    PlaceView, PlacesListView, PlaceSellListView, PlaceBuyListView)
 
 app_name = 'place'
 
 urlpatterns = [
-    path('<slug:slug>/', PlaceView.as_view(), name='place_detail'),
+    path('<slug:slug>/', include([
+        path('', PlaceView.as_view(), name='place_detail'),
+        # Additional page with lots to sell
+        path('sell-list/', PlaceSellListView.as_view(),
+             name='place_sell_list'),
+        # Additional page with lots to buy
+        path('buy-list/', PlaceBuyListView.as_view(),
+             name='place_buy_list'),
+    ])),
     path('', PlacesListView.as_view(), name='place_list'),
-]
\ No newline at end of file
+]
+
+# Most queries of requests by url names, checked by tests
+query_budgets = {
+    'place_detail': 5,
+    'place_sell_list': 4,
+    'place_buy_list': 4,
+    'place_list': 4,
+}
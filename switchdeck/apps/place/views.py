@@ -1,52 +1,146 @@
-from django.shortcuts import render
-from django.views.generic import DetailView, ListView
-
-from switchdeck.apps.lot.models import Lot
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views.generic import ListView
 
+from switchdeck.apps.core.async_views import AsyncView, gather_queries
+from switchdeck.apps.core.cache import cache_view, model_tag
 from .models import Place
 
 # Create your views here.
 
-class PlaceView(DetailView):
+class PlaceView(AsyncView):
     """
     Show the details about Place instance.
 
     **Arguments**
 
-    ``name: str``
-        Name of the place.
+    ``slug: slug``
+        Slug name of the place.
 
     **Context**
 
-    ``object``
+    ``object``, ``place``
         Related :model:`switchdeck.Place` instance.
     ``sell_list``
-        List of all available :model:`switchdeck.Lot` objects related to
-        this place, ready to sell.
+        First page of available :model:`switchdeck.Lot` objects related to
+        this place, ready to sell. Cached.
     ``buy_list``
-        List of all available :model:`switchdeck.Lot` objects related to
-        this place, ready to buy.
+        First page of available :model:`switchdeck.Lot` objects related to
+        this place, ready to buy. Cached.
 
     **Template**
 
-    :template:`switchdeck/place_detail.html`
+    :template:`place/place_detail.html`
     """
 
-    model = Place
+    async def get(self, request, slug):
+        """Render place with first pages of lots, loaded at once."""
+        place = await sync_to_async(get_object_or_404)(Place, slug=slug)
+        sell_list, buy_list = await gather_queries(
+            lambda: place.first_page('s'), lambda: place.first_page('b'))
+        context = {'object': place, 'place': place, 'sell_list': sell_list,
+                   'buy_list': buy_list}
+        return await sync_to_async(render)(request, 'place/place_detail.html',
+                                           context)
+
+
+class PlaceBaseList(ListView):
+    '''Base class for views that return paginated list of place lots.'''
+
+    template_name = 'place/place_additional_list.html'
+    allow_empty = False
+    prop = None
+    default_per_page = 24
+
+    def setup(self, request, *args, **kwargs):
+        """Initialize atributes and return 404 for nonexisting places."""
+        super().setup(request, *args, **kwargs)
+        self.place = get_object_or_404(Place, slug=self.kwargs['slug'])
+
+    def get_queryset(self):
+        """Return queryset of objects to display."""
+        return self.place.active_lots(self.prop)
+
+    def requested_per_page(self):
+        """Return positive size of page requested by user, else ``None``."""
+        try:
+            per_page = int(self.request.GET['objects-per-page'])
+        except (KeyError, ValueError):
+            return None
+        return per_page if per_page > 0 else None
+
+    def get_paginate_by(self, queryset):
+        """Generate pagination with requested size."""
+        return self.requested_per_page() or self.default_per_page
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        """Return paginator, which takes objects count from place counters."""
+        paginator = super().get_paginator(queryset, per_page, **kwargs)
+        paginator.count = (self.place.sell_count if self.prop == 's'
+                           else self.place.buy_count)
+        return paginator
 
     def get_context_data(self, **kwargs):
-        """Insert related context data.
-
-        Insert `Place `object and lists of related profiles and lots.
-        """
+        """Get context and add info about place."""
         context = super().get_context_data(**kwargs)
-        gl_query = Lot.objects.filter(profile__place=self.object)\
-            .filter(active=True)
-        context['sell_list'] = gl_query.filter(prop='s')
-        context['buy_list'] = gl_query.filter(prop='b')
+        context["place"] = self.place
+        per_page = self.requested_per_page()
+        if per_page:
+            context['objects_per_page'] = per_page
         return context
 
 
+class PlaceSellListView(PlaceBaseList):
+    '''
+    Class view for list of lots of place to sell.
+
+    **Context**
+
+    ``place``
+        Related :model:`switchdeck.Place` instance.
+    ``objects``
+        List of represented :model:`switchdeck.Lot` instances. Paginated.
+    ``objects_per_page``
+        Queried ammount of objects per page (related to pagination).
+    ``proposition``
+        Always is ``sell``.
+
+    **Template**
+
+    :template:`place/place_additional_list.html`
+    '''
+
+    prop = 's'
+    extra_context = {'proposition': 'sell'}
+
+
+class PlaceBuyListView(PlaceBaseList):
+    '''
+    Class view for list of lots of place to buy.
+
+    **Context**
+
+    ``place``
+        Related :model:`switchdeck.Place` instance.
+    ``objects``
+        List of represented :model:`switchdeck.Lot` instances. Paginated.
+    ``objects_per_page``
+        Queried ammount of objects per page (related to pagination).
+    ``proposition``
+        Always is ``buy``.
+
+    **Template**
+
+    :template:`place/place_additional_list.html`
+    '''
+
+    prop = 'b'
+    extra_context = {'proposition': 'buy'}
+
+
+@method_decorator(cache_view('place-list', tags=[model_tag(Place)]),
+                  name='dispatch')
 class PlacesListView(ListView):
     """
     Show all available Places.
@@ -61,4 +155,4 @@ class PlacesListView(ListView):
     :template:`switchdeck/place_list.html`
     """
 
-    model = Place
\ No newline at end of file
+    model = Place
@@ -1,9 +1,11 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from switchdeck.apps.core.api.serializers import SparseFieldsMixin
 from ..models import Profile, User
 
-class ProfileSerializer(serializers.HyperlinkedModelSerializer):
+class ProfileSerializer(SparseFieldsMixin,
+                        serializers.HyperlinkedModelSerializer):
     """Serializer/Desirializer of ``Profile`` model."""
 
     class Meta:
@@ -11,9 +13,17 @@ class ProfileSerializer(serializers.HyperlinkedModelSerializer):
 
         model = Profile
         fields = ['url', 'user', 'place', 'lot_set']
+        expandable_fields = {
+            'user': 'switchdeck.apps.users.api.serializers.UserSerializer',
+            'place': 'switchdeck.apps.place.api.serializers.PlaceSerializer',
+            'lot_set': ('switchdeck.apps.lot.api.serializers.LotSerializer',
+                        {'many': True,
+                         'fields': ['url', 'id', 'game', 'prop', 'price']}),
+        }
 
 
-class UserSerializer(serializers.HyperlinkedModelSerializer):
+class UserSerializer(SparseFieldsMixin,
+                     serializers.HyperlinkedModelSerializer):
     """Serializer/Desirializer of ``User`` model."""
 
     class Meta:
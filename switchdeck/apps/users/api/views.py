@@ -1,27 +1,44 @@
 from rest_framework import viewsets, permissions
 from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
 
+from switchdeck.apps.core.api.views import (
+    ConditionalMixin, EagerLoadingMixin, ValuesListMixin)
+from switchdeck.apps.lot.models import Lot
+from switchdeck.apps.place.models import Place
 from ..models import Profile
 from .serializers import ProfileSerializer, UserSerializer
 
 
-class ProfileViewSet(viewsets.ModelViewSet):
+class ProfileViewSet(ConditionalMixin, ValuesListMixin, EagerLoadingMixin,
+                     viewsets.ModelViewSet):
     """List of api views for ``Profile`` model."""
 
-    queryset = Profile.objects.all()
+    queryset = Profile.objects.order_by('pk')
     serializer_class = ProfileSerializer
     permission_classes = [
         permissions.IsAuthenticatedOrReadOnly,
         # IsStuffOrReadOnly
     ]
+    prefetch_related_fields = {
+        'lot_set': [Prefetch('lot_set',
+                             Lot.objects.only('id', 'profile_id'))],
+    }
+    select_related_expand = {'user': ['user'], 'place': ['place']}
+    conditional_models = [Profile, Lot, Place, get_user_model()]
+    cache_max_age = 60
+    prefetch_related_expand = {'lot_set': ['lot_set']}
 
 # TODO DO we realy need user views?
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalMixin, ValuesListMixin, EagerLoadingMixin,
+                  viewsets.ModelViewSet):
     """List of api views for ``User`` model."""
 
-    queryset = get_user_model().objects.all()
+    queryset = get_user_model().objects.order_by('pk')
     serializer_class = UserSerializer
     permission_classes = [
         permissions.IsAuthenticatedOrReadOnly,
         # IsStuffOrReadOnly
-    ]
\ No newline at end of file
+    ]
+    conditional_models = [get_user_model()]
+    cache_max_age = 5 * 60
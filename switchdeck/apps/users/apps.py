@@ -6,3 +6,6 @@ class UsersConfig(AppConfig):
     name = 'switchdeck.apps.users'
     verbose_name = _('User')
     verbose_name_plural = _('Users')
+
+    def ready(self):
+        from . import signals  # noqa: F401
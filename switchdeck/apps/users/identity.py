@@ -0,0 +1,112 @@
+"""
+Cached identity data of profiles.
+
+Identity (ids, username, place) is looked up in per-request memo, then in
+shared cache and only then in database. Shared cache is invalidated on
+``Profile`` and ``User`` changes (see ``signals``).
+"""
+import contextvars
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+
+_request_memo = contextvars.ContextVar('profile_identity_memo', default=None)
+
+
+class ProfileIdentity(NamedTuple):
+    """Identity data of ``Profile`` and related ``User``."""
+
+    profile_id: int
+    user_id: int
+    username: str
+    place_id: Optional[int]
+    is_active: bool
+
+    def __str__(self) -> str:
+        return self.username
+
+    def get_username(self) -> str:
+        """Username of Profile."""
+        return self.username
+
+    def get_absolute_url(self) -> str:
+        """Return URL there placed info about Profile."""
+        return reverse('users:detail', kwargs={'username': self.username})
+
+
+def profile_cache_key(profile_id: int) -> str:
+    return f'profile-identity:profile:{profile_id}'
+
+
+def user_cache_key(user_id: int) -> str:
+    return f'profile-identity:user:{user_id}'
+
+
+def start_request_memo():
+    """Start new per-request memo, return token to reset it."""
+    return _request_memo.set({})
+
+
+def end_request_memo(token) -> None:
+    """Drop per-request memo."""
+    _request_memo.reset(token)
+
+
+def _lookup(key: str, **filters) -> Optional[ProfileIdentity]:
+    memo = _request_memo.get()
+    if memo is not None and key in memo:
+        return memo[key]
+    identity = cache.get(key)
+    if identity is None:
+        from .models import Profile
+        row = Profile.objects.filter(**filters).values_list(
+            'pk', 'user_id', 'user__username', 'place_id',
+            'user__is_active').first()
+        if row is not None:
+            identity = ProfileIdentity(*row)
+            cache.set_many({profile_cache_key(identity.profile_id): identity,
+                            user_cache_key(identity.user_id): identity},
+                           settings.PROFILE_IDENTITY_CACHE_TIMEOUT)
+    if memo is not None:
+        memo[key] = identity
+    return identity
+
+
+def get_profile_identity(profile_id: int) -> Optional[ProfileIdentity]:
+    """Return identity of profile with given id or ``None``."""
+    return _lookup(profile_cache_key(profile_id), pk=profile_id)
+
+
+def get_user_identity(user_id: int) -> Optional[ProfileIdentity]:
+    """Return identity of profile of user with given id or ``None``."""
+    return _lookup(user_cache_key(user_id), user_id=user_id)
+
+
+def request_profile_id(request) -> Optional[int]:
+    """
+    Return id of profile of request user.
+
+    Identity is taken from per-request memo, so users authenticated after
+    middleware, e.g. by REST framework authentication classes, are found.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    identity = get_user_identity(user.pk)
+    return identity.profile_id if identity is not None else None
+
+
+def invalidate(profile_id: int = None, user_id: int = None) -> None:
+    """Drop identity from shared cache and current request memo."""
+    keys = []
+    if profile_id is not None:
+        keys.append(profile_cache_key(profile_id))
+    if user_id is not None:
+        keys.append(user_cache_key(user_id))
+    cache.delete_many(keys)
+    memo = _request_memo.get()
+    if memo is not None:
+        for key in keys:
+            memo.pop(key, None)
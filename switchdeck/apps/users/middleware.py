@@ -0,0 +1,35 @@
+"""Middlewares related to users and profiles."""
+from django.utils.functional import SimpleLazyObject
+
+from .identity import (
+    start_request_memo, end_request_memo, get_user_identity)
+
+
+def get_request_identity(request):
+    """Return identity of profile of request user, ``None`` if anonymous."""
+    if request.user.is_authenticated:
+        return get_user_identity(request.user.pk)
+    return None
+
+
+class ProfileIdentityMiddleware:
+    """
+    Set lazy identity of authenticated user's profile.
+
+    Sets ``request.profile_identity`` (``None`` for anonymous users and
+    users without profile), looked up on first access only, so requests
+    not using it do not load session user. Keeps per-request identity
+    memo. Must be placed after ``AuthenticationMiddleware``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = start_request_memo()
+        try:
+            request.profile_identity = SimpleLazyObject(
+                lambda: get_request_identity(request))
+            return self.get_response(request)
+        finally:
+            end_request_memo(token)
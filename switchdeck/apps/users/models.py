@@ -5,6 +5,8 @@ from django.urls import reverse
 from django.conf import settings
 from django.contrib.auth import get_user_model
 
+from .identity import get_profile_identity
+
 
 class User(AbstractUser):
     """Class of user.Inherits from AbstractUser login methods and add link
@@ -53,15 +55,22 @@ class Profile(models.Model):
 
     def __str__(self) -> str:
         """Return the string representation of Profile (Profile username)."""
-        return self.user.get_username()
+        return self.get_username()
 
     def get_absolute_url(self) -> str:
         """Return URL there placed info about Profile."""
         return reverse('users:detail', kwargs={'username': self.get_username()})
 
     def get_username(self) -> str:
-        """Username of Profile."""
-        return self.user.get_username()
+        """Username of Profile. Taken from identity cache if user not loaded."""
+        if self.pk is None or Profile.user.is_cached(self):
+            return self.user.get_username()
+        return self.identity.username
+
+    @property
+    def identity(self) -> 'ProfileIdentity':
+        """Return cached identity data of Profile."""
+        return get_profile_identity(self.pk)
 
     def keep_list(self, with_inactive: bool = False):
         """
@@ -0,0 +1,29 @@
+"""Signal handlers dropping cached identities of changed profiles."""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import identity
+from .models import Profile
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def profile_changed(sender, instance, **kwargs):
+    identity.invalidate(profile_id=instance.pk, user_id=instance.user_id)
+
+
+# fields of user kept in identity
+IDENTITY_USER_FIELDS = {'username', 'is_active'}
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # e.g. ``last_login`` is saved on every login
+    if update_fields is not None \
+            and not IDENTITY_USER_FIELDS.intersection(update_fields):
+        return
+    profile_id = Profile.objects.filter(user_id=instance.pk)\
+        .values_list('pk', flat=True).first()
+    identity.invalidate(profile_id=profile_id, user_id=instance.pk)
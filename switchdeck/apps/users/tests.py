@@ -1,3 +1,71 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.utils.functional import SimpleLazyObject
+
+from switchdeck.apps.place.models import Place
+
+from . import identity
+from .middleware import ProfileIdentityMiddleware
+from .models import Profile
+
+
+class ProfileIdentityTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.minsk = Place.objects.create(name='minsk', slug='minsk')
+        self.john = Profile.create_profile('john', 'john@example.com',
+                                           'passwordjohn', place=self.minsk)
+
+    def test_identity_cached(self):
+        with self.assertNumQueries(1):
+            first = identity.get_profile_identity(self.john.pk)
+        with self.assertNumQueries(0):
+            second = identity.get_user_identity(self.john.user_id)
+        self.assertEqual(first, second)
+        self.assertEqual('john', first.username)
+        self.assertEqual(self.minsk.pk, first.place_id)
+
+    def test_identity_invalidated_on_user_save(self):
+        identity.get_profile_identity(self.john.pk)
+        self.john.user.username = 'johnny'
+        self.john.user.save()
+        self.assertEqual('johnny',
+                         identity.get_profile_identity(self.john.pk).username)
+
+    def test_get_username_without_user_query(self):
+        identity.get_profile_identity(self.john.pk)
+        profile = Profile.objects.get(pk=self.john.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual('john', profile.get_username())
+
+    def test_identity_kept_on_login(self):
+        identity.get_profile_identity(self.john.pk)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(Client().login(username='john',
+                                           password='passwordjohn'))
+        # profile of user is not looked up to invalidate identity
+        self.assertFalse([query for query in queries
+                          if 'users_profile' in query['sql']])
+        self.assertIsNotNone(
+            cache.get(identity.profile_cache_key(self.john.pk)))
+
+    def test_middleware_does_not_load_unused_user(self):
+        request = RequestFactory().get('/')
+        get_user = mock.Mock(return_value=self.john.user)
+        request.user = SimpleLazyObject(get_user)
+        ProfileIdentityMiddleware(lambda request: HttpResponse())(request)
+        get_user.assert_not_called()
+        self.assertEqual(self.john.pk, request.profile_identity.profile_id)
+        get_user.assert_called_once()
+
+    def test_middleware_sets_identity(self):
+        c = Client()
+        c.login(username='john', password='passwordjohn')
+        resp = c.get('/accounts/')
+        self.assertEqual(self.john.pk,
+                         resp.wsgi_request.profile_identity.profile_id)
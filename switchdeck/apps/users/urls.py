@@ -13,4 +13,9 @@ urlpatterns = [
     path('update/',
          UpdateProfileView.as_view(),
          name='update'),
-]
\ No newline at end of file
+]
+
+# Most queries of requests by url names, checked by tests
+query_budgets = {
+    'list': 5,
+}
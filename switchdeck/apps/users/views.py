@@ -71,7 +71,7 @@ class UserProfileView(DetailView):
 @login_required
 def profile_redirect(request):
     """Must to redirect on session user profile page. Rarely use."""
-    return redirect(request.user.profile)
+    return redirect(request.profile_identity)
 
 
 class SignUpView(FormView):
@@ -0,0 +1,33 @@
+"""
+ASGI config for switchdeck project.
+
+Serves websockets of real-time chat and pages. nginx routes async views,
+like index, search, game and place pages, to this application. Several
+middlewares, WhiteNoise and project's own, are sync only, so Django runs
+every async view by ``async_to_sync`` in thread of request, from event
+loop of this process: unlike under WSGI, no event loop is created per
+request.
+
+It exposes the ASGI callable as a module-level variable named
+``application``.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'switchdeck.settings.production')
+
+django_asgi_application = get_asgi_application()
+
+from channels.auth import AuthMiddlewareStack  # noqa: E402
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+
+from switchdeck.apps.chat.routing import websocket_urlpatterns  # noqa: E402
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_application,
+    'websocket': AllowedHostsOriginValidator(
+        AuthMiddlewareStack(URLRouter(websocket_urlpatterns))),
+})
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_init
 import os
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE',
@@ -8,4 +9,11 @@ app = Celery('switchdeck')
 
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
-app.autodiscover_tasks()
\ No newline at end of file
+app.autodiscover_tasks()
+
+
+@worker_init.connect
+def prepare_pool(**kwargs):
+    # master of prefork pool, before forking of pool processes
+    from switchdeck.apps.core.startup import prepare_fork
+    prepare_fork()
@@ -1,7 +1,30 @@
+import os
+import tempfile
+
 from ._base import *
 
 ALLOWED_HOSTS = ['*']
 
-EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+MAILER_EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+
+DEBUG = True
+
+# One process in development, local channel layer is enough
+CHANNEL_LAYERS = {
+    'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'},
+}
+
+# Cache in files is shared by development server and celery worker
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'switchdeck-cache'),
+        'KEY_PREFIX': 'switchdeck',
+    },
+}
+
+# Every request is profiled in development, see /admin/profiling/
+PROFILING_SAMPLE_RATE = 1
 
-DEBUG = True
\ No newline at end of file
+# Sessions are written to database at once, celery worker is optional
+SESSION_WRITE_BEHIND_DELAY = 0
@@ -1,3 +1,17 @@
 from ._base import *
 
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
\ No newline at end of file
+# names of collected files contain hashes of their content, WhiteNoise
+# serves them with immutable far-future cache headers; gzip and brotli
+# variants are compressed by collectstatic
+STATICFILES_STORAGE = \
+    'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# compiled templates are kept by workers, project templates are compiled
+# by master before forking, see switchdeck.apps.core.startup
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
@@ -1 +1,14 @@
-from _base import *
\ No newline at end of file
+from ._base import *
+
+CHANNEL_LAYERS = {
+    'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'},
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'KEY_PREFIX': 'switchdeck',
+    },
+}
+
+SESSION_WRITE_BEHIND_DELAY = 0
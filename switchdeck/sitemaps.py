@@ -2,9 +2,25 @@
 Site sitemap.
 
 XML file with some pages, needed for robots and search services crowlers.
+
+Sitemaps are pregenerated by celery task ``generate_sitemaps`` into gzipped
+files in ``SITEMAP_ROOT``: sitemap index and sections of fixed size. Large
+sitemaps are split into sections by primary key ranges, which are found by
+keyset iteration. Only sections with changed rows are written again,
+files of sections which became empty are deleted.
 """
+import gzip
+import hashlib
+import json
+import os
+import pathlib
+from xml.sax.saxutils import escape
+
+from django.conf import settings
 from django.contrib.flatpages.sitemaps import FlatPageSitemap
 from django.contrib.sitemaps import Sitemap, GenericSitemap
+from django.contrib.sites.models import Site
+from django.db import models
 from django.urls import reverse
 
 from switchdeck.apps.place.models import Place
@@ -12,39 +28,243 @@ from switchdeck.apps.users.models import Profile
 from switchdeck.apps.game.models import Game
 from switchdeck.apps.lot.models import Lot, Comment
 
+INDEX_FILE_NAME = 'sitemap.xml'
+MANIFEST_FILE_NAME = 'manifest.json'
+
 
 class StaticViewSitemap(Sitemap):
     """Sitemap for objects and some static pages."""
 
     priority = 0.7
-    changefreq = 'always'
+    changefreq = 'daily'
 
     def items(self):
         """Return lis tof sitemapping items."""
-        return ['index', 'places', 'users', 'games', 'search']
+        return ['index', 'place:place_list', 'users:list', 'game:game_list',
+                'lot:search']
 
     def location(self, obj):
         """Return source location of object."""
         return reverse(obj)
 
 
+class SectionedSitemap(GenericSitemap):
+    """
+    Generic sitemap which can be split into sections by pk ranges.
+
+    ``location_fields`` are fields of items used in their URLs, like
+    slugs, their changes change signatures of sections.
+    """
+
+    def __init__(self, info_dict, *args, location_fields=(), **kwargs):
+        super().__init__(info_dict, *args, **kwargs)
+        self.location_fields = tuple(location_fields)
+
+    def section_queryset(self, first: int, last: int = None):
+        """Return items with pk in range ``(first, last]``, ordered by pk."""
+        queryset = self.queryset.filter(pk__gt=first)
+        if last is not None:
+            queryset = queryset.filter(pk__lte=last)
+        return queryset.order_by('pk')
+
+    def section_bounds(self, size: int, known_bounds: list) -> list:
+        """
+        Return last pks of full sections.
+
+        Bounds already known are kept, so sections are stable between
+        generations. New bounds are found by keyset from the last one.
+        """
+        bounds = list(known_bounds)
+        start = bounds[-1] if bounds else 0
+        while True:
+            last = self.section_queryset(start)\
+                .values_list('pk', flat=True)[size - 1:size]
+            if not last:
+                return bounds
+            start = last[0]
+            bounds.append(start)
+
+    def section_signature(self, first: int, last: int = None) -> list:
+        """
+        Return cheap signature of section to detect changes.
+
+        Signature is ``[count, max pk, sum of pks, digest of location
+        fields, lastmod]``: rows deleted and added between generations
+        change sum even if count is kept, renamed rows change digest.
+        """
+        aggregates = {'count': models.Count('pk'), 'last': models.Max('pk'),
+                      'checksum': models.Sum('pk')}
+        if self.date_field:
+            aggregates['lastmod'] = models.Max(self.date_field)
+        result = self.section_queryset(first, last).order_by()\
+            .aggregate(**aggregates)
+        lastmod = result.get('lastmod')
+        digest = None
+        if self.location_fields and result['count']:
+            digest = self.location_digest(first, last)
+        return [result['count'], result['last'], int(result['checksum'] or 0),
+                digest, lastmod.isoformat() if lastmod else None]
+
+    def location_digest(self, first: int, last: int = None,
+                        chunk_size: int = 5000) -> str:
+        """Return digest of location fields of section items, by keyset."""
+        digest = hashlib.sha1()
+        while True:
+            chunk = list(self.section_queryset(first, last).values_list(
+                'pk', *self.location_fields)[:chunk_size])
+            for row in chunk:
+                digest.update(repr(row).encode())
+            if len(chunk) < chunk_size:
+                return digest.hexdigest()
+            first = chunk[-1][0]
+
+    def keyset_iterator(self, first: int, last: int = None,
+                        chunk_size: int = 2000):
+        """Iterate over items of section by chunks, using keyset."""
+        while True:
+            chunk = list(self.section_queryset(first, last)[:chunk_size])
+            yield from chunk
+            if len(chunk) < chunk_size:
+                return
+            first = chunk[-1].pk
+
+
 sitemaps = {
     'static': StaticViewSitemap,
     'flatpages': FlatPageSitemap,
-    'place': GenericSitemap(
+    'place': SectionedSitemap(
         {'queryset': Place.objects.all()},
+        location_fields=['slug'],
         priority=0.8,
-        changefreq='always'),
-    'game': GenericSitemap(
+        changefreq='daily'),
+    'game': SectionedSitemap(
         {'queryset': Game.objects.all()},
+        location_fields=['slug'],
         priority=0.8,
-        changefreq='always'),
-    'lot': GenericSitemap(
+        changefreq='daily'),
+    'lot': SectionedSitemap(
         {'queryset': Lot.objects.filter(active=True),
          'date_field': 'up_time'},
         priority=0.5,
-        changefreq='always'),
-    'profile': GenericSitemap(
-        {'queryset': Profile.objects.filter(user__is_active=True)},
+        changefreq='daily'),
+    'profile': SectionedSitemap(
+        {'queryset': Profile.objects.filter(user__is_active=True)
+         .select_related('user')},
+        location_fields=['user__username'],
         priority=0.4,
-        changefreq='daily')}
+        changefreq='weekly')}
+
+
+def _url_xml(location: str, lastmod=None, changefreq=None,
+             priority=None) -> str:
+    xml = f'<url><loc>{escape(location)}</loc>'
+    if lastmod:
+        xml += f'<lastmod>{lastmod.date().isoformat()}</lastmod>'
+    if changefreq:
+        xml += f'<changefreq>{changefreq}</changefreq>'
+    if priority is not None:
+        xml += f'<priority>{priority:.1f}</priority>'
+    return xml + '</url>\n'
+
+
+def _attribute(sitemap, name: str, item):
+    """Return value of sitemap attribute for item, called if method."""
+    value = getattr(sitemap, name, None)
+    return value(item) if callable(value) else value
+
+
+def _write_section(path: pathlib.Path, sitemap, items, base_url: str):
+    """Write gzipped urlset of items to path, replace old file at once."""
+    tmp_path = path.with_suffix('.tmp')
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/'
+                'sitemap/0.9">\n')
+        for item in items:
+            f.write(_url_xml(
+                base_url + sitemap.location(item),
+                lastmod=_attribute(sitemap, 'lastmod', item),
+                changefreq=_attribute(sitemap, 'changefreq', item),
+                priority=_attribute(sitemap, 'priority', item)))
+        f.write('</urlset>\n')
+    os.replace(tmp_path, path)
+
+
+def generate_sitemaps(force: bool = False) -> int:
+    """
+    Generate sitemap index and sections to ``SITEMAP_ROOT``.
+
+    Sections with unchanged signatures are not written, unless ``force``,
+    files not listed in new manifest are deleted. Return amount of written
+    sections.
+    """
+    root = pathlib.Path(settings.SITEMAP_ROOT)
+    root.mkdir(parents=True, exist_ok=True)
+    manifest_path = root / MANIFEST_FILE_NAME
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+    base_url = (f'{settings.SITEMAP_PROTOCOL}://'
+                f'{Site.objects.get_current().domain}')
+    size = settings.SITEMAP_SECTION_SIZE
+    new_manifest = {}
+    written = 0
+    for name, sitemap in sitemaps.items():
+        if isinstance(sitemap, type):
+            sitemap = sitemap()
+        if not isinstance(sitemap, SectionedSitemap):
+            # small sitemaps of static pages are written every time
+            file_name = f'{name}.xml.gz'
+            _write_section(root / file_name, sitemap, sitemap.items(),
+                           base_url)
+            written += 1
+            new_manifest[name] = [{'file': file_name, 'lastmod': None}]
+            continue
+        old_sections = {section['first']: section
+                        for section in manifest.get(name, [])}
+        known_bounds = [section['last'] for section in manifest.get(name, [])
+                        if section['last'] is not None]
+        bounds = sitemap.section_bounds(size, known_bounds)
+        ranges = list(zip([0] + bounds, bounds + [None]))
+        sections = []
+        for number, (first, last) in enumerate(ranges, 1):
+            signature = sitemap.section_signature(first, last)
+            # empty sections are kept in manifest to keep bounds stable
+            file_name = f'{name}-{number}.xml.gz' if signature[0] else None
+            section = {'first': first, 'last': last, 'file': file_name,
+                       'signature': signature, 'lastmod': signature[-1]}
+            old = old_sections.get(first)
+            if file_name and (force or old != section
+                              or not (root / file_name).exists()):
+                _write_section(root / file_name, sitemap,
+                               sitemap.keyset_iterator(first, last),
+                               base_url)
+                written += 1
+            sections.append(section)
+        new_manifest[name] = sections
+
+    index = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+             '<sitemapindex xmlns="http://www.sitemaps.org/schemas/'
+             'sitemap/0.9">\n')
+    for sections in new_manifest.values():
+        for section in sections:
+            if section['file'] is None:
+                continue
+            location = f'{base_url}{settings.SITEMAP_URL}{section["file"]}'
+            index += f'<sitemap><loc>{escape(location)}</loc>'
+            if section['lastmod']:
+                index += f'<lastmod>{section["lastmod"]}</lastmod>'
+            index += '</sitemap>\n'
+    index += '</sitemapindex>\n'
+    (root / (INDEX_FILE_NAME + '.tmp')).write_text(index)
+    os.replace(root / (INDEX_FILE_NAME + '.tmp'), root / INDEX_FILE_NAME)
+    manifest_path.write_text(json.dumps(new_manifest))
+    # sections which became empty and removed sitemaps
+    files = {section['file'] for sections in new_manifest.values()
+             for section in sections}
+    for sections in manifest.values():
+        for section in sections:
+            if section['file'] and section['file'] not in files:
+                (root / section['file']).unlink(missing_ok=True)
+    return written
@@ -18,7 +18,6 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib.sitemaps.views import sitemap
 from django.contrib.flatpages import views as flatpage_views
 from django.utils.translation import gettext_lazy as _
 
@@ -26,14 +25,15 @@ from drf_spectacular.views import (SpectacularAPIView,
                                    SpectacularRedocView,
                                    SpectacularSwaggerView,)
 
-from .sitemaps import sitemaps
-from .api_router import router
-from switchdeck.apps.core.views import index
+from .api_router import router, query_budgets as api_query_budgets
+from switchdeck.apps.core.views import (index, metrics, profiling_stats,
+                                        sitemap)
 
 admin.site.site_header = _("Switchdeck administration")
 
 urlpatterns = [
     path('', index, name='index'),
+    path('admin/profiling/', profiling_stats, name='profiling'),
     path('admin/', admin.site.urls),
     path('api-auth', include('rest_framework.urls',
                              namespace='rest_framework')),
@@ -49,13 +49,19 @@ urlpatterns = [
     path('accounts/', include('allauth.urls')),
     path('accounts/', include('switchdeck.apps.users.urls')),
     path('admin/doc/', include('django.contrib.admindocs.urls')),
-    path('sitemap.xml', sitemap, {'sitemaps': sitemaps},
-         name="django.contrib.sitemaps.views.sitemap"),
+    path('sitemap.xml', sitemap, name='sitemap'),
+    path('metrics', metrics, name='metrics'),
     path('about/', flatpage_views.flatpage, {'url': '/about/'},
          name='about'),
     path('license/', flatpage_views.flatpage, {'url': '/license/'},
          name='license'),
 ]
 
+# Most queries of requests by url names, checked by tests
+query_budgets = {
+    'index': 2,
+    **api_query_budgets,
+}
+
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)